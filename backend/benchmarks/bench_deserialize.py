@@ -0,0 +1,68 @@
+"""
+Per-item cost of deserializing order items.
+
+Items are built from the backend/database.csv export, in both storage
+formats: format 1 (order_data as a DynamoDB JSON string) and format 2
+(order_data as a native map). "TypeDeserializer" is how
+query_breakfast_orders used to convert items; "from_wire" is
+breakfast.dynamo.deserialize_order_item.
+
+    python backend/benchmarks/bench_deserialize.py [repeats]
+"""
+import csv
+import json
+import os
+import sys
+import timeit
+
+from boto3.dynamodb.types import TypeDeserializer
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', 'shared'))
+
+from breakfast.dynamo import deserialize_order_item  # noqa: E402
+
+DATABASE_CSV = os.path.join(HERE, '..', 'database.csv')
+
+# Passes over the orders per timing run; the best of `repeats` runs is reported
+NUMBER = 500
+
+deserializer = TypeDeserializer()
+
+
+def load_items():
+    """Return the exported orders as (format 1, format 2) low-level items"""
+    legacy, native = [], []
+    with open(DATABASE_CSV, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            item = {
+                'bk_yyyy-mm-dd': {'S': row['bk_yyyy-mm-dd']},
+                'roomnumber-name': {'S': row['roomnumber-name']},
+                'order_id': {'S': row['order_id']},
+                'created_at': {'N': row['created_at']},
+            }
+            legacy.append(dict(item, order_data={'S': row['order_data']}))
+            native.append(dict(item, order_data={'M': json.loads(row['order_data'])}, format_version={'N': '2'}))
+    return legacy, native
+
+
+def type_deserializer(item):
+    deserialized_item = {k: deserializer.deserialize(v) for k, v in item.items()}
+    order_data = deserialized_item['order_data']
+    if not isinstance(order_data, dict):
+        deserialized_item['order_data'] = {k: deserializer.deserialize(v) for k, v in json.loads(order_data).items()}
+    return deserialized_item
+
+
+def main(repeats):
+    legacy, native = load_items()
+    print(f"{len(legacy)} orders from {os.path.relpath(DATABASE_CSV)}")
+
+    for format_label, items in (('format 1 (string)', legacy), ('format 2 (map)', native)):
+        for label, function in (('TypeDeserializer', type_deserializer), ('from_wire', deserialize_order_item)):
+            seconds = min(timeit.repeat(lambda: [function(item) for item in items], number=NUMBER, repeat=repeats))
+            print(f"{format_label:18} {label:17} {seconds / NUMBER / len(items) * 1e6:7.2f} us/item")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
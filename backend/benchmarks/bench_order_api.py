@@ -0,0 +1,115 @@
+"""
+Warm-invocation latency of the order intake Lambda.
+
+Runs the handler against a local DynamoDB stand-in: DynamoDB Local when
+DYNAMODB_ENDPOINT is set, otherwise moto's in-process mock. "before"
+rebuilds the boto3 resource and tables on every request, as the handler
+used to; "after" uses the module-scope handles.
+
+    python backend/benchmarks/bench_order_api.py [invocations]
+"""
+import contextlib
+import glob
+import importlib.util
+import io
+import json
+import os
+import statistics
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+INTAKE_DIR = glob.glob(os.path.join(HERE, '..', 'functions', 'benfen-breakfastapi-*'))[0]
+SHARED_DIR = os.path.join(HERE, '..', 'shared')
+
+ORDER = {
+    "urlParameters": {"t": "benchmarktoken"},
+    "customer": {"firstName": "Bench", "roomNumber": 12},
+    "scheduling": {"date": "2025-08-05", "time": "08:00"},
+    "eggs": {"style": "over", "overStyle": "easy"},
+    "pancakes": {"selected": True, "toppings": {"berries": True, "bacon": False, "whippedCream": False}},
+    "waffles": {"selected": False, "options": {"berries": False, "bacon": False, "whippedCream": False}},
+    "sides": {"bacon": True, "homeFries": True, "beans": False, "toast": {"selected": True, "breadType": "white"}},
+    "drinks": {"water": False, "milk": False, "juice": {"selected": True, "juiceType": "apple"},
+               "coffee": True, "tea": False},
+    "specialOptions": ""
+}
+
+
+def load_intake():
+    for path in (INTAKE_DIR, SHARED_DIR):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    spec = importlib.util.spec_from_file_location('intake_lambda', os.path.join(INTAKE_DIR, 'lambda.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def create_tables(dynamo, intake):
+    tokens = dynamo.create_table(
+        TableName=intake.TOKENS_TABLE,
+        KeySchema=[{'AttributeName': 'type', 'KeyType': 'HASH'},
+                   {'AttributeName': 'created_at', 'KeyType': 'RANGE'}],
+        AttributeDefinitions=[{'AttributeName': 'type', 'AttributeType': 'S'},
+                              {'AttributeName': 'created_at', 'AttributeType': 'S'},
+                              {'AttributeName': 'token', 'AttributeType': 'S'}],
+        GlobalSecondaryIndexes=[{'IndexName': intake.TOKEN_INDEX_NAME,
+                                 'KeySchema': [{'AttributeName': 'token', 'KeyType': 'HASH'}],
+                                 'Projection': {'ProjectionType': 'ALL'}}],
+        BillingMode='PAY_PER_REQUEST'
+    )
+    dynamo.create_table(
+        TableName=intake.ORDERS_TABLE,
+        KeySchema=[{'AttributeName': 'bk_yyyy-mm-dd', 'KeyType': 'HASH'},
+                   {'AttributeName': 'roomnumber-name', 'KeyType': 'RANGE'}],
+        AttributeDefinitions=[{'AttributeName': 'bk_yyyy-mm-dd', 'AttributeType': 'S'},
+                              {'AttributeName': 'roomnumber-name', 'AttributeType': 'S'}],
+        BillingMode='PAY_PER_REQUEST'
+    )
+    tokens.put_item(Item={'type': 'token', 'created_at': str(int(time.time())), 'token': 'benchmarktoken'})
+
+
+def measure(intake, invocations, rebuild):
+    event = {"httpMethod": "POST", "body": json.dumps(ORDER)}
+    timings = []
+    for _ in range(invocations):
+        start = time.perf_counter()
+        if rebuild:
+            intake.dynamo = intake.get_dynamodb_resource()
+            intake.tokens_table = intake.dynamo.Table(intake.TOKENS_TABLE)
+            intake.orders_table = intake.dynamo.Table(intake.ORDERS_TABLE)
+        with contextlib.redirect_stdout(io.StringIO()):
+            response = intake.lambda_handler(event, None)
+        timings.append((time.perf_counter() - start) * 1000)
+        assert response['statusCode'] == 200, response
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.99) - 1]
+
+
+def main(invocations):
+    # Isolate client construction from the token cache
+    os.environ['TOKEN_CACHE_TTL_SECONDS'] = '0'
+    os.environ['TOKEN_NEGATIVE_CACHE_TTL_SECONDS'] = '0'
+    os.environ.setdefault('AWS_REGION', 'ca-central-1')
+
+    if os.environ.get('DYNAMODB_ENDPOINT'):
+        mock = contextlib.nullcontext()
+    else:
+        from moto import mock_aws
+        os.environ.setdefault('AWS_ACCESS_KEY_ID', 'testing')
+        os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'testing')
+        mock = mock_aws()
+
+    with mock:
+        intake = load_intake()
+        create_tables(intake.dynamo, intake)
+        measure(intake, 5, rebuild=False)  # warm up
+
+        for label, rebuild in (('before (resource per request)', True), ('after (module scope)', False)):
+            p50, p99 = measure(intake, invocations, rebuild)
+            print(f"{label:32} p50 {p50:7.2f} ms   p99 {p99:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,73 @@
+"""
+Cold and warm render time of the QR code PDF generator.
+
+Times the handler's QR code, logo and PDF steps for one token, without
+DynamoDB or SES, for both QR_RENDERING modes. "cold" loads the function module afresh and renders
+once, as the first request in a new container does; "warm" renders
+again with the same module.
+
+The function bundle's Pillow is built for Python 3.13, and PyMuPDF is
+needed for the template PDF and vector QR codes, so run this with the interpreter the
+function is deployed with:
+
+    python3.13 backend/benchmarks/bench_pdf_generator.py [renders]
+"""
+import contextlib
+import glob
+import importlib.util
+import io
+import os
+import statistics
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PDF_DIR = glob.glob(os.path.join(HERE, '..', 'functions', 'benfen-pdfgeneratorAGAIN-*'))[0]
+SHARED_DIR = os.path.join(HERE, '..', 'shared')
+
+URL = 'https://breakfast.innatthecape.com?t=0123456789abcdef012345678'
+
+
+def load_generator():
+    for path in (PDF_DIR, SHARED_DIR):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'ca-central-1')
+    spec = importlib.util.spec_from_file_location('pdf_generator', os.path.join(PDF_DIR, 'lambda_function.py'))
+    module = importlib.util.module_from_spec(spec)
+    with contextlib.redirect_stdout(io.StringIO()):
+        spec.loader.exec_module(module)
+    return module
+
+
+def render(generator, mode):
+    with contextlib.redirect_stdout(io.StringIO()):
+        if mode == 'vector':
+            return generator.create_vector_pdf([URL])
+        qr_image = generator.add_logo_to_qr(generator.generate_qr_code(URL))
+        return generator.create_pdf_with_qr(qr_image)
+
+
+def main(renders):
+    for mode in ('raster', 'vector'):
+        cold = []
+        for _ in range(5):
+            generator = load_generator()
+            start = time.perf_counter()
+            pdf = render(generator, mode)
+            cold.append(time.perf_counter() - start)
+
+        warm = []
+        for _ in range(renders):
+            start = time.perf_counter()
+            render(generator, mode)
+            warm.append(time.perf_counter() - start)
+
+        print(f"{mode}: {len(pdf) / 1024:.0f} KB")
+        print(f"  cold: median {statistics.median(cold) * 1000:.1f} ms")
+        print(f"  warm: median {statistics.median(warm) * 1000:.1f} ms, "
+              f"p95 {statistics.quantiles(warm, n=20)[-1] * 1000:.1f} ms over {renders} renders")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
@@ -0,0 +1,58 @@
+"""
+Time to render the HTML order report for a large day.
+
+Builds 500 orders by cycling through the orders in backend/database.csv
+with distinct guests and times, and renders them with
+breakfast.report.generate_breakfast_email_html.
+
+    python backend/benchmarks/bench_report_html.py [orders]
+"""
+import csv
+import json
+import os
+import sys
+import timeit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', 'shared'))
+
+from breakfast.dynamo import from_wire  # noqa: E402
+from breakfast.orders import parse_orders  # noqa: E402
+from breakfast.report import generate_breakfast_email_html, sort_orders_by_time  # noqa: E402
+from breakfast.summary import DailySummary  # noqa: E402
+
+DATABASE_CSV = os.path.join(HERE, '..', 'database.csv')
+TIMES = ('06:00', '06:30', '07:00', '07:30', '08:00', '08:30', '09:00')
+
+
+def build_orders(count):
+    with open(DATABASE_CSV, newline='', encoding='utf-8') as f:
+        exported = [from_wire({'M': json.loads(row['order_data'])}) for row in csv.DictReader(f)]
+
+    items = []
+    for i in range(count):
+        order_data = json.loads(json.dumps(exported[i % len(exported)]))
+        order_data['customer'] = {'firstName': f'Guest {i}', 'roomNumber': i % 20 + 1}
+        order_data['scheduling']['time'] = TIMES[i % len(TIMES)]
+        items.append({'order_id': str(i), 'order_data': order_data})
+    return parse_orders(items)
+
+
+def main(count):
+    orders = sort_orders_by_time(build_orders(count))
+    summary = DailySummary.from_orders('2025-08-05', orders)
+    analysis = {
+        'item_counts': summary.kitchen_counts(),
+        'earliest_time': summary.earliest_time,
+        'latest_time': summary.latest_time,
+        'total_orders': summary.order_count,
+    }
+
+    html = generate_breakfast_email_html(orders, analysis, '2025-08-05')
+    seconds = min(timeit.repeat(lambda: generate_breakfast_email_html(orders, analysis, '2025-08-05'),
+                                number=20, repeat=5)) / 20
+    print(f"{count} orders: {len(html) / 1024:.0f} KB of HTML in {seconds * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,99 @@
+"""
+Time to check a QR token in the order intake Lambda, by token format.
+
+    signed: a signed token verified in memory, with the deny-list cached
+    lookup: a random token missing the container cache, one token-index query
+    scan: a random token found by scanning the token table, as the order
+      API did before it had the token index
+
+Runs against moto's in-process DynamoDB (or DynamoDB Local when
+DYNAMODB_ENDPOINT is set) with a table of issued tokens. The stand-in
+takes no network round trip, so real lookups and scans are slower than
+shown here; the signed path does not touch the table at all.
+
+    python backend/benchmarks/bench_token_check.py [tokens]
+"""
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+import uuid
+
+import boto3
+import boto3.dynamodb.conditions
+
+from bench_order_api import SHARED_DIR, create_tables, load_intake
+
+sys.path.insert(0, SHARED_DIR)
+from breakfast.tokens import sign_token  # noqa: E402
+
+SIGNING_KEYS = '{"bench": "benchmark secret"}'
+
+
+def timed(check, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        accepted = check()
+        timings.append(time.perf_counter() - start)
+        assert accepted
+    return statistics.median(timings)
+
+
+def scan_for_token(table, token):
+    scan = {'FilterExpression': boto3.dynamodb.conditions.Attr('token').eq(token)}
+    while True:
+        response = table.scan(**scan)
+        if response['Items']:
+            return True
+        if 'LastEvaluatedKey' not in response:
+            return False
+        scan['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def run(token_count):
+    intake = load_intake()
+    create_tables(intake.dynamo, intake)
+
+    now = int(time.time())
+    tokens = [str(uuid.uuid4()).replace('-', '')[:25] for _ in range(token_count)]
+    with intake.tokens_table.batch_writer() as batch:
+        for index, token in enumerate(tokens):
+            batch.put_item(Item={'type': 'token', 'created_at': f"{now}.{index:04d}", 'token': token})
+    legacy = tokens[token_count // 2]
+    signed = sign_token(intake.TOKEN_SIGNING_KEYS, 'bench', now - 60, now + 86400)
+
+    def lookup():
+        intake.clear_token_cache()
+        return intake.check_token(legacy)[0]
+
+    return {
+        'signed': timed(lambda: intake.check_token(signed)[0], 2000),
+        'lookup': timed(lookup, 200),
+        'scan': timed(lambda: scan_for_token(intake.tokens_table, legacy), 5),
+    }
+
+
+def main(token_count):
+    os.environ['TOKEN_SIGNING_KEYS'] = SIGNING_KEYS
+    os.environ.setdefault('AWS_REGION', 'ca-central-1')
+
+    if os.environ.get('DYNAMODB_ENDPOINT'):
+        mock = contextlib.nullcontext()
+    else:
+        from moto import mock_aws
+        os.environ.setdefault('AWS_ACCESS_KEY_ID', 'testing')
+        os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'testing')
+        mock = mock_aws()
+
+    with mock, contextlib.redirect_stdout(io.StringIO()):
+        results = run(token_count)
+    print(f"{token_count} tokens in the table")
+    for name, seconds in results.items():
+        print(f"{name:>6}: median {seconds * 1e6:10.1f} us")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
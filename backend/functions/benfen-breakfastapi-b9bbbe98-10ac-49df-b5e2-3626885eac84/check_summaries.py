@@ -0,0 +1,103 @@
+import argparse
+import os
+
+import boto3
+
+from breakfast.dynamo import DATES_PARTITION, from_wire, iter_breakfast_orders, query_pages
+from breakfast.orders import parse_orders
+from breakfast.summary import DailySummary, store_summary, summary_key
+
+ORDERS_TABLE = os.environ.get('ORDERS_TABLE', 'benfen-breakfast')
+
+
+def order_dates(client, table_name=ORDERS_TABLE):
+    """
+    Every date that has orders or a summary item.
+
+    Returns:
+        list: Dates in YYYY-MM-DD format, oldest first
+    """
+    dates = set()
+    kwargs = {
+        'TableName': table_name,
+        'ProjectionExpression': '#pk',
+        'FilterExpression': 'begins_with(#pk, :bk)',
+        'ExpressionAttributeNames': {'#pk': 'bk_yyyy-mm-dd'},
+        'ExpressionAttributeValues': {':bk': {'S': 'bk_'}},
+    }
+    while True:
+        response = client.scan(**kwargs)
+        dates.update(item['bk_yyyy-mm-dd']['S'][len('bk_'):] for item in response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            break
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    for page in query_pages(client, TableName=table_name, KeyConditionExpression='#pk = :pk',
+                            ProjectionExpression='#sk',
+                            ExpressionAttributeNames={'#pk': 'bk_yyyy-mm-dd', '#sk': 'roomnumber-name'},
+                            ExpressionAttributeValues={':pk': {'S': DATES_PARTITION}}):
+        dates.update(item['roomnumber-name']['S'] for item in page.get('Items', []))
+
+    return sorted(dates)
+
+
+def stored_attributes(client, table_name, date):
+    """The non-zero summary attributes stored for a date"""
+    item = client.get_item(TableName=table_name, Key=summary_key(date)).get('Item', {})
+    return DailySummary(date, {name: from_wire(value) for name, value in item.items()}).attributes()
+
+
+def check_summaries(client, table_name=ORDERS_TABLE, date=None, fix=False):
+    """
+    Rebuild each date's kitchen summary from its orders and report drift
+    from the stored summary.
+
+    With fix, summaries that drifted are overwritten with the rebuilt
+    counts. Orders taken while that runs can be lost from the summary, so
+    fix outside breakfast ordering hours. Run with fix once when summaries
+    are first introduced, to create them for existing orders.
+
+    Args:
+        client: boto3 DynamoDB client
+        table_name (str): Name of the orders table
+        date (str): Only check this date (YYYY-MM-DD); all dates if None
+        fix (bool): Overwrite summaries that drifted
+
+    Returns:
+        dict: date -> {attribute: (stored, rebuilt)} for every date that drifted
+    """
+    drift = {}
+
+    for check_date in ([date] if date else order_dates(client, table_name)):
+        orders = parse_orders(iter_breakfast_orders(client, table_name, check_date))
+        rebuilt = DailySummary.from_orders(check_date, orders).attributes()
+        stored = stored_attributes(client, table_name, check_date)
+
+        differences = {name: (stored.get(name, 0), rebuilt.get(name, 0))
+                       for name in sorted(stored.keys() | rebuilt.keys())
+                       if stored.get(name, 0) != rebuilt.get(name, 0)}
+        if not differences:
+            continue
+
+        drift[check_date] = differences
+        for name, (stored_count, rebuilt_count) in differences.items():
+            print(f"{check_date} {name}: stored {stored_count}, orders say {rebuilt_count}")
+
+        if fix:
+            store_summary(client, table_name, check_date, rebuilt)
+            print(f"{check_date} summary rebuilt")
+
+    return drift
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare daily kitchen summaries with the orders they count")
+    parser.add_argument('--date', help="Only check this date (YYYY-MM-DD)")
+    parser.add_argument('--fix', action='store_true', help="Rebuild summaries that drifted")
+    args = parser.parse_args()
+
+    region = os.environ.get('AWS_REGION', 'ca-central-1')
+    endpoint_url = os.environ.get('DYNAMODB_ENDPOINT')
+    client = boto3.client('dynamodb', region_name=region, endpoint_url=endpoint_url)
+    drift = check_summaries(client, date=args.date, fix=args.fix)
+    print(f"{len(drift)} date(s) drifted" if drift else "All summaries match their orders")
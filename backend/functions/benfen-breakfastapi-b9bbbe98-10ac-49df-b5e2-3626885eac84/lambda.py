@@ -1,20 +1,428 @@
+import hashlib
 import json
 import boto3
 import boto3.dynamodb.conditions
 import os
+import time
+from botocore.config import Config
+from decimal import Decimal
+from breakfast.dynamo import DATES_PARTITION, ORDER_FORMAT_VERSION, from_wire
+from breakfast.orders import time_minutes
+from breakfast.summary import SLOT_PREFIX, summary_delta, summary_update
+from breakfast.tokens import REVOKED_PARTITION, TokenError, is_signed_token, load_keys, verify_token
+from order_validation import OrderValidationError, normalize_order
+
+# Token table and the global secondary index keyed on the `token` attribute
+TOKENS_TABLE = os.environ.get('TOKENS_TABLE', 'benfen-tokens')
+TOKEN_INDEX_NAME = os.environ.get('TOKEN_INDEX_NAME', 'token-index')
+# Maximum age for tokens that were issued without an `expires_at` attribute (0 = no limit)
+TOKEN_MAX_AGE_DAYS = float(os.environ.get('TOKEN_MAX_AGE_DAYS', '0'))
+# Keys signed tokens are checked with (see breakfast.tokens); shared with the PDF generator
+TOKEN_SIGNING_KEYS = load_keys(os.environ.get('TOKEN_SIGNING_KEYS', ''))
+ORDERS_TABLE = os.environ.get('ORDERS_TABLE', 'benfen-breakfast')
+# Responses to orders sent with an idempotency key, keyed by `idempotency_key` with TTL on
+# `expires_at` (create it with migrate_orders.py --idempotency-table)
+IDEMPOTENCY_TABLE = os.environ.get('IDEMPOTENCY_TABLE', 'benfen-idempotency')
+# Orders accepted per time slot on each date (0 = no limit)
+SLOT_CAPACITY = int(os.environ.get('SLOT_CAPACITY', '0'))
+# HTTP connection pool shared by every request served from this container
+DYNAMODB_MAX_POOL_CONNECTIONS = int(os.environ.get('DYNAMODB_MAX_POOL_CONNECTIONS', '10'))
+
+# Token lookups cached for the life of a warm container. Each container keeps its own cache,
+# so a random token deleted from the table keeps working for up to TOKEN_CACHE_TTL_SECONDS.
+TOKEN_CACHE_TTL_SECONDS = float(os.environ.get('TOKEN_CACHE_TTL_SECONDS', '300'))
+TOKEN_NEGATIVE_CACHE_TTL_SECONDS = float(os.environ.get('TOKEN_NEGATIVE_CACHE_TTL_SECONDS', '30'))
+TOKEN_CACHE_MAX_ENTRIES = 1024
+# Revoked signed tokens, re-read at most this often; a revocation reaches every container within this
+DENY_LIST_TTL_SECONDS = float(os.environ.get('DENY_LIST_TTL_SECONDS', '60'))
+
+# Retried submissions with the same Idempotency-Key (or clientRequestId) replay the first
+# successful response for this long; a request still running holds its key for the lease
+IDEMPOTENCY_TTL_SECONDS = int(os.environ.get('IDEMPOTENCY_TTL_SECONDS', '3600'))
+IDEMPOTENCY_LEASE_SECONDS = int(os.environ.get('IDEMPOTENCY_LEASE_SECONDS', '30'))
+IDEMPOTENCY_KEY_MAX_LENGTH = 128
+
+# token -> (item or None, cached_until, rechecked)
+_token_cache = {}
+token_cache_stats = {'hits': 0, 'misses': 0, 'negative_hits': 0, 'rechecks': 0}
+# (revoked token ids, cached_until)
+_deny_list = (frozenset(), 0)
 
 # Initialize DynamoDB resource with optional region/endpoint configuration
 def get_dynamodb_resource():
     """Get DynamoDB resource - works both locally and in Lambda"""
     # For local testing, you can set AWS_REGION environment variable
     region = os.environ.get('AWS_REGION', 'ca-central-1')
+    config = Config(max_pool_connections=DYNAMODB_MAX_POOL_CONNECTIONS)
+
+    # For local testing with LocalStack or DynamoDB Local, set DYNAMODB_ENDPOINT
+    endpoint_url = os.environ.get('DYNAMODB_ENDPOINT')
+    if endpoint_url:
+        return boto3.resource('dynamodb', region_name=region, endpoint_url=endpoint_url, config=config)
+
+    return boto3.resource('dynamodb', region_name=region, config=config)
+
+
+# Created once per container and reused by every warm invocation
+dynamo = get_dynamodb_resource()
+tokens_table = dynamo.Table(TOKENS_TABLE)
+orders_table = dynamo.Table(ORDERS_TABLE)
+idempotency_table = dynamo.Table(IDEMPOTENCY_TABLE)
+
+
+def prewarm():
+    """
+    Open the DynamoDB connection before the first request arrives.
+
+    Runs during init for provisioned concurrency, so the first order on a
+    pre-initialized container doesn't pay for the TLS handshake.
+    """
+    try:
+        tokens_table.get_item(Key={'type': 'prewarm', 'created_at': '0'})
+        print("Pre-warmed DynamoDB connection")
+    except Exception as e:
+        print(f"Pre-warm failed, continuing: {e}")
+
+
+if os.environ.get('AWS_LAMBDA_INITIALIZATION_TYPE') == 'provisioned-concurrency':
+    prewarm()
+
+
+def lookup_token(table, token):
+    """
+    Find the item for a QR token with a single query on the token index.
+
+    Returns the item, or None if the token was never issued.
+    """
+    response = table.query(
+        IndexName=TOKEN_INDEX_NAME,
+        KeyConditionExpression=boto3.dynamodb.conditions.Key('token').eq(token),
+        Limit=1
+    )
+    items = response.get('Items', [])
+    return items[0] if items else None
+
+
+def get_token_item(table, token, now=None):
+    """
+    Look up a token through the container-level cache.
+
+    Known tokens are cached for TOKEN_CACHE_TTL_SECONDS. Unknown tokens are
+    cached for the shorter TOKEN_NEGATIVE_CACHE_TTL_SECONDS so repeated bad
+    scans don't each hit the table. The first time an unknown token is
+    seen again, the table is checked once more before it is rejected: a
+    token scanned just before it was issued, or before the index caught
+    up, is then accepted instead of turned away until the entry expires.
+
+    Returns:
+        tuple: (item or None, cache outcome: "hit", "negative_hit", "recheck" or "miss")
+    """
+    if now is None:
+        now = time.time()
+
+    cached = _token_cache.get(token)
+    if cached is not None and now < cached[1]:
+        item, cached_until, rechecked = cached
+        if item is not None:
+            token_cache_stats['hits'] += 1
+            return item, 'hit'
+        if rechecked:
+            token_cache_stats['negative_hits'] += 1
+            return None, 'negative_hit'
+
+        token_cache_stats['rechecks'] += 1
+        item = lookup_token(table, token)
+        if item is None:
+            _token_cache[token] = (None, cached_until, True)
+        else:
+            _token_cache[token] = (item, now + TOKEN_CACHE_TTL_SECONDS, False)
+        return item, 'recheck'
+
+    token_cache_stats['misses'] += 1
+    item = lookup_token(table, token)
+
+    if len(_token_cache) >= TOKEN_CACHE_MAX_ENTRIES:
+        _token_cache.clear()
+    ttl = TOKEN_CACHE_TTL_SECONDS if item is not None else TOKEN_NEGATIVE_CACHE_TTL_SECONDS
+    _token_cache[token] = (item, now + ttl, False)
+
+    return item, 'miss'
+
+
+def clear_token_cache():
+    """Drop this container's cached token lookups and deny-list (for tests and benchmarks)"""
+    global _deny_list
+    _token_cache.clear()
+    _deny_list = (frozenset(), 0)
+
+
+def get_deny_list(table, now=None):
+    """
+    Ids of revoked signed tokens that haven't expired yet.
+
+    Read with one query of the REVOKED_PARTITION and cached for
+    DENY_LIST_TTL_SECONDS, so most orders with a signed token need no read.
+
+    Returns:
+        frozenset: Revoked token ids
+    """
+    global _deny_list
+    if now is None:
+        now = time.time()
+    if now < _deny_list[1]:
+        return _deny_list[0]
+
+    query = {
+        'KeyConditionExpression': boto3.dynamodb.conditions.Key('type').eq(REVOKED_PARTITION),
+        'ProjectionExpression': 'token_id, expires_at',
+    }
+    revoked = set()
+    while True:
+        response = table.query(**query)
+        revoked.update(item['token_id'] for item in response.get('Items', []) if now < float(item['expires_at']))
+        if 'LastEvaluatedKey' not in response:
+            break
+        query['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    _deny_list = (frozenset(revoked), now + DENY_LIST_TTL_SECONDS)
+    return _deny_list[0]
+
+
+def check_token(token, now=None):
+    """
+    Decide whether a QR token may place an order.
+
+    Signed tokens are verified in memory and checked against the cached
+    deny-list. Random tokens issued before signing are looked up in the
+    token table as before.
+
+    Returns:
+        tuple: (accepted, outcome: "signed", "revoked", "signed: <reason>"
+            or the token cache outcome of a random token)
+    """
+    if is_signed_token(token):
+        try:
+            claims = verify_token(TOKEN_SIGNING_KEYS, token, now)
+        except TokenError as e:
+            return False, f"signed: {e}"
+        if claims['token_id'] in get_deny_list(tokens_table, now):
+            return False, 'revoked'
+        return True, 'signed'
+
+    token_item, cache_outcome = get_token_item(tokens_table, token, now)
+    return token_item is not None and token_is_current(token_item, now), cache_outcome
+
+
+def token_is_current(item, now=None):
+    """
+    Check a token item's validity period.
+
+    Items carry `valid_from` and `expires_at` epoch timestamps; the PDF
+    generator adds its grace period to `expires_at`, so an old card and its
+    replacement are both accepted for a while. `expires_at` is also the
+    table's TTL attribute, but TTL deletes lag expiry, so it is checked here.
+    Items issued before `expires_at` existed fall back to `created_at` +
+    TOKEN_MAX_AGE_DAYS, and are accepted as before when no maximum age is
+    configured.
+    """
+    if now is None:
+        now = time.time()
+
+    valid_from = item.get('valid_from')
+    if valid_from is not None and now < float(valid_from):
+        return False
+
+    expires_at = item.get('expires_at')
+    if expires_at is None and TOKEN_MAX_AGE_DAYS > 0 and item.get('created_at') is not None:
+        expires_at = float(item['created_at']) + TOKEN_MAX_AGE_DAYS * 86400
+
+    return expires_at is None or now < float(expires_at)
+
+
+def get_idempotency_key(event, body):
+    """The request's Idempotency-Key header (any case), else clientRequestId from the body, else None"""
+    for name, value in (event.get("headers") or {}).items():
+        if name.lower() == "idempotency-key" and value:
+            return value
+    return body.get("clientRequestId") or None
+
+
+def request_fingerprint(token, order_data):
+    """Hash of what a request asks for, to catch an idempotency key reused for a different order"""
+    return hashlib.sha256(json.dumps([token, order_data], sort_keys=True, default=str).encode()).hexdigest()
+
+
+def claim_idempotency_key(key, fingerprint, now=None):
+    """
+    Find the stored outcome of an idempotency key, or claim the key.
+
+    Only called for requests with an accepted token, so unauthenticated
+    callers can't write records. One consistent read finds a response to
+    replay. A new key is claimed with a conditional put that lapses after
+    IDEMPOTENCY_LEASE_SECONDS, so a retry arriving while the first request
+    runs doesn't redo its work, and a request that died doesn't block the
+    key for long. Records past their `expires_at` count as absent; TTL
+    deletes them later.
+
+    Returns:
+        tuple: ("claimed", None), ("replay", record), ("in_progress", record or None)
+            or ("mismatch", record) if the key was used for a different order
+    """
+    if now is None:
+        now = int(time.time())
+
+    record_key = {"idempotency_key": key}
+    record = idempotency_table.get_item(Key=record_key, ConsistentRead=True).get("Item")
+    if record is not None and now < float(record["expires_at"]):
+        if record["fingerprint"] != fingerprint:
+            return "mismatch", record
+        return ("replay" if record["status"] == "done" else "in_progress"), record
+
+    try:
+        idempotency_table.put_item(
+            Item={**record_key, "status": "pending", "fingerprint": fingerprint,
+                  "expires_at": now + IDEMPOTENCY_LEASE_SECONDS},
+            ConditionExpression="attribute_not_exists(idempotency_key) OR expires_at <= :now",
+            ExpressionAttributeValues={":now": now}
+        )
+    except idempotency_table.meta.client.exceptions.ConditionalCheckFailedException:
+        # Another request claimed the key between the read and the put
+        return "in_progress", None
+    return "claimed", None
+
+
+def store_idempotent_response(key, response, now=None):
+    """
+    Keep a claimed request's successful response for replay.
+
+    Any other response releases the key instead, so a retry of the same
+    order runs again: a full slot may have freed up, and a server error may
+    have passed.
+    """
+    if now is None:
+        now = int(time.time())
+
+    record_key = {"idempotency_key": key}
+    try:
+        if not 200 <= response["statusCode"] < 300:
+            idempotency_table.delete_item(Key=record_key)
+            return
+        idempotency_table.update_item(
+            Key=record_key,
+            UpdateExpression="SET #status = :done, #response = :response, expires_at = :expires_at",
+            ExpressionAttributeNames={"#status": "status", "#response": "response"},
+            ExpressionAttributeValues={":done": "done", ":response": json.dumps(response),
+                                       ":expires_at": now + IDEMPOTENCY_TTL_SECONDS}
+        )
+    except Exception as e:
+        # The order was handled; a retry after the lease runs it again, which upsert_order allows
+        print(f"Error storing idempotency record {key}: {e}")
+
+
+def upsert_order(order_item):
+    """
+    Create or replace an order with a single conditional write.
+
+    The put overwrites any order with the same key unless that order is
+    newer than this one, so a delayed resubmission can't clobber a later
+    edit. Readers never see the order missing in between.
+
+    Returns:
+        dict: The order that was replaced, or None for a new order
+
+    Raises:
+        ConditionalCheckFailedException: A newer order is already stored
+    """
+    response = orders_table.put_item(
+        Item=order_item,
+        ConditionExpression='attribute_not_exists(created_at) OR created_at < :created_at',
+        ExpressionAttributeValues={':created_at': order_item['created_at']},
+        ReturnValues='ALL_OLD'
+    )
+    return response.get('Attributes')
+
+
+def stored_order_data(order):
+    """order_data of a saved order item, decoding format 1 orders"""
+    order_data = order.get("order_data")
+    if isinstance(order_data, str):
+        # Format 1 order, saved as a string of DynamoDB JSON
+        order_data = from_wire({"M": json.loads(order_data)})
+    return order_data
+
+
+def reserve_slot(delivery_date, time_slot):
+    """
+    Take a place in a time slot unless it already has SLOT_CAPACITY orders.
+
+    The slot's count in the date's summary is incremented with a single
+    conditional update, so two guests can't both get the last place.
+
+    Returns:
+        bool: True if a place was taken, False if the slot is full
+    """
+    try:
+        orders_table.update_item(
+            Key={"bk_yyyy-mm-dd": DATES_PARTITION, "roomnumber-name": delivery_date},
+            UpdateExpression="ADD #slot :one",
+            ConditionExpression="attribute_not_exists(#slot) OR #slot < :capacity",
+            ExpressionAttributeNames={"#slot": SLOT_PREFIX + time_slot},
+            ExpressionAttributeValues={":one": 1, ":capacity": SLOT_CAPACITY}
+        )
+        return True
+    except orders_table.meta.client.exceptions.ConditionalCheckFailedException:
+        return False
+
+
+def release_slot(delivery_date, time_slot):
+    """Give back a place taken by reserve_slot for an order that wasn't saved"""
+    try:
+        orders_table.update_item(
+            Key={"bk_yyyy-mm-dd": DATES_PARTITION, "roomnumber-name": delivery_date},
+            UpdateExpression="ADD #slot :minus_one",
+            ExpressionAttributeNames={"#slot": SLOT_PREFIX + time_slot},
+            ExpressionAttributeValues={":minus_one": -1}
+        )
+    except Exception as e:
+        # check_summaries.py --fix corrects the count
+        print(f"Error releasing time slot {time_slot} on {delivery_date}: {e}")
+
+
+def has_order_in_slot(order_key, time_slot):
+    """Whether the guest's saved order is already for this time, so replacing it needs no new place"""
+    order = orders_table.get_item(Key=order_key, ProjectionExpression="order_data").get("Item")
+    order_data = stored_order_data(order) if order else None
+    return bool(order_data) and order_data.get("scheduling", {}).get("time") == time_slot
+
+
+def update_summary(delivery_date, order_data, previous_order=None, reserved_slot=None):
+    """
+    Apply an order to its date's kitchen summary (see breakfast.summary).
+
+    Adds the new order's counts and takes away those of the order it
+    replaced, so a resubmitted order leaves orderCount unchanged.
+
+    Args:
+        delivery_date (str): Date in YYYY-MM-DD format
+        order_data (dict): The order as saved
+        previous_order (dict): The item it replaced, or None for a new order
+        reserved_slot (str): Time slot already counted by reserve_slot
+    """
+    previous_order_data = stored_order_data(previous_order) if previous_order else None
+
+    delta = summary_delta(order_data, previous_order_data)
+    if reserved_slot:
+        name = SLOT_PREFIX + reserved_slot
+        delta[name] = delta.get(name, 0) - 1
+        delta = {name: change for name, change in delta.items() if change}
+    if not delta:
+        return
+    orders_table.update_item(
+        Key={"bk_yyyy-mm-dd": DATES_PARTITION, "roomnumber-name": delivery_date},
+        **summary_update(delta)
+    )
 
-    # For local testing with LocalStack or DynamoDB Local, uncomment this:
-    # endpoint_url = os.environ.get('DYNAMODB_ENDPOINT', None)
-    # if endpoint_url:
-    #     return boto3.resource('dynamodb', region_name=region, endpoint_url=endpoint_url)
 
-    return boto3.resource('dynamodb', region_name=region)
 def lambda_handler(event, context):
     # Handle CORS preflight OPTIONS request for Function URLs
     if event.get("requestContext", {}).get("http", {}).get("method") == "OPTIONS":
@@ -23,7 +431,7 @@ def lambda_handler(event, context):
             "headers": {
                 "Access-Control-Allow-Origin": "*",
                 "Access-Control-Allow-Methods": "POST, OPTIONS",
-                "Access-Control-Allow-Headers": "Content-Type, Authorization",
+                "Access-Control-Allow-Headers": "Content-Type, Authorization, Idempotency-Key",
                 "Access-Control-Max-Age": "86400"
             },
             "body": json.dumps({"message": "CORS preflight successful"})
@@ -53,29 +461,43 @@ def lambda_handler(event, context):
         }
     print("Recieved request, data: " + json.dumps(body))
 
-    # Initialize DynamoDB
-    dynamo = get_dynamodb_resource()
-
-    print("Checking authentication")
-    print("Getting all valid credentials from Dynamo")
+    # Reject malformed orders before any AWS call
     try:
-        table = dynamo.Table('benfen-tokens')
+        order_data = normalize_order(body)
+    except OrderValidationError as e:
+        print(f"Invalid order: {e}")
+        return {
+            "statusCode": 400,
+            "headers": {
+                "Access-Control-Allow-Headers": "Content-Type, Authorization"
+            },
+            "body": json.dumps({"error": f"Invalid order: {e}", "field": e.path})
+        }
 
-        # Get all tokens from the table
-        response = table.scan()
-        items = response['Items']
+    idempotency_key = get_idempotency_key(event, body)
+    if idempotency_key is not None and (not isinstance(idempotency_key, str)
+                                        or len(idempotency_key) > IDEMPOTENCY_KEY_MAX_LENGTH):
+        return {
+            "statusCode": 400,
+            "headers": {
+                "Access-Control-Allow-Headers": "Content-Type, Authorization"
+            },
+            "body": json.dumps({"error": f"Idempotency key must be a string of at most {IDEMPOTENCY_KEY_MAX_LENGTH} characters"})
+        }
 
-        if items:
-            print(f"Found {len(items)} credentials in database")
-            # Extract all valid tokens
-            valid_tokens = [item.get('token') for item in items if item.get('token')]
-            print(f"Valid tokens available: {len(valid_tokens)}")
-        else:
-            print("No items found in table")
-            valid_tokens = []
+    # Only guests with an accepted token get as far as the idempotency table
+    token = (body.get("urlParameters") or {}).get("t")
+    rejection = authenticate(token)
+    if rejection is not None:
+        return rejection
+
+    if idempotency_key is None:
+        return place_order(order_data)
 
+    try:
+        outcome, record = claim_idempotency_key(idempotency_key, request_fingerprint(token, order_data))
     except Exception as e:
-        print(f"Error getting credentials from DynamoDB: {e}")
+        print(f"Error checking idempotency key {idempotency_key}: {e}")
         return {
             "statusCode": 500,
             "headers": {
@@ -83,24 +505,47 @@ def lambda_handler(event, context):
             },
             "body": json.dumps({"error": "Database error"})
         }
-    # Check if we have any valid tokens
-    if not valid_tokens:
-        print("No valid credentials found")
+    print(json.dumps({"event": "idempotency", "key": idempotency_key, "outcome": outcome}))
+
+    if outcome == "replay":
+        response = json.loads(record["response"])
+        response["headers"] = {**response.get("headers", {}), "Idempotent-Replayed": "true"}
+        return response
+    if outcome == "mismatch":
         return {
-            "statusCode": 500,
+            "statusCode": 422,
             "headers": {
                 "Access-Control-Allow-Headers": "Content-Type, Authorization"
             },
-            "body": json.dumps({"error": "Database error (no valid credentials)"})
+            "body": json.dumps({"error": "This idempotency key was already used for a different order"})
+        }
+    if outcome == "in_progress":
+        return {
+            "statusCode": 409,
+            "headers": {
+                "Access-Control-Allow-Headers": "Content-Type, Authorization",
+                "Retry-After": "2"
+            },
+            "body": json.dumps({"error": "This order is still being processed. Please try again in a moment."})
         }
 
-    # Validate the provided token against all valid tokens
-    params = body["urlParameters"]
-    token = params["t"]
+    response = place_order(order_data)
+    store_idempotent_response(idempotency_key, response)
+    return response
+
+
+def authenticate(token):
+    """
+    Check the QR token a request was sent with.
+
+    Args:
+        token (str): The `t` URL parameter, or None
 
-    if token not in valid_tokens:
-        print(f"Attempt to order breakfast with invalid token: {token}")
-        print(f"Valid tokens: {valid_tokens}")
+    Returns:
+        dict: Function URL response refusing the request, or None if the token is accepted
+    """
+    if not token:
+        print("Attempt to order breakfast without a token")
         return {
             "statusCode": 401,
             "headers": {
@@ -109,184 +554,112 @@ def lambda_handler(event, context):
             "body": json.dumps({"error": "Unauthorized. Try re-scanning the QR Code, or the QR code may have expired."})
         }
 
-    print(f"Token validated successfully: {token}")
-
-    data = body
-    customer = data["customer"]
-    roomnum = customer["roomNumber"]
-    name = customer["firstName"]
-    roomnum
-    eggs = data["eggs"]
-    eggStyle = eggs["style"]
-    if eggStyle == "over":
-        overStyle = eggs["overStyle"]
-    else:
-        overStyle = None
-    pancakesmeta = data["pancakes"]
-    if pancakesmeta["selected"] == True:
-        pancakes = True
-    else:
-        pancakes = False
-    if pancakes:
-        pancaketoppings = pancakesmeta["toppings"]
-        pancakeberries = pancaketoppings["berries"]
-        pancakebacon = pancaketoppings["bacon"]
-        pancakecream = pancaketoppings["whippedCream"]
-    wafflesmeta = data["waffles"]
-    if wafflesmeta["selected"] == True:
-        waffles = True
-    else:
-        waffles = False
-    if waffles:
-        wafflestoppings = wafflesmeta["options"]
-        wafflesberries = wafflestoppings["berries"]
-        wafflesbacon = wafflestoppings["bacon"]
-        wafflescream = wafflestoppings["whippedCream"]
-    pass
-    sides = data["sides"]
-    bacon = sides["bacon"]
-    homeFries = sides["homeFries"]
-    beans = sides["beans"]
-    toast = sides["toast"]
-    toastselected = toast["selected"]
-    if toastselected:
-        breadType = toast["breadType"]
-    
-    # Extract drinks information
-    drinks = data["drinks"]
-    water = drinks["water"]
-    milk = drinks["milk"]
-    juice = drinks["juice"]
-    juiceselected = juice["selected"]
-    if juiceselected:
-        juiceType = juice["juiceType"]
-    coffee = drinks["coffee"]
-    tea = drinks["tea"]
-
-    # Extract scheduling information
-    scheduling = data["scheduling"]
-    delivery_date = scheduling["date"]
-    delivery_time = scheduling["time"]
-
-    # Extract special options
-    special_options = data.get("specialOptions", "").strip()
-
-    # Create order data object from extracted values
-    order_data = {
-        "customer": {
-            "firstName": customer.get("firstName"),
-            "roomNumber": roomnum
-        },
-        "eggs": {
-            "style": eggStyle
-        },
-        "pancakes": {
-            "selected": pancakes
-        },
-        "waffles": {
-            "selected": waffles
-        },
-        "sides": {
-            "bacon": bacon,
-            "homeFries": homeFries,
-            "beans": beans,
-            "toast": {
-                "selected": toastselected
-            }
-        },
-        "drinks": {
-            "water": water,
-            "milk": milk,
-            "juice": {
-                "selected": juiceselected
+    print("Checking authentication")
+    try:
+        accepted, token_outcome = check_token(token)
+    except Exception as e:
+        print(f"Error getting credentials from DynamoDB: {e}")
+        return {
+            "statusCode": 500,
+            "headers": {
+                "Access-Control-Allow-Headers": "Content-Type, Authorization"
             },
-            "coffee": coffee,
-            "tea": tea
-        },
-        "scheduling": {
-            "date": delivery_date,
-            "time": delivery_time
-        },
-        "specialOptions": special_options
-    }
+            "body": json.dumps({"error": "Database error"})
+        }
 
-    # Add conditional fields
-    if overStyle is not None:
-        order_data["eggs"]["overStyle"] = overStyle
+    print(json.dumps({"event": "token_check", "outcome": token_outcome, **token_cache_stats}))
 
-    if pancakes:
-        order_data["pancakes"]["toppings"] = {
-            "berries": pancakeberries,
-            "bacon": pancakebacon,
-            "whippedCream": pancakecream
+    if not accepted:
+        print(f"Attempt to order breakfast with invalid or expired token: {token}")
+        return {
+            "statusCode": 401,
+            "headers": {
+                "Access-Control-Allow-Headers": "Content-Type, Authorization"
+            },
+            "body": json.dumps({"error": "Unauthorized. Try re-scanning the QR Code, or the QR code may have expired."})
         }
 
-    if waffles:
-        order_data["waffles"]["options"] = {
-            "berries": wafflesberries,
-            "bacon": wafflesbacon,
-            "whippedCream": wafflescream
-        }
+    print(f"Token validated successfully: {token}")
+    return None
 
-    if toastselected:
-        order_data["sides"]["toast"]["breadType"] = breadType
-    
-    if juiceselected:
-        order_data["drinks"]["juice"]["juiceType"] = juiceType
+
+def place_order(order_data):
+    """
+    Save a validated order from a guest whose token was accepted.
+
+    Args:
+        order_data (dict): The order from normalize_order
+
+    Returns:
+        dict: Function URL response
+    """
+    customer = order_data["customer"]
+    roomnum = customer["roomNumber"]
+    name = customer["firstName"]
+    delivery_date = order_data["scheduling"]["date"]
 
     print("Processed order data:", json.dumps(order_data, indent=2))
 
     # Save order to DynamoDB
-    orders = dynamo.Table('benfen-breakfast')
 
     # Create partition key from delivery date
     partition_key = f"bk_{delivery_date}"
 
-    # Check if an order already exists for this room/name combination on this date
+    # One order per room/name combination on this date
     room_name_key = f"{roomnum}-{name}"
 
-    try:
-        # Query for existing orders with the same partition key and room-name combination
-        existing_response = orders.query(
-            KeyConditionExpression=boto3.dynamodb.conditions.Key('bk_yyyy-mm-dd').eq(partition_key) &
-                                 boto3.dynamodb.conditions.Key('roomnumber-name').eq(room_name_key)
-        )
-
-        # If an existing order is found, delete it first
-        if existing_response['Items']:
-            existing_order = existing_response['Items'][0]  # Should only be one due to primary key constraint
-            print(f"Found existing order for {room_name_key} on {delivery_date}, deleting it")
-
-            orders.delete_item(
-                Key={
-                    'bk_yyyy-mm-dd': partition_key,
-                    'roomnumber-name': room_name_key
-                }
-            )
-            print(f"Deleted existing order for {room_name_key}")
-        else:
-            print(f"No existing order found for {room_name_key} on {delivery_date}")
-
-    except Exception as e:
-        print(f"Error checking for existing orders: {e}")
-        # Continue with saving the new order even if check fails
-
     # Add metadata to order
-    import time
-    from decimal import Decimal
-
     order_item = {
         "bk_yyyy-mm-dd": partition_key,  # Partition key
         "roomnumber-name": room_name_key,  # Sort key
         "order_id": f"{int(time.time())}_{roomnum}",
         "order_data": order_data,
+        "format_version": ORDER_FORMAT_VERSION,
         "created_at": Decimal(str(time.time())),  # Convert float to Decimal
     }
 
+    # Scheduled time as minutes since midnight, so reports sort and compare times without re-parsing them
+    scheduled_minutes = time_minutes(order_data["scheduling"]["time"])
+    if scheduled_minutes is not None:
+        order_item["scheduled_minutes"] = scheduled_minutes
+
+    # Take a place in the time slot first, so a full slot is refused before anything is saved
+    time_slot = order_data["scheduling"]["time"]
+    reserved = False
+    if SLOT_CAPACITY > 0:
+        try:
+            reserved = reserve_slot(delivery_date, time_slot)
+            order_key = {"bk_yyyy-mm-dd": partition_key, "roomnumber-name": room_name_key}
+            if not reserved and not has_order_in_slot(order_key, time_slot):
+                print(f"Time slot {time_slot} on {delivery_date} is full")
+                return {
+                    "statusCode": 409,
+                    "headers": {
+                        "Access-Control-Allow-Headers": "Content-Type, Authorization"
+                    },
+                    "body": json.dumps({"error": "This breakfast time is fully booked. Please choose another time.",
+                                        "field": "scheduling.time"})
+                }
+        except Exception as e:
+            # Capacity is advisory; don't turn away an order because the check failed
+            print(f"Error checking capacity of {time_slot} on {delivery_date}: {e}")
+
     try:
-        orders.put_item(Item=order_item)
-        print(f"Order saved to DynamoDB with key: {partition_key}")
+        previous_order = upsert_order(order_item)
+    except orders_table.meta.client.exceptions.ConditionalCheckFailedException:
+        if reserved:
+            release_slot(delivery_date, time_slot)
+        print(f"A newer order for {room_name_key} on {delivery_date} is already saved")
+        return {
+            "statusCode": 409,
+            "headers": {
+                "Access-Control-Allow-Headers": "Content-Type, Authorization"
+            },
+            "body": json.dumps({"error": "A newer order has already been saved for this guest"})
+        }
     except Exception as e:
+        if reserved:
+            release_slot(delivery_date, time_slot)
         print(f"Error saving order to DynamoDB: {e}")
         return {
             "statusCode": 500,
@@ -296,6 +669,17 @@ def lambda_handler(event, context):
             "body": json.dumps({"error": "Failed to save order"})
         }
 
+    replaced = previous_order is not None
+    if replaced:
+        print(f"Replaced existing order for {room_name_key} on {delivery_date}")
+
+    try:
+        update_summary(delivery_date, order_data, previous_order, reserved_slot=time_slot if reserved else None)
+    except Exception as e:
+        # The order itself is saved; check_summaries.py --fix rebuilds the summary
+        print(f"Error updating summary for {delivery_date}: {e}")
+    print(f"Order saved to DynamoDB with key: {partition_key}")
+
     return {
         "statusCode": 200,
         "headers": {
@@ -304,6 +688,7 @@ def lambda_handler(event, context):
         "body": json.dumps({
             "message": "Order received and saved successfully",
             "order_id": order_item["order_id"],
+            "replaced": replaced,
             "customer": customer,
             "order": order_data
         })
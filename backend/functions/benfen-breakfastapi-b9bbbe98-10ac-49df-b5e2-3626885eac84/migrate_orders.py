@@ -0,0 +1,151 @@
+import argparse
+import json
+import os
+
+import boto3
+
+from breakfast.dynamo import ORDER_FORMAT_VERSION
+from migrate_tokens import ensure_ttl
+
+ORDERS_TABLE = os.environ.get('ORDERS_TABLE', 'benfen-breakfast')
+IDEMPOTENCY_TABLE = os.environ.get('IDEMPOTENCY_TABLE', 'benfen-idempotency')
+
+
+def scan_unversioned_orders(client, table_name=ORDERS_TABLE, date=None):
+    """
+    Yield order items that have no format_version, page by page.
+
+    Args:
+        client: boto3 DynamoDB client
+        table_name (str): Name of the orders table
+        date (str): Only read this date's partition (YYYY-MM-DD); all dates if None
+    """
+    kwargs = {
+        'TableName': table_name,
+        'FilterExpression': 'attribute_not_exists(format_version)',
+    }
+    if date:
+        operation = client.query
+        kwargs['KeyConditionExpression'] = '#pk = :pk'
+        kwargs['ExpressionAttributeNames'] = {'#pk': 'bk_yyyy-mm-dd'}
+        kwargs['ExpressionAttributeValues'] = {':pk': {'S': f"bk_{date}"}}
+    else:
+        # Skip the per-date count items kept alongside the orders
+        operation = client.scan
+        kwargs['FilterExpression'] += ' AND begins_with(#pk, :bk)'
+        kwargs['ExpressionAttributeNames'] = {'#pk': 'bk_yyyy-mm-dd'}
+        kwargs['ExpressionAttributeValues'] = {':bk': {'S': 'bk_'}}
+
+    while True:
+        response = operation(**kwargs)
+        yield from response.get('Items', [])
+        if 'LastEvaluatedKey' not in response:
+            break
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def backfill_order_format(client, table_name=ORDERS_TABLE, date=None, dry_run=False):
+    """
+    Rewrite format 1 orders, whose order_data is a string of DynamoDB JSON,
+    so that order_data is a native map, and stamp format_version on them.
+
+    The string already holds wire-format attributes, so it is decoded once
+    and written back as-is. Each update is conditional on created_at being
+    unchanged, so an order replaced by the kiosk while the job runs is left
+    alone.
+
+    Returns:
+        dict: Counts of 'converted', 'stamped' (already a map), 'skipped' and 'failed' items
+    """
+    counts = {'converted': 0, 'stamped': 0, 'skipped': 0, 'failed': 0}
+
+    for item in scan_unversioned_orders(client, table_name, date):
+        key = {'bk_yyyy-mm-dd': item['bk_yyyy-mm-dd'], 'roomnumber-name': item['roomnumber-name']}
+        label = f"{item['bk_yyyy-mm-dd']['S']} {item['roomnumber-name']['S']}"
+        order_data = item.get('order_data')
+
+        if order_data is None or 'M' in order_data:
+            outcome = 'stamped'
+            new_order_data = order_data
+        else:
+            try:
+                new_order_data = {'M': json.loads(order_data['S'])}
+            except (KeyError, json.JSONDecodeError) as e:
+                print(f"Can't convert order_data for {label}: {e}")
+                counts['failed'] += 1
+                continue
+            outcome = 'converted'
+
+        print(f"{'Would update' if dry_run else 'Updating'} {label} ({outcome})")
+        if dry_run:
+            counts[outcome] += 1
+            continue
+
+        update = {
+            'TableName': table_name,
+            'Key': key,
+            'UpdateExpression': 'SET format_version = :v',
+            'ConditionExpression': 'attribute_not_exists(format_version) AND attribute_not_exists(created_at)',
+            'ExpressionAttributeValues': {':v': {'N': str(ORDER_FORMAT_VERSION)}},
+        }
+        if 'created_at' in item:
+            update['ConditionExpression'] = 'attribute_not_exists(format_version) AND created_at = :created_at'
+            update['ExpressionAttributeValues'][':created_at'] = item['created_at']
+        if outcome == 'converted':
+            update['UpdateExpression'] = 'SET format_version = :v, order_data = :d'
+            update['ExpressionAttributeValues'][':d'] = new_order_data
+
+        try:
+            client.update_item(**update)
+            counts[outcome] += 1
+        except client.exceptions.ConditionalCheckFailedException:
+            print(f"{label} changed while migrating, skipped")
+            counts['skipped'] += 1
+
+    return counts
+
+
+def ensure_idempotency_table(client, table_name=IDEMPOTENCY_TABLE):
+    """
+    Create the table the order API keeps idempotent responses in.
+
+    Items are keyed by `idempotency_key` and deleted by TTL on `expires_at`,
+    so the table needs no cleanup.
+
+    Returns:
+        bool: True if the table was created, False if it already existed
+    """
+    try:
+        client.describe_table(TableName=table_name)
+        print(f"Table {table_name} already exists")
+        created = False
+    except client.exceptions.ResourceNotFoundException:
+        client.create_table(
+            TableName=table_name,
+            KeySchema=[{'AttributeName': 'idempotency_key', 'KeyType': 'HASH'}],
+            AttributeDefinitions=[{'AttributeName': 'idempotency_key', 'AttributeType': 'S'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        client.get_waiter('table_exists').wait(TableName=table_name)
+        print(f"Created table {table_name}")
+        created = True
+
+    ensure_ttl(client, table_name)
+    return created
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rewrite stored orders with order_data as a native map")
+    parser.add_argument('--date', help="Only migrate this date (YYYY-MM-DD)")
+    parser.add_argument('--dry-run', action='store_true')
+    parser.add_argument('--idempotency-table', action='store_true',
+                        help="Also create the table for idempotent order submission")
+    args = parser.parse_args()
+
+    region = os.environ.get('AWS_REGION', 'ca-central-1')
+    endpoint_url = os.environ.get('DYNAMODB_ENDPOINT')
+    client = boto3.client('dynamodb', region_name=region, endpoint_url=endpoint_url)
+    if args.idempotency_table and not args.dry_run:
+        ensure_idempotency_table(client)
+    counts = backfill_order_format(client, date=args.date, dry_run=args.dry_run)
+    print(", ".join(f"{count} {outcome}" for outcome, count in counts.items()))
@@ -0,0 +1,137 @@
+import argparse
+import os
+import time
+
+import boto3
+import boto3.dynamodb.conditions
+
+TOKENS_TABLE = os.environ.get('TOKENS_TABLE', 'benfen-tokens')
+TOKEN_INDEX_NAME = os.environ.get('TOKEN_INDEX_NAME', 'token-index')
+
+
+def ensure_token_index(client, table_name=TOKENS_TABLE, index_name=TOKEN_INDEX_NAME, wait=True):
+    """
+    Create the global secondary index on `token` used by the order API.
+
+    DynamoDB backfills a new index from the existing `type`/`created_at`
+    keyed items, so no items need to be rewritten for lookups to work.
+
+    Returns:
+        bool: True if the index was created, False if it already existed
+    """
+    table = client.describe_table(TableName=table_name)['Table']
+    existing = [index['IndexName'] for index in table.get('GlobalSecondaryIndexes', [])]
+    if index_name in existing:
+        print(f"Index {index_name} already exists on {table_name}")
+        return False
+
+    create = {
+        'IndexName': index_name,
+        'KeySchema': [{'AttributeName': 'token', 'KeyType': 'HASH'}],
+        'Projection': {'ProjectionType': 'ALL'},
+    }
+    # Provisioned tables need capacity for the new index as well
+    if table.get('BillingModeSummary', {}).get('BillingMode') != 'PAY_PER_REQUEST':
+        throughput = table['ProvisionedThroughput']
+        create['ProvisionedThroughput'] = {
+            'ReadCapacityUnits': throughput['ReadCapacityUnits'],
+            'WriteCapacityUnits': throughput['WriteCapacityUnits'],
+        }
+
+    client.update_table(
+        TableName=table_name,
+        AttributeDefinitions=[{'AttributeName': 'token', 'AttributeType': 'S'}],
+        GlobalSecondaryIndexUpdates=[{'Create': create}]
+    )
+    print(f"Creating index {index_name} on {table_name}")
+
+    while wait:
+        time.sleep(5)
+        table = client.describe_table(TableName=table_name)['Table']
+        status = next(index['IndexStatus'] for index in table['GlobalSecondaryIndexes']
+                      if index['IndexName'] == index_name)
+        print(f"Index status: {status}")
+        wait = status != 'ACTIVE'
+
+    return True
+
+
+def ensure_ttl(client, table_name=TOKENS_TABLE, attribute='expires_at'):
+    """
+    Turn on DynamoDB TTL for a table (the tokens table by default), keyed on `expires_at`.
+
+    Expired tokens (and deny-list entries) are then deleted by DynamoDB at
+    no cost, instead of by a scheduled sweep. migrate_orders.py uses it for
+    the idempotency table too.
+
+    Returns:
+        bool: True if TTL was turned on, False if it already was
+    """
+    ttl = client.describe_time_to_live(TableName=table_name)['TimeToLiveDescription']
+    if ttl.get('TimeToLiveStatus') in ('ENABLED', 'ENABLING'):
+        print(f"TTL already on for {table_name} ({ttl.get('AttributeName')})")
+        return False
+
+    client.update_time_to_live(
+        TableName=table_name,
+        TimeToLiveSpecification={'Enabled': True, 'AttributeName': attribute}
+    )
+    print(f"Turned on TTL for {table_name} on {attribute}")
+    return True
+
+
+def backfill_expiry(table, max_age_days, dry_run=False):
+    """
+    Stamp `expires_at` on token items issued before it was written at issue time.
+
+    Args:
+        table: boto3 Table resource for the tokens table
+        max_age_days (float): Validity period counted from `created_at`
+        dry_run (bool): Report the items without updating them
+
+    Returns:
+        int: Number of items updated (or that would be updated)
+    """
+    key_condition = boto3.dynamodb.conditions.Key('type').eq('token')
+    kwargs = {'KeyConditionExpression': key_condition}
+    updated = 0
+
+    while True:
+        response = table.query(**kwargs)
+        for item in response['Items']:
+            if 'expires_at' in item:
+                continue
+            expires_at = int(float(item['created_at']) + max_age_days * 86400)
+            print(f"{'Would set' if dry_run else 'Setting'} expires_at={expires_at} "
+                  f"on token created at {item['created_at']}")
+            if not dry_run:
+                table.update_item(
+                    Key={'type': item['type'], 'created_at': item['created_at']},
+                    UpdateExpression='SET expires_at = :e',
+                    ExpressionAttributeValues={':e': expires_at}
+                )
+            updated += 1
+
+        if 'LastEvaluatedKey' not in response:
+            break
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    return updated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate the token table to indexed lookups and TTL expiry")
+    parser.add_argument('--max-age-days', type=float, default=None,
+                        help="Also stamp expires_at on existing tokens, counted from created_at")
+    parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args()
+
+    region = os.environ.get('AWS_REGION', 'ca-central-1')
+    if not args.dry_run:
+        client = boto3.client('dynamodb', region_name=region)
+        ensure_token_index(client)
+        ensure_ttl(client)
+    if args.max_age_days is not None:
+        tokens = boto3.resource('dynamodb', region_name=region).Table(TOKENS_TABLE)
+        count = backfill_expiry(tokens, args.max_age_days, dry_run=args.dry_run)
+        print(f"{count} token(s) {'need' if args.dry_run else 'updated with'} expires_at")
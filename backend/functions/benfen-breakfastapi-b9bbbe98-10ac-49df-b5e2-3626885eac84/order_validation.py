@@ -0,0 +1,277 @@
+"""
+Order payload validation for the order intake Lambda.
+
+order.schema.json is compiled once at import into nested checks, so a
+malformed order is rejected before any AWS call is made. Only the parts
+of JSON Schema that the order schema uses are supported.
+"""
+import datetime
+import json
+import os
+import re
+
+from breakfast.orders import time_minutes
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), 'order.schema.json')
+
+_PYTHON_TYPES = {
+    'object': dict,
+    'string': str,
+    'boolean': bool,
+    'integer': int,
+    'null': type(None),
+}
+
+
+class OrderValidationError(ValueError):
+    """Raised when an order payload doesn't match the schema"""
+
+    def __init__(self, path, message):
+        super().__init__(f"{path}: {message}" if path else message)
+        self.path = path
+
+
+def _join(path, key):
+    return f"{path}.{key}" if path else key
+
+
+def compile_schema(schema, root=None, path=""):
+    """
+    Compile a JSON Schema (subset) into a validation function.
+
+    Field paths are worked out here rather than per call, so validating
+    a payload only runs the checks themselves.
+
+    Args:
+        schema (dict): Schema, or sub-schema of `root`
+        root (dict): Top-level schema used to resolve "#/definitions/..." refs
+        path (str): Dotted path of the value this schema applies to
+
+    Returns:
+        function: validate(value) raising OrderValidationError
+    """
+    root = root or schema
+    if '$ref' in schema:
+        target = root
+        for part in schema['$ref'].lstrip('#/').split('/'):
+            target = target[part]
+        return compile_schema(target, root, path)
+
+    checks = []
+
+    if 'type' in schema:
+        types = schema['type'] if isinstance(schema['type'], list) else [schema['type']]
+        python_types = tuple(_PYTHON_TYPES[t] for t in types)
+        # bool is a subclass of int, but true/false aren't JSON integers
+        reject_bool = 'integer' in types and 'boolean' not in types
+        expected = ' or '.join(types)
+
+        def check_type(value):
+            if not isinstance(value, python_types) or (reject_bool and isinstance(value, bool)):
+                raise OrderValidationError(path, f"expected {expected}")
+        checks.append(check_type)
+
+    if 'const' in schema:
+        const = schema['const']
+
+        def check_const(value):
+            if value != const or type(value) is not type(const):
+                raise OrderValidationError(path, f"must be {json.dumps(const)}")
+        checks.append(check_const)
+
+    if 'enum' in schema:
+        allowed = frozenset(schema['enum'])
+        allowed_text = ', '.join(json.dumps(v) for v in schema['enum'])
+
+        def check_enum(value):
+            try:
+                valid = value in allowed
+            except TypeError:  # unhashable, so not one of the allowed values
+                valid = False
+            if not valid:
+                raise OrderValidationError(path, f"must be one of {allowed_text}")
+        checks.append(check_enum)
+
+    if 'pattern' in schema:
+        pattern = re.compile(schema['pattern'])
+
+        def check_pattern(value):
+            if isinstance(value, str) and not pattern.search(value):
+                raise OrderValidationError(path, f"does not match {pattern.pattern}")
+        checks.append(check_pattern)
+
+    if 'minLength' in schema or 'maxLength' in schema:
+        min_length = schema.get('minLength', 0)
+        max_length = schema.get('maxLength')
+
+        def check_length(value):
+            if not isinstance(value, str):
+                return
+            # Whitespace doesn't count towards the minimum, so "  " is still missing
+            if len(value.strip()) < min_length:
+                raise OrderValidationError(path, "is required")
+            if max_length is not None and len(value) > max_length:
+                raise OrderValidationError(path, f"must be at most {max_length} characters")
+        checks.append(check_length)
+
+    if 'minimum' in schema or 'maximum' in schema:
+        minimum = schema.get('minimum')
+        maximum = schema.get('maximum')
+
+        def check_range(value):
+            if minimum is not None and value < minimum:
+                raise OrderValidationError(path, f"must be at least {minimum}")
+            if maximum is not None and value > maximum:
+                raise OrderValidationError(path, f"must be at most {maximum}")
+        checks.append(check_range)
+
+    if 'required' in schema:
+        required = tuple(schema['required'])
+
+        def check_required(value):
+            for key in required:
+                if key not in value:
+                    raise OrderValidationError(_join(path, key), "is required")
+        checks.append(check_required)
+
+    if 'properties' in schema:
+        properties = tuple((key, compile_schema(sub, root, _join(path, key)))
+                           for key, sub in schema['properties'].items())
+
+        def check_properties(value):
+            for key, validate_property in properties:
+                if key in value:
+                    validate_property(value[key])
+        checks.append(check_properties)
+
+    if 'if' in schema and 'then' in schema:
+        condition = compile_schema(schema['if'], root, path)
+        then = compile_schema(schema['then'], root, path)
+
+        def check_conditional(value):
+            try:
+                condition(value)
+            except OrderValidationError:
+                return
+            then(value)
+        checks.append(check_conditional)
+
+    if len(checks) == 1:
+        return checks[0]
+    checks = tuple(checks)
+
+    def validate(value):
+        for check in checks:
+            check(value)
+
+    return validate
+
+
+def load_schema(path=SCHEMA_PATH):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+validate_order = compile_schema(load_schema())
+
+
+def normalize_order(data):
+    """
+    Validate an order payload and reduce it to the fields that are stored.
+
+    Options for unselected dishes and drinks are dropped, as is the egg
+    doneness unless eggs are ordered "over". The schema only checks the
+    shape of the date and time, so they are also checked here to be a real
+    calendar date and a time of day the kitchen reports can place.
+
+    Args:
+        data (dict): Parsed request body
+
+    Returns:
+        dict: Order data as saved in the orders table
+
+    Raises:
+        OrderValidationError: The payload doesn't match the order schema
+    """
+    validate_order(data)
+
+    scheduling = data["scheduling"]
+    try:
+        datetime.date.fromisoformat(scheduling["date"])
+    except ValueError:
+        raise OrderValidationError("scheduling.date", "is not a valid date") from None
+    if time_minutes(scheduling["time"]) is None:
+        raise OrderValidationError("scheduling.time", "is not a valid time")
+
+    customer = data["customer"]
+    eggs = data["eggs"]
+    pancakes = data["pancakes"]
+    waffles = data["waffles"]
+    sides = data["sides"]
+    toast = sides["toast"]
+    drinks = data["drinks"]
+    juice = drinks["juice"]
+
+    order_data = {
+        "customer": {
+            "firstName": customer["firstName"].strip(),
+            "roomNumber": customer["roomNumber"]
+        },
+        "eggs": {
+            "style": eggs["style"]
+        },
+        "pancakes": {
+            "selected": pancakes["selected"]
+        },
+        "waffles": {
+            "selected": waffles["selected"]
+        },
+        "sides": {
+            "bacon": sides["bacon"],
+            "homeFries": sides["homeFries"],
+            "beans": sides["beans"],
+            "toast": {
+                "selected": toast["selected"]
+            }
+        },
+        "drinks": {
+            "water": drinks["water"],
+            "milk": drinks["milk"],
+            "juice": {
+                "selected": juice["selected"]
+            },
+            "coffee": drinks["coffee"],
+            "tea": drinks["tea"]
+        },
+        "scheduling": {
+            "date": scheduling["date"],
+            "time": scheduling["time"]
+        },
+        "specialOptions": data.get("specialOptions", "").strip()
+    }
+
+    # Add conditional fields
+    if eggs["style"] == "over":
+        order_data["eggs"]["overStyle"] = eggs["overStyle"]
+
+    if pancakes["selected"]:
+        order_data["pancakes"]["toppings"] = {
+            "berries": pancakes["toppings"]["berries"],
+            "bacon": pancakes["toppings"]["bacon"],
+            "whippedCream": pancakes["toppings"]["whippedCream"]
+        }
+
+    if waffles["selected"]:
+        order_data["waffles"]["options"] = {
+            "berries": waffles["options"]["berries"],
+            "bacon": waffles["options"]["bacon"],
+            "whippedCream": waffles["options"]["whippedCream"]
+        }
+
+    if toast["selected"]:
+        order_data["sides"]["toast"]["breadType"] = toast["breadType"]
+
+    if juice["selected"]:
+        order_data["drinks"]["juice"]["juiceType"] = juice["juiceType"]
+
+    return order_data
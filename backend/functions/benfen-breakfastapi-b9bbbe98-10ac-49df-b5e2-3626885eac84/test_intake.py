@@ -0,0 +1,315 @@
+import importlib.util
+import json
+import os
+import time
+
+import pytest
+
+moto = pytest.importorskip("moto")
+boto3 = pytest.importorskip("boto3")
+
+from breakfast.tokens import decode_token, load_keys, revocation_item, sign_token  # noqa: E402
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SIGNING_KEYS = '{"k1": "test secret"}'
+NOW = int(time.time())
+
+ORDER = {
+    "customer": {"firstName": "Guest", "roomNumber": 12},
+    "scheduling": {"date": "2025-08-05", "time": "08:00"},
+    "eggs": {"style": "over", "overStyle": "easy"},
+    "pancakes": {"selected": True, "toppings": {"berries": True, "bacon": False, "whippedCream": False}},
+    "waffles": {"selected": False, "options": {"berries": False, "bacon": False, "whippedCream": False}},
+    "sides": {"bacon": True, "homeFries": True, "beans": False, "toast": {"selected": True, "breadType": "white"}},
+    "drinks": {"water": False, "milk": False, "juice": {"selected": True, "juiceType": "apple"},
+               "coffee": True, "tea": False},
+    "specialOptions": ""
+}
+
+
+def signed_token(issued_at=NOW - 60, expires_at=NOW + 86400):
+    return sign_token(load_keys(SIGNING_KEYS), 'k1', issued_at, expires_at)
+
+
+@pytest.fixture
+def intake(monkeypatch):
+    monkeypatch.setenv('AWS_ACCESS_KEY_ID', 'testing')
+    monkeypatch.setenv('AWS_SECRET_ACCESS_KEY', 'testing')
+    monkeypatch.setenv('AWS_REGION', 'ca-central-1')
+    monkeypatch.setenv('TOKEN_SIGNING_KEYS', SIGNING_KEYS)
+    monkeypatch.delenv('DYNAMODB_ENDPOINT', raising=False)
+    monkeypatch.syspath_prepend(HERE)
+    with moto.mock_aws():
+        dynamo = boto3.resource('dynamodb', region_name='ca-central-1')
+        dynamo.create_table(
+            TableName='benfen-tokens',
+            KeySchema=[{'AttributeName': 'type', 'KeyType': 'HASH'},
+                       {'AttributeName': 'created_at', 'KeyType': 'RANGE'}],
+            AttributeDefinitions=[{'AttributeName': 'type', 'AttributeType': 'S'},
+                                  {'AttributeName': 'created_at', 'AttributeType': 'S'},
+                                  {'AttributeName': 'token', 'AttributeType': 'S'}],
+            GlobalSecondaryIndexes=[{'IndexName': 'token-index',
+                                     'KeySchema': [{'AttributeName': 'token', 'KeyType': 'HASH'}],
+                                     'Projection': {'ProjectionType': 'ALL'}}],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        dynamo.create_table(
+            TableName='benfen-breakfast',
+            KeySchema=[{'AttributeName': 'bk_yyyy-mm-dd', 'KeyType': 'HASH'},
+                       {'AttributeName': 'roomnumber-name', 'KeyType': 'RANGE'}],
+            AttributeDefinitions=[{'AttributeName': 'bk_yyyy-mm-dd', 'AttributeType': 'S'},
+                                  {'AttributeName': 'roomnumber-name', 'AttributeType': 'S'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        import migrate_orders
+        migrate_orders.ensure_idempotency_table(dynamo.meta.client)
+
+        spec = importlib.util.spec_from_file_location('intake_lambda', os.path.join(HERE, 'lambda.py'))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        yield module
+
+
+def issue_token(intake, token, **attributes):
+    item = {'type': 'token', 'created_at': str(time.time()), 'token': token}
+    intake.tokens_table.put_item(Item=dict(item, **attributes))
+
+
+def post(intake, order=None, token=None, **changes):
+    status, body, _ = send(intake, dict(order or ORDER, **changes), token)
+    return status, body
+
+
+def send(intake, body, token=None, headers=None):
+    if token is not None:
+        body = dict(body, urlParameters={'t': token})
+    event = {'httpMethod': 'POST', 'body': json.dumps(body)}
+    if headers:
+        event['headers'] = headers
+    response = intake.lambda_handler(event, None)
+    return response['statusCode'], json.loads(response['body']), response.get('headers', {})
+
+
+def idempotency_record(intake, key):
+    return intake.idempotency_table.get_item(Key={'idempotency_key': key}).get('Item')
+
+
+def summary(intake, date='2025-08-05'):
+    return intake.orders_table.get_item(Key={'bk_yyyy-mm-dd': 'dates', 'roomnumber-name': date}).get('Item', {})
+
+
+def test_tokens_are_accepted_and_rejected(intake):
+    issue_token(intake, 'issuedtoken', expires_at=NOW + 3600)
+    issue_token(intake, 'expiredtoken', expires_at=NOW - 1)
+    issue_token(intake, 'futuretoken', valid_from=NOW + 3600, expires_at=NOW + 7200)
+
+    assert post(intake, token='issuedtoken')[0] == 200
+    assert post(intake, token=signed_token())[0] == 200
+    for token in ('', 'unknowntoken', 'expiredtoken', 'futuretoken', signed_token(expires_at=NOW - 1),
+                  signed_token(issued_at=NOW + 3600), signed_token()[:-4] + 'AAAA'):
+        assert post(intake, token=token)[0] == 401, token
+    assert post(intake)[0] == 401
+
+
+def test_token_age_falls_back_to_created_at(intake, monkeypatch):
+    item = {'type': 'token', 'created_at': str(NOW - 10 * 86400), 'token': 'oldtoken'}
+
+    assert intake.token_is_current(item, NOW)
+    monkeypatch.setattr(intake, 'TOKEN_MAX_AGE_DAYS', 30)
+    assert intake.token_is_current(item, NOW)
+    monkeypatch.setattr(intake, 'TOKEN_MAX_AGE_DAYS', 7)
+    assert not intake.token_is_current(item, NOW)
+    # expires_at wins over the age limit
+    assert intake.token_is_current(dict(item, expires_at=NOW + 60), NOW)
+
+
+def test_unknown_tokens_are_cached_briefly(intake):
+    table = intake.tokens_table
+
+    assert intake.get_token_item(table, 'badtoken', NOW) == (None, 'miss')
+    assert intake.get_token_item(table, 'badtoken', NOW + 1) == (None, 'recheck')
+    assert intake.get_token_item(table, 'badtoken', NOW + 2) == (None, 'negative_hit')
+    assert intake.get_token_item(table, 'badtoken', NOW + intake.TOKEN_NEGATIVE_CACHE_TTL_SECONDS)[1] == 'miss'
+    assert intake.token_cache_stats == {'hits': 0, 'misses': 2, 'negative_hits': 1, 'rechecks': 1}
+
+
+def test_token_issued_after_a_failed_lookup_is_accepted(intake):
+    table = intake.tokens_table
+
+    assert post(intake, token='latetoken')[0] == 401
+    issue_token(intake, 'latetoken')
+    assert post(intake, token='latetoken')[0] == 200
+
+    assert intake.get_token_item(table, 'latetoken', NOW + 60)[1] == 'hit'
+    assert intake.get_token_item(table, 'latetoken', NOW + intake.TOKEN_CACHE_TTL_SECONDS + 60)[1] == 'miss'
+
+
+def test_revoked_tokens_are_rejected_once_the_deny_list_is_reread(intake):
+    token = signed_token()
+    assert post(intake, token=token)[0] == 200
+
+    claims = decode_token(load_keys(SIGNING_KEYS), token)
+    intake.tokens_table.put_item(Item=revocation_item(claims, NOW))
+    assert intake.check_token(token, NOW) == (True, 'signed')
+    assert intake.check_token(token, NOW + 2 * intake.DENY_LIST_TTL_SECONDS) == (False, 'revoked')
+
+    intake.clear_token_cache()
+    assert post(intake, token=token)[0] == 401
+
+
+@pytest.mark.parametrize('change, field', [
+    ({'customer': {'firstName': '', 'roomNumber': 12}}, 'customer.firstName'),
+    ({'customer': {'firstName': 'Guest', 'roomNumber': '12'}}, 'customer.roomNumber'),
+    ({'scheduling': {'date': '5 August', 'time': '08:00'}}, 'scheduling.date'),
+    ({'scheduling': {'date': '2025-13-45', 'time': '08:00'}}, 'scheduling.date'),
+    ({'scheduling': {'date': '2025-08-05', 'time': 'banana'}}, 'scheduling.time'),
+    ({'eggs': {'style': 'over'}}, 'eggs.overStyle'),
+    ({'clientRequestId': ''}, 'clientRequestId'),
+])
+def test_invalid_orders_are_rejected_before_the_token_check(intake, change, field):
+    status, body = post(intake, token='unknowntoken', **change)
+
+    assert status == 400 and body['field'] == field
+    assert intake.token_cache_stats['misses'] == 0
+
+
+def test_names_are_stored_without_surrounding_spaces(intake):
+    post(intake, token=signed_token(), customer={'firstName': ' Guest  ', 'roomNumber': 12})
+
+    item = intake.orders_table.get_item(Key={'bk_yyyy-mm-dd': 'bk_2025-08-05', 'roomnumber-name': '12-Guest'})['Item']
+    assert item['order_data']['customer']['firstName'] == 'Guest'
+
+
+def test_newer_order_is_not_replaced(intake):
+    token = signed_token()
+    intake.orders_table.put_item(Item={'bk_yyyy-mm-dd': 'bk_2025-08-05', 'roomnumber-name': '12-Guest',
+                                       'created_at': NOW + 3600, 'order_data': {}})
+
+    status, body = post(intake, token=token)
+
+    assert status == 409 and 'newer order' in body['error']
+    assert summary(intake) == {}
+
+
+def test_resubmitted_order_replaces_the_first(intake):
+    token = signed_token()
+
+    assert post(intake, token=token)[1]['replaced'] is False
+    status, body = post(intake, token=token, specialOptions='No onions')
+
+    assert status == 200 and body['replaced'] is True
+    assert summary(intake)['orderCount'] == 1
+    assert intake.orders_table.scan()['Count'] == 2  # the order and its date's summary
+
+
+def test_full_slot_refuses_orders_until_one_moves_away(intake, monkeypatch):
+    monkeypatch.setattr(intake, 'SLOT_CAPACITY', 1)
+    token = signed_token()
+    other_guest = {'firstName': 'Other', 'roomNumber': 14}
+
+    assert post(intake, token=token)[0] == 200
+    # Resubmitting in the same slot needs no new place
+    assert post(intake, token=token, specialOptions='Extra crispy')[0] == 200
+
+    status, body = post(intake, token=token, customer=other_guest)
+    assert status == 409 and body['field'] == 'scheduling.time'
+    assert summary(intake)['slot:08:00'] == 1
+
+    # Moving the first guest to 07:00 gives back the 08:00 place
+    assert post(intake, token=token, scheduling={'date': '2025-08-05', 'time': '07:00'})[0] == 200
+    assert summary(intake)['slot:08:00'] == 0 and summary(intake)['slot:07:00'] == 1
+    assert post(intake, token=token, customer=other_guest)[0] == 200
+    assert summary(intake)['orderCount'] == 2
+
+
+def test_slot_is_released_when_the_order_is_not_saved(intake, monkeypatch):
+    monkeypatch.setattr(intake, 'SLOT_CAPACITY', 1)
+    intake.orders_table.put_item(Item={'bk_yyyy-mm-dd': 'bk_2025-08-05', 'roomnumber-name': '12-Guest',
+                                       'created_at': NOW + 3600, 'order_data': {}})
+
+    assert post(intake, token=signed_token())[0] == 409
+    assert summary(intake)['slot:08:00'] == 0
+
+
+def test_retried_order_replays_the_first_response(intake):
+    token = signed_token()
+    body = dict(ORDER, clientRequestId='request-1')
+
+    status, first, headers = send(intake, body, token)
+    assert status == 200 and 'Idempotent-Replayed' not in headers
+    assert idempotency_record(intake, 'request-1')['status'] == 'done'
+
+    status, replayed, headers = send(intake, body, token)
+    assert status == 200 and headers['Idempotent-Replayed'] == 'true'
+    assert replayed == first
+    assert summary(intake)['orderCount'] == 1
+
+    # The header works too, in any case
+    other = dict(ORDER, customer={'firstName': 'Other', 'roomNumber': 14})
+    assert send(intake, other, token, {'idempotency-key': 'request-2'})[0] == 200
+    assert send(intake, other, token, {'Idempotency-Key': 'request-2'})[2]['Idempotent-Replayed'] == 'true'
+
+
+def test_idempotency_key_reused_for_another_order_is_refused(intake):
+    token = signed_token()
+    assert send(intake, dict(ORDER, clientRequestId='request-1'), token)[0] == 200
+
+    status, body, _ = send(intake, dict(ORDER, clientRequestId='request-1', specialOptions='Extra toast'), token)
+
+    assert status == 422 and 'different order' in body['error']
+    assert send(intake, ORDER, token, {'Idempotency-Key': 'x' * 129})[0] == 400
+
+
+def test_key_held_by_a_running_request_until_its_lease_lapses(intake):
+    token = signed_token()
+    body = dict(ORDER, clientRequestId='request-1')
+    fingerprint = intake.request_fingerprint(token, intake.normalize_order(body))
+    intake.idempotency_table.put_item(Item={'idempotency_key': 'request-1', 'status': 'pending',
+                                            'fingerprint': fingerprint, 'expires_at': NOW + 3600})
+
+    status, _, headers = send(intake, body, token)
+    assert status == 409 and headers['Retry-After'] == '2'
+    assert summary(intake) == {}
+
+    # A request that died leaves a lease that lapses
+    intake.idempotency_table.update_item(Key={'idempotency_key': 'request-1'}, UpdateExpression='SET expires_at = :e',
+                                         ExpressionAttributeValues={':e': NOW - 1})
+    assert send(intake, body, token)[0] == 200
+    assert idempotency_record(intake, 'request-1')['status'] == 'done'
+
+
+def test_unsuccessful_responses_release_the_key(intake, monkeypatch):
+    token = signed_token()
+    body = dict(ORDER, clientRequestId='request-1')
+    upsert_order = intake.upsert_order
+
+    def failing_upsert_order(order_item):
+        raise RuntimeError("DynamoDB unavailable")
+
+    monkeypatch.setattr(intake, 'upsert_order', failing_upsert_order)
+    assert send(intake, body, token)[0] == 500
+    assert idempotency_record(intake, 'request-1') is None
+
+    # A full slot isn't replayed either, so the same order succeeds once a place frees up
+    monkeypatch.setattr(intake, 'upsert_order', upsert_order)
+    monkeypatch.setattr(intake, 'SLOT_CAPACITY', 1)
+    assert post(intake, token=token, customer={'firstName': 'Other', 'roomNumber': 14})[0] == 200
+    assert send(intake, body, token)[0] == 409
+    assert idempotency_record(intake, 'request-1') is None
+
+    post(intake, token=token, customer={'firstName': 'Other', 'roomNumber': 14},
+         scheduling={'date': '2025-08-05', 'time': '07:00'})
+    status, _, headers = send(intake, body, token)
+    assert status == 200 and 'Idempotent-Replayed' not in headers
+
+
+def test_idempotency_keys_are_only_claimed_with_an_accepted_token(intake):
+    body = dict(ORDER, clientRequestId='request-1')
+
+    for token in (None, 'unknowntoken', signed_token(expires_at=NOW - 1)):
+        assert send(intake, body, token)[0] == 401
+    assert intake.idempotency_table.scan()['Count'] == 0
+
+    # The same request with a good token isn't answered with the earlier 401
+    status, _, headers = send(intake, body, signed_token())
+    assert status == 200 and 'Idempotent-Replayed' not in headers
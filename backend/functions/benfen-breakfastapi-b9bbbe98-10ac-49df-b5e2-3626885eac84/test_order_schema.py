@@ -0,0 +1,150 @@
+"""
+Checks that OrderSubmission in the frontend matches order.schema.json.
+
+The interface is written by hand, so this reads the TypeScript with a small
+parser (enough for object types, optional fields and string literal unions)
+and compares each object's fields, required fields and enums with the schema.
+"""
+import json
+import os
+import re
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCHEMA_PATH = os.path.join(HERE, 'order.schema.json')
+INTERFACE_PATH = os.path.join(HERE, '..', '..', '..', 'frontend', 'src', 'app', 'models', 'order.interface.ts')
+
+_TS_TYPES = {'integer': 'number', 'string': 'string', 'boolean': 'boolean'}
+_FIELD = re.compile(r"\s*(\w+)(\?)?\s*:\s*")
+
+
+def _strip_comments(source):
+    source = re.sub(r"/\*.*?\*/", "", source, flags=re.S)
+    return re.sub(r"//[^\n]*", "", source)
+
+
+def _parse_object(text, pos, interfaces):
+    """Parse the fields of `{ ... }` starting just after the brace; returns (fields, end)"""
+    fields = {}
+    while True:
+        while text[pos] in " \t\r\n;,":
+            pos += 1
+        if text[pos] == '}':
+            return fields, pos + 1
+        match = _FIELD.match(text, pos)
+        name, optional = match.group(1), bool(match.group(2))
+        pos = match.end()
+        if text[pos] == '{':
+            value, pos = _parse_object(text, pos + 1, interfaces)
+        else:
+            end = pos
+            while text[end] not in ';}\n':
+                end += 1
+            value = _parse_type(text[pos:end].strip(), interfaces)
+            pos = end
+        fields[name] = (optional, value)
+
+
+def _parse_type(expression, interfaces):
+    if expression in interfaces:
+        return interfaces[expression]
+    parts = [part.strip() for part in expression.split('|')]
+    if len(parts) == 1 and not parts[0].startswith("'"):
+        return parts[0]
+    return {None if part == 'null' else part.strip("'") for part in parts}
+
+
+def load_interfaces(path=INTERFACE_PATH):
+    with open(path, 'r', encoding='utf-8') as f:
+        source = _strip_comments(f.read())
+    interfaces = {}
+    for match in re.finditer(r"export interface (\w+)\s*\{", source):
+        interfaces[match.group(1)], _ = _parse_object(source, match.end(), interfaces)
+    return interfaces
+
+
+def _resolve(schema, root):
+    if '$ref' in schema:
+        target = root
+        for part in schema['$ref'].lstrip('#/').split('/'):
+            target = target[part]
+        return target
+    return schema
+
+
+def schema_differences(schema, fields, root=None, path=""):
+    """
+    Compare an object schema with a parsed TypeScript object type.
+
+    Args:
+        schema (dict): Object schema, or sub-schema of `root`
+        fields (dict): Field name -> (optional, type) from load_interfaces
+        root (dict): Top-level schema used to resolve refs
+        path (str): Dotted path of the object, for messages
+
+    Returns:
+        list: Human-readable differences, empty when they agree
+    """
+    root = root or schema
+    differences = []
+    properties = schema.get('properties', {})
+    required = set(schema.get('required', []))
+
+    for name in sorted(set(properties) ^ set(fields)):
+        where = 'schema' if name in properties else 'interface'
+        differences.append(f"{path}{name}: only in the {where}")
+
+    for name in sorted(set(properties) & set(fields)):
+        optional, ts_type = fields[name]
+        sub = _resolve(properties[name], root)
+        if optional == (name in required):
+            differences.append(f"{path}{name}: required in one but not the other")
+
+        if isinstance(ts_type, dict):
+            differences += schema_differences(sub, ts_type, root, f"{path}{name}.")
+        elif 'enum' in sub:
+            if ts_type != set(sub['enum']):
+                differences.append(f"{path}{name}: enum {sorted(map(str, sub['enum']))} "
+                                   f"vs {sorted(map(str, ts_type))}")
+        elif _TS_TYPES.get(sub.get('type')) != ts_type:
+            differences.append(f"{path}{name}: {sub.get('type')} vs {ts_type}")
+    return differences
+
+
+def test_order_submission_matches_the_schema():
+    if not os.path.exists(INTERFACE_PATH):
+        pytest.skip("frontend sources are not checked out")
+    with open(SCHEMA_PATH, 'r', encoding='utf-8') as f:
+        schema = json.load(f)
+
+    assert schema_differences(schema, load_interfaces()['OrderSubmission']) == []
+
+
+def test_differences_are_reported(tmp_path):
+    interface = tmp_path / 'order.interface.ts'
+    interface.write_text("""
+        export interface Order {
+          // kitchen notes
+          note: string;
+          eggs: { style: 'scrambled' | 'over'; extra: boolean };
+        }
+    """)
+    schema = {
+        'type': 'object',
+        'required': ['eggs'],
+        'properties': {
+            'note': {'type': 'string'},
+            'eggs': {
+                'type': 'object',
+                'required': ['style'],
+                'properties': {'style': {'type': 'string', 'enum': ['scrambled', 'boiled']}},
+            },
+        },
+    }
+
+    assert schema_differences(schema, load_interfaces(str(interface))['Order']) == [
+        "eggs.extra: only in the interface",
+        "eggs.style: enum ['boiled', 'scrambled'] vs ['over', 'scrambled']",
+        "note: required in one but not the other",
+    ]
@@ -0,0 +1,45 @@
+from breakfast.orders import Order, time_minutes
+from breakfast.report import sort_orders_by_time
+from breakfast.summary import DailySummary
+
+
+def order(name, time=None, scheduled_minutes=None):
+    item = {'order_data': {'customer': {'firstName': name},
+                           'scheduling': {'time': time} if time is not None else {}}}
+    if scheduled_minutes is not None:
+        item['scheduled_minutes'] = scheduled_minutes
+    return Order(item)
+
+
+def test_time_minutes_reads_12_and_24_hour_times():
+    assert time_minutes('07:30') == 450
+    assert time_minutes('7:30 AM') == 450
+    assert time_minutes('12:15 am') == 15
+    assert time_minutes('12:00 PM') == 720
+    assert time_minutes('1 PM') == 780
+    assert time_minutes('') is None
+    assert time_minutes('soon') is None
+    assert time_minutes('13:00 PM') is None
+
+
+def test_orders_sort_by_time_of_day_across_formats():
+    orders = [order('Late', '1:00 PM'), order('None'), order('Early', '06:30'),
+              order('Noon', '12:00 PM'), order('Mid', '8:15 AM'), order('Odd', 'whenever')]
+
+    assert [o.customer_name for o in sort_orders_by_time(orders)] == ['Early', 'Mid', 'Noon', 'Late', 'None', 'Odd']
+
+
+def test_stored_minutes_are_used_instead_of_parsing():
+    orders = [order('Stored', '9:00 AM', scheduled_minutes=420), order('Parsed', '08:00')]
+
+    assert [o.customer_name for o in sort_orders_by_time(orders)] == ['Stored', 'Parsed']
+
+
+def test_first_and_last_breakfast_compare_times_not_strings():
+    orders = [order('A', '10:00 AM'), order('B', '9:30 AM'), order('C', '07:00'), order('D', '1:00 PM'),
+              order('E', 'whenever')]
+    summary = DailySummary.from_orders('2025-08-05', orders)
+
+    assert summary.earliest_time == '07:00'
+    assert summary.latest_time == '1:00 PM'
+    assert [slot['time'] for slot in summary.slot_load()][-4:] == ['9:30 AM', '10:00 AM', '1:00 PM', 'whenever']
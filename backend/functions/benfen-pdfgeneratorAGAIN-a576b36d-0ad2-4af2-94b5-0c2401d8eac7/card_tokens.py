@@ -0,0 +1,194 @@
+"""
+Token issuing and revocation for the QR code PDF generator.
+
+Everything here reads or writes the token table and nothing renders, so
+it loads without Pillow, qrcode or PyMuPDF and can be tested on its own.
+lambda_function.py turns the tokens into cards and maps the ValueErrors
+raised here to 400 responses.
+"""
+import boto3
+import os
+import time
+import uuid
+from datetime import datetime
+from breakfast.clock import INN_TIME_ZONE, local_now
+from breakfast.tokens import TokenError, decode_token, is_signed_token, load_keys, revocation_item, sign_token
+
+dynamodb = boto3.resource('dynamodb')
+
+TABLE_NAME = os.environ.get('DYNAMODB_TABLE', 'qr-tokens')
+# Signed tokens (see breakfast.tokens): keys shared with the order API and the one to sign with.
+# Without a signing key id, tokens are random strings the order API looks up.
+TOKEN_SIGNING_KEYS = load_keys(os.environ.get('TOKEN_SIGNING_KEYS', ''))
+TOKEN_SIGNING_KEY_ID = os.environ.get('TOKEN_SIGNING_KEY_ID', '')
+# A card is current for TOKEN_LIFETIME_DAYS, then keeps working for TOKEN_GRACE_DAYS
+# so the old and new cards overlap while the new one is printed and put out
+TOKEN_LIFETIME_DAYS = float(os.environ.get('TOKEN_LIFETIME_DAYS', '30'))
+TOKEN_GRACE_DAYS = float(os.environ.get('TOKEN_GRACE_DAYS', '7'))
+# Batch mode: most cards per invocation
+BATCH_MAX_COUNT = int(os.environ.get('BATCH_MAX_COUNT', '200'))
+
+def token_validity():
+    """
+    When a token issued now is accepted
+
+    Returns:
+        tuple: (valid_from, expires_at) in epoch seconds; expires_at is
+            TOKEN_LIFETIME_DAYS plus TOKEN_GRACE_DAYS later
+    """
+    valid_from = int(time.time())
+    return valid_from, valid_from + int((TOKEN_LIFETIME_DAYS + TOKEN_GRACE_DAYS) * 86400)
+
+def local_time(epoch_seconds):
+    """Epoch seconds as a datetime at the inn"""
+    return datetime.fromtimestamp(epoch_seconds, INN_TIME_ZONE)
+
+def generate_token(valid_from, expires_at):
+    """A signed token when a signing key is configured, otherwise a random one"""
+    if not TOKEN_SIGNING_KEY_ID:
+        return generate_random_token()
+    return sign_token(TOKEN_SIGNING_KEYS, TOKEN_SIGNING_KEY_ID, valid_from, expires_at)
+
+def generate_random_token():
+    """Generate a random token string"""
+    return str(uuid.uuid4()).replace('-', '')[:25]
+
+def save_to_dynamodb(token, valid_from, expires_at):
+    """
+    Save token to DynamoDB with timestamp and validity period
+
+    expires_at is the table's TTL attribute, so DynamoDB deletes the item
+    once the token has expired.
+    """
+    table = dynamodb.Table(TABLE_NAME)
+
+    item = {
+        'type': 'token',
+        'created_at': str(int(time.time())),
+        'token': token,
+        'valid_from': valid_from,
+        'expires_at': expires_at
+    }
+
+    table.put_item(Item=item)
+    print(f"Saved token to DynamoDB: {token}")
+
+def save_tokens_batch(tokens, valid_from, expires_at, labels=None):
+    """
+    Save a batch of tokens to DynamoDB with a single batch writer
+
+    Tokens issued together share a second, so each gets a created_at of
+    "<epoch seconds>.<index>" to keep its sort key unique and in order.
+
+    Returns:
+        list: created_at of each token
+    """
+    table = dynamodb.Table(TABLE_NAME)
+    now = int(time.time())
+    created = []
+
+    with table.batch_writer() as batch:
+        for index, token in enumerate(tokens):
+            item = {
+                'type': 'token',
+                'created_at': f"{now}.{index:04d}",
+                'token': token,
+                'valid_from': valid_from,
+                'expires_at': expires_at
+            }
+            if labels:
+                item['label'] = labels[index]
+            batch.put_item(Item=item)
+            created.append(item['created_at'])
+
+    print(f"Saved {len(tokens)} tokens to DynamoDB")
+    return created
+
+def batch_request(event):
+    """
+    Read and check a batch event's card count and labels
+
+    Args:
+        event (dict): {"count": N, "labels": [...], "recipient_email" or "output_dir"}
+
+    Returns:
+        tuple: (count, labels); labels is an empty list if none were given
+
+    Raises:
+        ValueError: If the count is out of range, the labels don't match it,
+            or there is nowhere to send the cards
+    """
+    labels = event.get('labels') or []
+    count = int(event.get('count') or len(labels))
+
+    if not 1 <= count <= BATCH_MAX_COUNT:
+        raise ValueError(f'count must be 1-{BATCH_MAX_COUNT}')
+    if labels and len(labels) != count:
+        raise ValueError('labels must have one entry per card')
+    if not event.get('recipient_email') and not event.get('output_dir'):
+        raise ValueError('recipient_email or output_dir is required')
+    return count, labels
+
+def batch_manifest(tokens, urls, created, valid_from, expires_at, labels=None):
+    """
+    Which token is on which page of a batch's PDF
+
+    Args:
+        tokens (list): Tokens in card order
+        urls (list): URL printed in each card's QR code
+        created (list): created_at of each token, from save_tokens_batch
+        valid_from (int): Epoch seconds the tokens are valid from
+        expires_at (int): Epoch seconds the tokens expire
+        labels (list): Label printed on each card, if any
+
+    Returns:
+        dict: Manifest, ready for json.dump
+    """
+    return {
+        'generated': local_now().isoformat(timespec='seconds'),
+        'valid_from': local_time(valid_from).isoformat(timespec='seconds'),
+        'expires_at': local_time(expires_at).isoformat(timespec='seconds'),
+        'cards': [{
+            'page': page,
+            'label': labels[page - 1] if labels else None,
+            'token': token,
+            'url': url,
+            'created_at': created_at,
+        } for page, (token, url, created_at) in enumerate(zip(tokens, urls, created), start=1)]
+    }
+
+def revoke_tokens(tokens):
+    """
+    Put signed tokens on the order API's deny-list
+
+    Every token is checked before any is written, so a bad entry revokes
+    nothing.
+
+    Args:
+        tokens (list): Signed tokens from lost or retired cards
+
+    Returns:
+        list: token_id of each revoked token
+
+    Raises:
+        ValueError: If the list is empty or a token isn't a valid signed token
+    """
+    if not isinstance(tokens, list) or not tokens:
+        raise ValueError('revoke must list at least one token')
+
+    claims = []
+    for token in tokens:
+        if not is_signed_token(token):
+            raise ValueError('Only signed tokens can be revoked; delete random tokens from the table')
+        try:
+            claims.append(decode_token(TOKEN_SIGNING_KEYS, token))
+        except TokenError as e:
+            raise ValueError(f'Cannot revoke token: {e}') from None
+
+    table = dynamodb.Table(TABLE_NAME)
+    now = int(time.time())
+    with table.batch_writer() as batch:
+        for token_claims in claims:
+            batch.put_item(Item=revocation_item(token_claims, now))
+    print(f"Revoked {len(claims)} tokens")
+    return [token_claims['token_id'] for token_claims in claims]
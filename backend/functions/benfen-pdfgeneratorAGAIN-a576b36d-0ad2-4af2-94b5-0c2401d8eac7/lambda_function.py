@@ -1,14 +1,15 @@
 import json
 import boto3
-import uuid
-import time
-from datetime import datetime
 import qrcode
 from PIL import Image, ImageDraw
 import io
 import base64
 import os
-import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from breakfast.clock import local_now
+from card_tokens import (TOKEN_GRACE_DAYS, batch_manifest, batch_request, generate_token, local_time,
+                         revoke_tokens, save_to_dynamodb, save_tokens_batch, token_validity)
 
 
 # Try to import PyMuPDF, fallback gracefully if not available
@@ -25,20 +26,39 @@ except Exception as e:
     print("   Will use fallback PDF generation")
     PYMUPDF_AVAILABLE = False
 
-# Initialize AWS clients
-dynamodb = boto3.resource('dynamodb')
+# Initialize AWS clients (the token table is written by card_tokens)
 ses = boto3.client('ses')
 
 # Configuration
-TABLE_NAME = os.environ.get('DYNAMODB_TABLE', 'qr-tokens')
 SENDER_EMAIL = os.environ.get('SENDER_EMAIL')
 BASE_URL = os.environ.get('BASE_URL', 'https://breakfast.innatthecape.com')
+# "raster" pastes a rendered image; "vector" draws QR codes into the PDF as paths
+QR_RENDERING = os.environ.get('QR_RENDERING', 'raster')
+# Batch mode: threads rendering raster QR codes (BATCH_MAX_COUNT is in card_tokens)
+BATCH_RENDER_WORKERS = int(os.environ.get('BATCH_RENDER_WORKERS', '4'))
+
+LOGO_PATH = os.path.join(os.path.dirname(__file__), 'logo.png')
+TEMPLATE_PATH = os.path.join(os.path.dirname(__file__), 'template.pdf')
+
+# Logo and template, loaded on first use and kept for the life of a warm container
+_logo = None  # logo.png, or False if it is missing
+_logo_tiles = {}  # QR code size -> logo scaled onto its white square, ready to paste
+_template = None  # (template PDF bytes with the QR image removed, [(page number, bbox)]), or False
+_logo_png = None  # logo.png's bytes for vector QR codes, or False if it is missing
 
 def lambda_handler(event, context):
     """
     Main Lambda handler for QR code PDF generation
     """
     try:
+        # {"count": N, "labels": [...]} prints a card for each of N new tokens
+        if 'count' in event or 'labels' in event:
+            return handle_batch(event)
+        
+        # {"revoke": [token, ...]} puts signed tokens on the order API's deny-list
+        if 'revoke' in event:
+            return handle_revoke(event)
+        
         # Extract recipient email from event
         recipient_email = event.get('recipient_email')
         if not recipient_email:
@@ -47,26 +67,31 @@ def lambda_handler(event, context):
                 'body': json.dumps({'error': 'recipient_email is required'})
             }
         
-        # Step 1: Generate a random string
-        token = generate_random_token()
+        # Step 1: Generate a token
+        valid_from, expires_at = token_validity()
+        token = generate_token(valid_from, expires_at)
         
         # Step 2: Save to DynamoDB
-        save_to_dynamodb(token)
+        save_to_dynamodb(token, valid_from, expires_at)
         
         # Step 3: Create URL with token
         qr_url = f"{BASE_URL}?t={token}"
         
-        # Step 4: Generate QR Code
-        qr_image = generate_qr_code(qr_url)
-        
-        # Step 5: Add logo to QR Code
-        qr_with_logo = add_logo_to_qr(qr_image)
-        
-        # Step 6: Replace image in template PDF
-        pdf_content = create_pdf_with_qr(qr_with_logo)
+        if QR_RENDERING == 'vector' and PYMUPDF_AVAILABLE:
+            # Steps 4-6: Draw the QR code and logo straight into the template PDF
+            pdf_content = create_vector_pdf([qr_url])
+        else:
+            # Step 4: Generate QR Code
+            qr_image = generate_qr_code(qr_url)
+            
+            # Step 5: Add logo to QR Code
+            qr_with_logo = add_logo_to_qr(qr_image)
+            
+            # Step 6: Replace image in template PDF
+            pdf_content = create_pdf_with_qr(qr_with_logo)
         
         # Step 7: Email the PDF
-        send_email_with_pdf(recipient_email, pdf_content, token)
+        send_email_with_pdf(recipient_email, pdf_content, token, expires_at)
         
         return {
             'statusCode': 200,
@@ -74,6 +99,7 @@ def lambda_handler(event, context):
                 'message': 'QR code PDF generated and sent successfully',
                 'token': token,
                 'url': qr_url,
+                'expires_at': expires_at,
                 'recipient': recipient_email
             })
         }
@@ -85,25 +111,101 @@ def lambda_handler(event, context):
             'body': json.dumps({'error': str(e)})
         }
 
-def generate_random_token():
-    """Generate a random token string"""
-    return str(uuid.uuid4()).replace('-', '')[:25]
+def handle_batch(event):
+    """
+    Issue a batch of tokens and print one card per token
 
-def save_to_dynamodb(token):
-    """Save token to DynamoDB with timestamp"""
-    table = dynamodb.Table(TABLE_NAME)
+    Event:
+    {
+        "count": 20,                       # Optional if labels are given
+        "labels": ["Room 1", ...],         # Optional, printed under each QR code
+        "recipient_email": "...",          # Where to send the PDF and manifest
+        "output_dir": "/tmp/cards"         # Or write them here instead (local testing)
+    }
+
+    The tokens are written with one batch writer, the QR codes are rendered
+    on a thread pool, and the cards go into a single multi-page PDF with a
+    JSON manifest of which token is on which page.
+    """
+    try:
+        count, labels = batch_request(event)
+    except ValueError as e:
+        return {
+            'statusCode': 400,
+            'body': json.dumps({'error': str(e)})
+        }
+    recipient_email = event.get('recipient_email')
+    output_dir = event.get('output_dir')
+    
+    valid_from, expires_at = token_validity()
+    tokens = [generate_token(valid_from, expires_at) for _ in range(count)]
+    created = save_tokens_batch(tokens, valid_from, expires_at, labels)
+    
+    urls = [f"{BASE_URL}?t={token}" for token in tokens]
+    if QR_RENDERING == 'vector' and PYMUPDF_AVAILABLE:
+        pdf_content = create_vector_pdf(urls, labels)
+    else:
+        pdf_content = create_batch_pdf(render_qr_codes(urls), labels)
+    
+    manifest = batch_manifest(tokens, urls, created, valid_from, expires_at, labels)
+    
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+        pdf_path = os.path.join(output_dir, 'qr_cards.pdf')
+        manifest_path = os.path.join(output_dir, 'manifest.json')
+        with open(pdf_path, 'wb') as f:
+            f.write(pdf_content)
+        with open(manifest_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        print(f"Wrote {count} cards to {pdf_path}")
+        destination = {'pdf': pdf_path, 'manifest': manifest_path}
+    else:
+        send_batch_email(recipient_email, pdf_content, manifest)
+        destination = {'recipient': recipient_email}
     
-    item = {
-        'type': 'token',
-        'created_at': str(int(time.time())),
-        'token': token
+    return {
+        'statusCode': 200,
+        'body': json.dumps({
+            'message': f'{count} QR code cards generated',
+            'count': count,
+            'tokens': tokens,
+            **destination
+        })
     }
+
+def handle_revoke(event):
+    """
+    Revoke signed tokens, e.g. for a lost card
+
+    Event:
+    {
+        "revoke": ["k1.AAAA....", ...]
+    }
+
+    Each token gets a deny-list entry in the token table. The order API
+    re-reads its deny-list every DENY_LIST_TTL_SECONDS, so the card stops
+    working within that. Random tokens from before signing are revoked by
+    deleting their item instead, which takes up to the order API's
+    TOKEN_CACHE_TTL_SECONDS to take effect.
+    """
+    try:
+        token_ids = revoke_tokens(event.get('revoke'))
+    except ValueError as e:
+        return {
+            'statusCode': 400,
+            'body': json.dumps({'error': str(e)})
+        }
     
-    table.put_item(Item=item)
-    print(f"Saved token to DynamoDB: {token}")
+    return {
+        'statusCode': 200,
+        'body': json.dumps({
+            'message': f'{len(token_ids)} tokens revoked',
+            'token_ids': token_ids
+        })
+    }
 
-def generate_qr_code(url):
-    """Generate QR code for the given URL"""
+def make_qr(url):
+    """QR code for the given URL, before it is drawn"""
     qr = qrcode.QRCode(
         version=1,
         error_correction=qrcode.constants.ERROR_CORRECT_H,  # High error correction for logo overlay
@@ -113,39 +215,58 @@ def generate_qr_code(url):
     
     qr.add_data(url)
     qr.make(fit=True)
+    return qr
+
+def generate_qr_code(url):
+    """Generate QR code image for the given URL"""
+    qr = make_qr(url)
     
     # Create QR code image
     qr_image = qr.make_image(fill_color="black", back_color="white")
     return qr_image
 
+def get_logo_tile(qr_size):
+    """
+    The logo scaled to about 1/5 of the QR code, on a white square
+
+    Scaled once per QR code size. Returns None if there is no logo.
+    """
+    global _logo
+    if _logo is None:
+        if not os.path.exists(LOGO_PATH):
+            print("Logo file not found, skipping logo overlay")
+            _logo = False
+        else:
+            _logo = Image.open(LOGO_PATH)
+            _logo.load()
+    if _logo is False:
+        return None
+
+    tile = _logo_tiles.get(qr_size)
+    if tile is None:
+        logo_size = qr_size // 5
+        logo = _logo.resize((logo_size, logo_size), Image.Resampling.LANCZOS)
+
+        # White background for the logo area
+        tile = Image.new('RGBA', (logo_size + 20, logo_size + 20), 'white')
+        tile.paste(logo, (10, 10), logo)
+        _logo_tiles[qr_size] = tile
+    return tile
+
 def add_logo_to_qr(qr_image):
     """Add logo to the center of QR code"""
     try:
-        # Load logo from local file
-        logo_path = os.path.join(os.path.dirname(__file__), 'logo.png')
-        if not os.path.exists(logo_path):
-            print("Logo file not found, skipping logo overlay")
+        qr_width, qr_height = qr_image.size
+        logo_bg = get_logo_tile(min(qr_width, qr_height))
+        if logo_bg is None:
             return qr_image
-            
-        logo = Image.open(logo_path)
         
         # Convert QR image to RGBA if needed
         if qr_image.mode != 'RGBA':
             qr_image = qr_image.convert('RGBA')
         
-        # Calculate logo size (about 1/5 of QR code size)
-        qr_width, qr_height = qr_image.size
-        logo_size = min(qr_width, qr_height) // 5
-        
-        # Resize logo
-        logo = logo.resize((logo_size, logo_size), Image.Resampling.LANCZOS)
-        
-        # Create a white background for the logo area
-        logo_bg = Image.new('RGBA', (logo_size + 20, logo_size + 20), 'white')
-        logo_bg.paste(logo, (10, 10), logo)
-        
         # Calculate position to center the logo
-        logo_pos = ((qr_width - logo_size - 20) // 2, (qr_height - logo_size - 20) // 2)
+        logo_pos = ((qr_width - logo_bg.width) // 2, (qr_height - logo_bg.height) // 2)
         
         # Paste logo onto QR code
         qr_image.paste(logo_bg, logo_pos, logo_bg)
@@ -156,115 +277,111 @@ def add_logo_to_qr(qr_image):
         print(f"Error adding logo: {str(e)}")
         return qr_image  # Return QR without logo if error
 
+def render_qr_code(url):
+    """QR code with the logo for one URL"""
+    return add_logo_to_qr(generate_qr_code(url))
+
+def render_qr_codes(urls):
+    """
+    Render QR codes for several URLs on a thread pool
+
+    Lambda has no shared memory for a process pool, so this uses threads;
+    Pillow releases the GIL while it resizes and pastes. The first code is
+    rendered alone so the logo is loaded and scaled before the threads
+    share it.
+    """
+    first = render_qr_code(urls[0])
+    if len(urls) == 1:
+        return [first]
+    with ThreadPoolExecutor(max_workers=BATCH_RENDER_WORKERS) as executor:
+        return [first] + list(executor.map(render_qr_code, urls[1:]))
+
+def get_template():
+    """
+    The template PDF with its QR code image already removed, and where to put the new one
+
+    The template is read and its images located once per container.
+
+    Returns:
+        tuple: (PDF bytes, [(page number, bbox)]), or None if the template
+            is missing or has no image to replace
+    """
+    global _template
+    if _template is None:
+        if not os.path.exists(TEMPLATE_PATH):
+            print("Template PDF not found")
+            _template = False
+            return None
+
+        # Only a missing template or one with no image is remembered; if reading
+        # it fails, the next card tries again
+        pdf_document = fitz.open(TEMPLATE_PATH)
+        try:
+            placements = []
+            for page_num in range(len(pdf_document)):
+                page = pdf_document[page_num]
+                
+                # Only the first image found per page is replaced
+                image_list = page.get_images(full=True)
+                if image_list:
+                    img = image_list[0]
+                    image_bbox = page.get_image_bbox(img)
+                    page.delete_image(img[0])
+                    placements.append((page_num, image_bbox))
+            
+            if placements:
+                template = (pdf_document.tobytes(), placements)
+            else:
+                print("Template PDF has no image to replace")
+                template = False
+        finally:
+            pdf_document.close()
+        _template = template
+    return _template or None
+
+def png_bytes(image):
+    """Encode an image as PNG in memory"""
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+def qr_pixmap(qr_image):
+    """
+    The QR code as a PyMuPDF pixmap, straight from its pixels
+
+    The QR code and logo square are opaque, so the alpha channel is dropped.
+    """
+    rgb = qr_image.convert('RGB')
+    return fitz.Pixmap(fitz.csRGB, rgb.width, rgb.height, rgb.tobytes(), False)
+
 def create_pdf_with_qr(qr_image):
-    """Create PDF by replacing existing QR code image in template using PyMuPDF"""
+    """Create PDF by putting the QR code image into the template using PyMuPDF"""
     if not PYMUPDF_AVAILABLE:
         print("PyMuPDF not available, using simple PDF fallback")
         return create_simple_pdf_with_qr(qr_image)
     
     try:
-        # Load template PDF from local file
-        template_path = os.path.join(os.path.dirname(__file__), 'template.pdf')
-        
-        if not os.path.exists(template_path):
-            print("Template PDF not found, creating simple PDF")
+        template = get_template()
+        if template is None:
+            print("No usable template PDF, creating simple PDF")
             return create_simple_pdf_with_qr(qr_image)
         
-        # Create temporary file for the new QR image
-        temp_qr_path = tempfile.mktemp(suffix='.png')
-        qr_image.save(temp_qr_path, format='PNG')
-        
-        # Create temporary output file
-        output_path = tempfile.mktemp(suffix='.pdf')
+        template_bytes, placements = template
+        pixmap = qr_pixmap(qr_image)
         
-        # Use PyMuPDF to replace the image
-        success = replace_image_in_pdf(template_path, temp_qr_path, output_path)
-        
-        if success:
-            # Read the final PDF
-            with open(output_path, 'rb') as final_pdf:
-                pdf_content = final_pdf.read()
-            
-            # Clean up temporary files
-            if os.path.exists(temp_qr_path):
-                os.unlink(temp_qr_path)
-            if os.path.exists(output_path):
-                os.unlink(output_path)
-            
-            return pdf_content
-        else:
-            print("Image replacement failed, falling back to simple PDF")
-            # Clean up temporary files
-            if os.path.exists(temp_qr_path):
-                os.unlink(temp_qr_path)
-            if os.path.exists(output_path):
-                os.unlink(output_path)
-            
-            return create_simple_pdf_with_qr(qr_image)
+        pdf_document = fitz.open(stream=template_bytes, filetype='pdf')
+        try:
+            for page_num, image_bbox in placements:
+                pdf_document[page_num].insert_image(image_bbox, pixmap=pixmap)
+                print(f"Replaced image on page {page_num + 1} at position {image_bbox}")
+            return pdf_document.tobytes(garbage=3, deflate=True)
+        finally:
+            pdf_document.close()
         
     except Exception as e:
         print(f"Error creating PDF with QR: {str(e)}")
         return create_simple_pdf_with_qr(qr_image)
 
-def replace_image_in_pdf(template_path, new_image_path, output_path):
-    """
-    Replace the first image found in a PDF template with a new image using PyMuPDF.
-    
-    Args:
-        template_path: Path to the template PDF
-        new_image_path: Path to the new image to insert
-        output_path: Path for the output PDF
-        
-    Returns:
-        bool: True if successful, False otherwise
-    """
-    if not PYMUPDF_AVAILABLE:
-        return False
-    
-    try:
-        # Open the template PDF
-        pdf_document = fitz.open(template_path)
-        
-        # Process each page
-        images_replaced = 0
-        for page_num in range(len(pdf_document)):
-            page = pdf_document[page_num]
-            
-            # Get list of images on the page with full details
-            image_list = page.get_images(full=True)
-            
-            if image_list:
-                # Replace the first image found
-                for img_index, img in enumerate(image_list):
-                    # Get image rectangle (position and size)
-                    image_bbox = page.get_image_bbox(img)
-                    xref = img[0]
-                    
-                    # Remove the existing image
-                    page.delete_image(xref)
-                    
-                    # Insert the new image at the same position
-                    page.insert_image(image_bbox, filename=new_image_path)
-                    
-                    print(f"Replaced image on page {page_num + 1} at position {image_bbox}")
-                    images_replaced += 1
-                    break  # Only replace the first image found per page
-        
-        # Save the modified PDF
-        pdf_document.save(output_path)
-        pdf_document.close()
-        
-        print(f"PDF saved with {images_replaced} images replaced")
-        return images_replaced > 0
-        
-    except Exception as e:
-        print(f"Error in replace_image_in_pdf: {str(e)}")
-        try:
-            pdf_document.close()
-        except:
-            pass
-        return False
-
 def create_simple_pdf_with_qr(qr_image):
     """Create a simple PDF with just the QR code as fallback"""
     if PYMUPDF_AVAILABLE:
@@ -275,10 +392,6 @@ def create_simple_pdf_with_qr(qr_image):
             # Create a new page (A4 size: 595 x 842 points)
             page = pdf_document.new_page(width=595, height=842)
             
-            # Save QR image to temporary file
-            temp_qr_path = tempfile.mktemp(suffix='.png')
-            qr_image.save(temp_qr_path, format='PNG')
-            
             # Calculate position to center the QR code
             qr_size = 200
             x = (595 - qr_size) / 2
@@ -286,19 +399,16 @@ def create_simple_pdf_with_qr(qr_image):
             
             # Insert QR code image
             rect = fitz.Rect(x, y, x + qr_size, y + qr_size)
-            page.insert_image(rect, filename=temp_qr_path)
+            page.insert_image(rect, pixmap=qr_pixmap(qr_image))
             
             # Add some text
             text_point = fitz.Point(x, y - 30)
             page.insert_text(text_point, "Scan this QR code", fontsize=12)
             
             # Save to bytes
-            pdf_bytes = pdf_document.write()
+            pdf_bytes = pdf_document.tobytes(garbage=3, deflate=True)
             
-            # Clean up
             pdf_document.close()
-            if os.path.exists(temp_qr_path):
-                os.unlink(temp_qr_path)
             
             return pdf_bytes
             
@@ -310,16 +420,240 @@ def create_simple_pdf_with_qr(qr_image):
     
     # Create a very basic PDF structure manually
     # This is a minimal PDF that contains just basic structure
-    qr_bytes = io.BytesIO()
-    qr_image.save(qr_bytes, format='PNG')
-    qr_data = qr_bytes.getvalue()
+    qr_data = png_bytes(qr_image)
     
     # For now, return the QR image as PNG data with a note
     # In a real implementation, you might want to use reportlab or another library
     # but for Lambda deployment, this provides a working fallback
     return qr_data  # This will be treated as binary data by the email attachment
 
-def send_email_with_pdf(recipient_email, pdf_content, token):
+def copy_template_page(pdf_document, page_num):
+    """
+    Append a copy of a template page that shares its fonts and images
+
+    fullcopy_page shares the page's resource dictionary too, so the copy
+    gets its own; otherwise every QR code inserted later would be listed
+    on every card.
+    """
+    pdf_document.fullcopy_page(page_num)
+    page = pdf_document[-1]
+    kind, value = pdf_document.xref_get_key(page.xref, 'Resources')
+    if kind == 'xref':
+        resources = pdf_document.get_new_xref()
+        pdf_document.update_object(resources, pdf_document.xref_object(int(value.split()[0])))
+        pdf_document.xref_set_key(page.xref, 'Resources', f"{resources} 0 R")
+
+def new_cards_document(count):
+    """
+    A PDF with blank pages for count cards, each a copy of the template
+
+    The template is inserted once; later cards copy its pages and share its
+    fonts and artwork. Every card's pages are laid out before any QR code
+    goes in, so the copies start blank. Without a template, each card is a
+    plain A4 page.
+
+    Returns:
+        tuple: (PDF document, [(page number within a card, bbox)], pages per card)
+    """
+    template = get_template()
+    pdf_document = fitz.open()
+    if template is not None:
+        template_bytes, placements = template
+        template_document = fitz.open(stream=template_bytes, filetype='pdf')
+        pdf_document.insert_pdf(template_document)
+        pages_per_card = len(template_document)
+        template_document.close()
+        for _ in range(count - 1):
+            for page_num in range(pages_per_card):
+                copy_template_page(pdf_document, page_num)
+    else:
+        placements = [(0, fitz.Rect(197.5, 321, 397.5, 521))]
+        pages_per_card = 1
+        for _ in range(count):
+            pdf_document.new_page(width=595, height=842)
+    return pdf_document, placements, pages_per_card
+
+def draw_label(page, bbox, label):
+    """Print a card's label under its QR code"""
+    page.insert_text(fitz.Point(bbox.x0, bbox.y1 + 18), label, fontsize=12)
+
+def create_batch_pdf(qr_images, labels=None):
+    """
+    One card per rendered QR code image in a single PDF
+
+    Raises:
+        RuntimeError: If PyMuPDF is not available
+    """
+    if not PYMUPDF_AVAILABLE:
+        raise RuntimeError("Batch cards need PyMuPDF")
+    
+    pdf_document, placements, pages_per_card = new_cards_document(len(qr_images))
+    try:
+        for card, qr_image in enumerate(qr_images):
+            pixmap = qr_pixmap(qr_image)
+            for page_num, image_bbox in placements:
+                page = pdf_document[card * pages_per_card + page_num]
+                page.insert_image(image_bbox, pixmap=pixmap)
+                if labels:
+                    draw_label(page, image_bbox, labels[card])
+        
+        return pdf_document.tobytes(garbage=3, deflate=True)
+    finally:
+        pdf_document.close()
+
+def get_logo_png():
+    """logo.png's bytes, read once per container; None if there is no logo"""
+    global _logo_png
+    if _logo_png is None:
+        if os.path.exists(LOGO_PATH):
+            with open(LOGO_PATH, 'rb') as f:
+                _logo_png = f.read()
+        else:
+            print("Logo file not found, skipping logo overlay")
+            _logo_png = False
+    return _logo_png or None
+
+def qr_code_page(matrix):
+    """
+    A one-page PDF holding just the QR code, one unit per module
+
+    Dark modules in a row become one rectangle, written straight into the
+    page's content stream. When there is a logo, a white square is left in
+    the middle for it, in the same proportions as add_logo_to_qr: a fifth
+    of the code plus a module of white on each side.
+
+    Args:
+        matrix (list): Rows of booleans from QRCode.get_matrix(), border included
+
+    Returns:
+        Document: PDF whose only page is the QR code, quiet zone included
+    """
+    modules = len(matrix)
+    ops = [f"1 g 0 0 {modules} {modules} re f 0 g"]
+    for row, cells in enumerate(matrix):
+        y = modules - row - 1  # PDF y runs upwards
+        column = 0
+        while column < modules:
+            if not cells[column]:
+                column += 1
+                continue
+            start = column
+            while column < modules and cells[column]:
+                column += 1
+            ops.append(f"{start} {y} {column - start} 1 re")
+    ops.append("f")
+    if get_logo_png() is not None:
+        tile_size = modules / 5 + 2
+        corner = (modules - tile_size) / 2
+        ops.append(f"1 g {corner:g} {corner:g} {tile_size:g} {tile_size:g} re f")
+    
+    qr_document = fitz.open()
+    page = qr_document.new_page(width=modules, height=modules)
+    contents_xref = qr_document.get_new_xref()
+    qr_document.update_object(contents_xref, "<<>>")
+    qr_document.update_stream(contents_xref, "\n".join(ops).encode())
+    page.set_contents(contents_xref)
+    return qr_document
+
+def draw_qr_code(page, bbox, qr_document, logo_xref=0):
+    """
+    Place a QR code page from qr_code_page on a card, with the logo on top
+
+    Args:
+        page: PyMuPDF page
+        bbox: Rect to fill, quiet zone included
+        qr_document: Document from qr_code_page
+        logo_xref (int): xref of the logo image already in the document, or 0 to insert it
+
+    Returns:
+        int: xref of the logo image, for the next card in the same document (0 if none)
+    """
+    page.show_pdf_page(bbox, qr_document, 0)
+    
+    logo_png = get_logo_png()
+    if logo_png is None:
+        return 0
+    
+    size = min(bbox.width, bbox.height)
+    logo_size = size / 5
+    center = (bbox.tl + bbox.br) / 2
+    logo_rect = fitz.Rect(center.x - logo_size / 2, center.y - logo_size / 2,
+                          center.x + logo_size / 2, center.y + logo_size / 2)
+    if logo_xref:
+        page.insert_image(logo_rect, xref=logo_xref)
+        return logo_xref
+    return page.insert_image(logo_rect, stream=logo_png)
+
+def create_vector_pdf(urls, labels=None):
+    """
+    One card per URL with the QR code drawn as vector paths
+
+    No image is rasterized or encoded per card; the logo is embedded once
+    and every card refers to the same image.
+
+    Raises:
+        RuntimeError: If PyMuPDF is not available
+    """
+    if not PYMUPDF_AVAILABLE:
+        raise RuntimeError("Vector QR codes need PyMuPDF")
+    
+    pdf_document, placements, pages_per_card = new_cards_document(len(urls))
+    try:
+        logo_xref = 0
+        for card, url in enumerate(urls):
+            qr_document = qr_code_page(make_qr(url).get_matrix())
+            for page_num, bbox in placements:
+                page = pdf_document[card * pages_per_card + page_num]
+                logo_xref = draw_qr_code(page, bbox, qr_document, logo_xref)
+                if labels:
+                    draw_label(page, bbox, labels[card])
+            qr_document.close()
+        
+        return pdf_document.tobytes(garbage=3, deflate=True)
+    finally:
+        pdf_document.close()
+
+def send_batch_email(recipient_email, pdf_content, manifest):
+    """Send the batch of cards and their manifest in one email using AWS SES"""
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+    from email.mime.application import MIMEApplication
+    
+    count = len(manifest['cards'])
+    
+    msg = MIMEMultipart()
+    msg['From'] = SENDER_EMAIL
+    msg['To'] = recipient_email
+    msg['Subject'] = f'{count} new QR Codes generated.'
+    
+    body = f"""
+    Hello,
+    
+    {count} new QR Codes have been generated, one card per page in the attached PDF.
+    They work until {datetime.fromisoformat(manifest['expires_at']).strftime('%B %d, %Y')}.
+    manifest.json lists the label, token and URL on each page.
+    Generated: {local_now().strftime('%Y-%m-%d %H:%M:%S %Z')}
+    """
+    
+    msg.attach(MIMEText(body, 'plain'))
+    
+    pdf_attachment = MIMEApplication(pdf_content)
+    pdf_attachment.add_header('Content-Disposition', 'attachment', filename='qr_cards.pdf')
+    msg.attach(pdf_attachment)
+    
+    manifest_attachment = MIMEApplication(json.dumps(manifest, indent=2).encode('utf-8'), _subtype='json')
+    manifest_attachment.add_header('Content-Disposition', 'attachment', filename='manifest.json')
+    msg.attach(manifest_attachment)
+    
+    ses.send_raw_email(
+        Source=SENDER_EMAIL,
+        Destinations=[recipient_email],
+        RawMessage={'Data': msg.as_string()}
+    )
+    
+    print(f"Email with {count} cards sent to {recipient_email}")
+
+def send_email_with_pdf(recipient_email, pdf_content, token, expires_at):
     """Send email with PDF attachment using AWS SES"""
     from email.mime.multipart import MIMEMultipart
     from email.mime.text import MIMEText
@@ -335,11 +669,11 @@ def send_email_with_pdf(recipient_email, pdf_content, token):
     body = f"""
     Hello,
     
-    A new QR Code has been generated.
-    The current QR Code will expire on the 7th.
+    A new QR Code has been generated. It works until {local_time(expires_at).strftime('%B %d, %Y')}.
+    The current QR Code keeps working until its own expiry date, {TOKEN_GRACE_DAYS:g} days after it was due to be replaced.
     Please replace the current QR Code with the new one attached to this E-mail
     Token: {token}
-    Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+    Generated: {local_now().strftime('%Y-%m-%d %H:%M:%S %Z')}
     """
     
     msg.attach(MIMEText(body, 'plain'))
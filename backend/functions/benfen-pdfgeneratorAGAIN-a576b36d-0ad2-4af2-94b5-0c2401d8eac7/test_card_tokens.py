@@ -0,0 +1,126 @@
+import importlib.util
+import os
+import time
+
+import pytest
+
+moto = pytest.importorskip("moto")
+boto3 = pytest.importorskip("boto3")
+
+from boto3.dynamodb.conditions import Key  # noqa: E402
+from breakfast.tokens import REVOKED_PARTITION, decode_token, load_keys  # noqa: E402
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SIGNING_KEYS = '{"k1": "test secret"}'
+BASE_URL = 'https://breakfast.innatthecape.com'
+
+
+@pytest.fixture
+def cards(monkeypatch):
+    monkeypatch.setenv('AWS_ACCESS_KEY_ID', 'testing')
+    monkeypatch.setenv('AWS_SECRET_ACCESS_KEY', 'testing')
+    monkeypatch.setenv('AWS_DEFAULT_REGION', 'ca-central-1')
+    monkeypatch.setenv('DYNAMODB_TABLE', 'qr-tokens')
+    monkeypatch.setenv('TOKEN_SIGNING_KEYS', SIGNING_KEYS)
+    monkeypatch.setenv('TOKEN_SIGNING_KEY_ID', 'k1')
+    monkeypatch.setenv('BATCH_MAX_COUNT', '5')
+    with moto.mock_aws():
+        boto3.resource('dynamodb', region_name='ca-central-1').create_table(
+            TableName='qr-tokens',
+            KeySchema=[{'AttributeName': 'type', 'KeyType': 'HASH'},
+                       {'AttributeName': 'created_at', 'KeyType': 'RANGE'}],
+            AttributeDefinitions=[{'AttributeName': 'type', 'AttributeType': 'S'},
+                                  {'AttributeName': 'created_at', 'AttributeType': 'S'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
+
+        spec = importlib.util.spec_from_file_location('card_tokens', os.path.join(HERE, 'card_tokens.py'))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        yield module
+
+
+def partition(cards, name):
+    table = cards.dynamodb.Table('qr-tokens')
+    return table.query(KeyConditionExpression=Key('type').eq(name))['Items']
+
+
+def issue(cards, labels):
+    valid_from, expires_at = cards.token_validity()
+    tokens = [cards.generate_token(valid_from, expires_at) for _ in labels]
+    created = cards.save_tokens_batch(tokens, valid_from, expires_at, labels)
+    return tokens, created, valid_from, expires_at
+
+
+@pytest.mark.parametrize('event, error', [
+    ({'count': 0, 'output_dir': '/tmp'}, 'count must be 1-5'),
+    ({'count': 6, 'output_dir': '/tmp'}, 'count must be 1-5'),
+    ({'count': 2, 'labels': ['Room 1'], 'output_dir': '/tmp'}, 'one entry per card'),
+    ({'count': 2}, 'recipient_email or output_dir'),
+])
+def test_batch_requests_are_checked(cards, event, error):
+    with pytest.raises(ValueError, match=error):
+        cards.batch_request(event)
+
+
+def test_batch_count_defaults_to_the_labels(cards):
+    assert cards.batch_request({'labels': ['Room 1', 'Room 2'], 'recipient_email': 'a@b.c'}) == (
+        2, ['Room 1', 'Room 2'])
+    assert cards.batch_request({'count': 5, 'output_dir': '/tmp'}) == (5, [])
+
+
+def test_batch_tokens_get_unique_sort_keys_in_card_order(cards):
+    tokens, created, valid_from, expires_at = issue(cards, ['Room 1', 'Room 2', 'Room 3'])
+
+    second = created[0].split('.')[0]
+    assert created == [f'{second}.0000', f'{second}.0001', f'{second}.0002']
+    items = partition(cards, 'token')
+    assert [item['token'] for item in items] == tokens
+    assert [item['label'] for item in items] == ['Room 1', 'Room 2', 'Room 3']
+    assert all(item['valid_from'] == valid_from and item['expires_at'] == expires_at for item in items)
+    assert decode_token(load_keys(SIGNING_KEYS), tokens[0])['expires_at'] == expires_at
+
+
+def test_manifest_lists_each_card_by_page(cards):
+    tokens, created, valid_from, expires_at = issue(cards, ['Room 1', 'Room 2'])
+    urls = [f"{BASE_URL}?t={token}" for token in tokens]
+
+    manifest = cards.batch_manifest(tokens, urls, created, valid_from, expires_at, ['Room 1', 'Room 2'])
+
+    assert manifest['cards'] == [
+        {'page': 1, 'label': 'Room 1', 'token': tokens[0], 'url': urls[0], 'created_at': created[0]},
+        {'page': 2, 'label': 'Room 2', 'token': tokens[1], 'url': urls[1], 'created_at': created[1]},
+    ]
+    assert manifest['valid_from'] == cards.local_time(valid_from).isoformat(timespec='seconds')
+    assert manifest['expires_at'] == cards.local_time(expires_at).isoformat(timespec='seconds')
+    assert cards.batch_manifest(tokens, urls, created, valid_from, expires_at)['cards'][0]['label'] is None
+
+
+def test_revoked_tokens_are_written_to_the_deny_list(cards):
+    tokens, _, _, expires_at = issue(cards, ['Room 1', 'Room 2'])
+    token_ids = [decode_token(load_keys(SIGNING_KEYS), token)['token_id'] for token in tokens]
+
+    assert cards.revoke_tokens(tokens) == token_ids
+
+    revoked = partition(cards, REVOKED_PARTITION)
+    assert sorted(item['token_id'] for item in revoked) == sorted(token_ids)
+    assert all(item['expires_at'] == expires_at for item in revoked)
+    assert all(int(item['created_at'].split('.')[0]) <= time.time() for item in revoked)
+
+
+@pytest.mark.parametrize('revoke', [None, [], 'k1.not.alist'])
+def test_revoke_needs_a_list_of_tokens(cards, revoke):
+    with pytest.raises(ValueError, match='at least one token'):
+        cards.revoke_tokens(revoke)
+
+
+@pytest.mark.parametrize('bad_token, error', [
+    ('0123456789abcdef012345678', 'Only signed tokens'),
+    ('k9.AAAAAAAAAAAAAAAAAAA.AAAAAAAAAAAAAAAAAAAAAA', 'Cannot revoke token: unknown key id'),
+])
+def test_one_bad_token_revokes_nothing(cards, bad_token, error):
+    tokens = issue(cards, ['Room 1'])[0]
+
+    with pytest.raises(ValueError, match=error):
+        cards.revoke_tokens(tokens + [bad_token])
+    assert partition(cards, REVOKED_PARTITION) == []
@@ -0,0 +1,125 @@
+"""
+Rendering tests for the QR code PDF generator.
+
+These load lambda_function.py itself, so they need PyMuPDF and the
+bundled Pillow, which is built for Python 3.13; run them with the
+interpreter the function is deployed with. Elsewhere they are skipped.
+"""
+import importlib.util
+import os
+
+import pytest
+
+fitz = pytest.importorskip("fitz")
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture
+def generator(monkeypatch):
+    monkeypatch.setenv('AWS_DEFAULT_REGION', 'ca-central-1')
+    monkeypatch.syspath_prepend(HERE)
+    pytest.importorskip("PIL.Image")
+    spec = importlib.util.spec_from_file_location('pdf_generator', os.path.join(HERE, 'lambda_function.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_template_is_read_once(generator, monkeypatch):
+    opened = []
+    real_open = fitz.open
+    monkeypatch.setattr(fitz, 'open', lambda *args, **kwargs: opened.append(args) or real_open(*args, **kwargs))
+
+    template_bytes, placements = generator.get_template()
+
+    assert template_bytes.startswith(b'%PDF') and placements[0][0] == 0
+    assert generator.get_template() is generator._template
+    assert len(opened) == 1
+
+
+def test_missing_template_or_image_is_remembered(generator, monkeypatch, tmp_path):
+    monkeypatch.setattr(generator, 'TEMPLATE_PATH', str(tmp_path / 'template.pdf'))
+
+    assert generator.get_template() is None and generator._template is False
+
+    blank = fitz.open()
+    blank.new_page()
+    blank.save(generator.TEMPLATE_PATH)
+    assert generator.get_template() is None  # not looked at again in this container
+
+    generator._template = None
+    assert generator.get_template() is None and generator._template is False
+
+
+def test_template_that_fails_to_load_is_tried_again(generator, monkeypatch):
+    real_open = fitz.open
+    calls = []
+
+    def open_failing_once(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 1:
+            raise RuntimeError("read error")
+        return real_open(*args, **kwargs)
+    monkeypatch.setattr(fitz, 'open', open_failing_once)
+
+    with pytest.raises(RuntimeError):
+        generator.get_template()
+    assert generator._template is None
+
+    assert generator.get_template()[1]
+    assert len(calls) == 2
+
+
+def dark_modules(page, rect, modules, scale=4):
+    """Which modules of a QR code drawn in rect come out dark, sampled at each module's centre"""
+    side = min(rect.width, rect.height)
+    x0 = (rect.x0 + rect.x1 - side) / 2
+    y0 = (rect.y0 + rect.y1 - side) / 2
+    square = fitz.Rect(x0, y0, x0 + side, y0 + side)
+    pixmap = page.get_pixmap(matrix=fitz.Matrix(scale, scale), clip=square)
+    module = pixmap.width / modules
+    return [[sum(pixmap.pixel(int((column + 0.5) * module), int((row + 0.5) * module))[:3]) < 384
+             for column in range(modules)] for row in range(modules)]
+
+
+def outside_logo(modules):
+    """Modules clear of the white square left for the logo"""
+    tile_size = modules / 5 + 2
+    low, high = (modules - tile_size) / 2, (modules + tile_size) / 2
+    return [(row, column) for row in range(modules) for column in range(modules)
+            if not (low - 0.5 <= row + 0.5 <= high + 0.5 and low - 0.5 <= column + 0.5 <= high + 0.5)]
+
+
+def test_vector_qr_code_draws_every_module(generator):
+    url = 'https://breakfast.innatthecape.com?t=k1.AYwz7mWTHO1jASNFZ4mr.2a3Z0lWbvDQrH7F6Kt1x4w'
+    matrix = generator.make_qr(url).get_matrix()
+    modules = len(matrix)
+
+    qr_document = generator.qr_code_page(matrix)
+    drawn = dark_modules(qr_document[0], qr_document[0].rect, modules)
+    qr_document.close()
+
+    checked = outside_logo(modules)
+    assert len(checked) > modules * modules * 0.9
+    assert [drawn[row][column] for row, column in checked] == [matrix[row][column] for row, column in checked]
+    assert not any(drawn[modules // 2][modules // 2 - 2:modules // 2 + 3])  # the logo's white square
+
+
+def test_vector_card_matches_the_raster_card(generator):
+    url = 'https://breakfast.innatthecape.com?t=0123456789abcdef012345678'
+    matrix = generator.make_qr(url).get_matrix()
+    modules = len(matrix)
+    _, placements = generator.get_template()
+    page_num, bbox = placements[0]
+
+    cards = {}
+    for mode, pdf in (('vector', generator.create_vector_pdf([url])),
+                      ('raster', generator.create_pdf_with_qr(generator.render_qr_code(url)))):
+        document = fitz.open(stream=pdf, filetype='pdf')
+        cards[mode] = dark_modules(document[page_num], bbox, modules)
+        document.close()
+
+    checked = outside_logo(modules)
+    for mode, drawn in cards.items():
+        assert [drawn[row][column] for row, column in checked] == [matrix[row][column] for row, column in checked], mode
@@ -1,65 +1,61 @@
 import json
 import boto3
-from datetime import datetime
-from decimal import Decimal
 import logging
 
+from breakfast.retention import apply_retention, batch_delete, parse_policies, table_keys
+
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# Initialize DynamoDB client
+# Tokens share one partition and sort oldest first by their creation time
+TOKEN_PARTITION_KEY = 'type'
+TOKEN_SORT_KEY = 'created_at'
+TOKEN_TYPE = 'token'
+
+# Initialize DynamoDB clients
 dynamodb = boto3.resource('dynamodb')
+dynamodb_client = boto3.client('dynamodb')
 
 def lambda_handler(event, context):
     """
-    AWS Lambda function to delete the oldest item in a DynamoDB table.
+    AWS Lambda function to delete the oldest tokens in a DynamoDB table.
+    
+    Tokens now carry an `expires_at` TTL attribute and DynamoDB deletes them
+    once expired (see migrate_tokens.py), so this no longer needs to run on
+    a schedule. It stays for one-off cleanups and retention policies.
     
     Expected event structure:
     {
         "table_name": "your-dynamodb-table-name",
-        "timestamp_attribute": "created_at",  # The attribute containing timestamp
+        "timestamp_attribute": "created_at",  # Optional: the sort key tokens are ordered by
+        "token_type": "token",  # Optional: partition holding the tokens
         "delete_count": 1  # Optional: number of oldest items to delete (default: 1)
     }
+    
+    An event with "policies" applies retention policies instead, to any
+    table (see handle_retention).
     """
+    if 'policies' in event:
+        return handle_retention(event)
+    
     try:
         # Extract parameters from event
         table_name = event.get('table_name')
-        timestamp_attribute = event.get('timestamp_attribute', 'created_at')
-        delete_count = event.get('delete_count', 1)
+        timestamp_attribute = event.get('timestamp_attribute', TOKEN_SORT_KEY)
+        token_type = event.get('token_type', TOKEN_TYPE)
+        delete_count = int(event.get('delete_count', 1))
         
         if not table_name:
             raise ValueError("table_name is required in the event")
+        if delete_count < 1:
+            raise ValueError("delete_count must be at least 1")
         
         # Get reference to the DynamoDB table
         table = dynamodb.Table(table_name)
         
-        # Scan the table and find the oldest items
-        logger.info(f"Scanning table {table_name} to find oldest items")
-        
-        response = table.scan(
-            ProjectionExpression='#ts, #pk, #token',
-            ExpressionAttributeNames={
-                '#ts': timestamp_attribute,
-                '#pk': 'type',
-                '#token': 'token'  # Include token field which might be part of the key
-            }
-        )
-        
-        items = response['Items']
-        
-        # Handle pagination if there are more items
-        while 'LastEvaluatedKey' in response:
-            response = table.scan(
-                ProjectionExpression='#ts, #pk, #token',
-                ExpressionAttributeNames={
-                    '#ts': timestamp_attribute,
-                    '#pk': 'type',
-                    '#token': 'token'
-                },
-                ExclusiveStartKey=response['LastEvaluatedKey']
-            )
-            items.extend(response['Items'])
+        logger.info(f"Querying table {table_name} for the {delete_count} oldest {token_type} items")
+        items = query_oldest_items(table, token_type, timestamp_attribute, delete_count)
         
         if not items:
             logger.info("No items found in the table")
@@ -71,55 +67,18 @@ def lambda_handler(event, context):
                 })
             }
         
-        # Sort items by timestamp (oldest first)
-        # Handle both string and numeric timestamps
-        def get_timestamp_value(item):
-            ts_value = item[timestamp_attribute]
-            if isinstance(ts_value, (int, float, Decimal)):
-                return float(ts_value)
-            elif isinstance(ts_value, str):
-                try:
-                    # Try parsing as ISO format first
-                    return datetime.fromisoformat(ts_value.replace('Z', '+00:00')).timestamp()
-                except ValueError:
-                    try:
-                        # Try parsing as timestamp
-                        return float(ts_value)
-                    except ValueError:
-                        logger.warning(f"Could not parse timestamp: {ts_value}")
-                        return 0
-            return 0
-        
-        sorted_items = sorted(items, key=get_timestamp_value)
-        
-        # Get the oldest items to delete
-        items_to_delete = sorted_items[:delete_count]
-        
-        deleted_items = []
+        keys = [{TOKEN_PARTITION_KEY: item[TOKEN_PARTITION_KEY], timestamp_attribute: item[timestamp_attribute]}
+                for item in items]
+        batch_delete(dynamodb.meta.client, table_name, keys)
         
-        # Delete the oldest items
-        for item in items_to_delete:
-            try:
-                # Build the key for deletion - include both partition key (type) and sort key (created_at)
-                delete_key = {
-                    'type': item['type'],
-                    'created_at': item['created_at']
-                }
-                
-                table.delete_item(Key=delete_key)
-                
-                deleted_items.append({
-                    'type': item['type'],
-                    'created_at': item['created_at'],
-                    'token': item.get('token', '')
-                })
-                logger.info(f"Deleted item with type: {item['type']}, created_at: {item['created_at']}")
-                
-            except Exception as delete_error:
-                logger.error(f"Failed to delete item {item['type']}/{item['created_at']}: {str(delete_error)}")
-                raise delete_error
+        deleted_items = [{
+            'type': item[TOKEN_PARTITION_KEY],
+            'created_at': item[timestamp_attribute],
+            'token': item.get('token', '')
+        } for item in items]
         
-        logger.info(f"Successfully deleted {len(deleted_items)} items")
+        logger.info(f"Successfully deleted {len(deleted_items)} items, "
+                    f"{deleted_items[0]['created_at']} to {deleted_items[-1]['created_at']}")
         
         return {
             'statusCode': 200,
@@ -140,85 +99,90 @@ def lambda_handler(event, context):
             })
         }
 
-def delete_oldest_items_by_key(table_name, primary_key_name, sort_key_name=None, 
-                              timestamp_attribute='created_at', delete_count=1):
+def query_oldest_items(table, token_type, sort_key, count):
     """
-    Alternative function for tables with composite keys.
-    
+    The oldest items in one token partition, read in sort key order.
+
+    Only the requested items are read, however large the table is. A page
+    can stop short of Limit at 1 MB, so paging continues until count items
+    have been read or the partition ends.
+
     Args:
-        table_name: Name of the DynamoDB table
-        primary_key_name: Name of the partition key
-        sort_key_name: Name of the sort key (optional)
-        timestamp_attribute: Attribute containing the timestamp
-        delete_count: Number of oldest items to delete
+        table: DynamoDB Table resource
+        token_type (str): Partition key value of the tokens
+        sort_key (str): Sort key name
+        count (int): Number of items to read
+
+    Returns:
+        list: Up to count items holding their keys and token, oldest first
     """
-    table = dynamodb.Table(table_name)
-    
-    # Build projection expression
-    projection_attrs = [timestamp_attribute, primary_key_name]
-    attr_names = {
-        '#ts': timestamp_attribute,
-        '#pk': primary_key_name
+    query = {
+        'KeyConditionExpression': '#pk = :pk',
+        'ProjectionExpression': '#pk, #sk, #token',
+        'ExpressionAttributeNames': {'#pk': TOKEN_PARTITION_KEY, '#sk': sort_key, '#token': 'token'},
+        'ExpressionAttributeValues': {':pk': token_type},
+        'ScanIndexForward': True,
     }
-    
-    if sort_key_name:
-        projection_attrs.append(sort_key_name)
-        attr_names['#sk'] = sort_key_name
-    
-    projection_expression = ', '.join([f'#{attr.replace("-", "_")}' if "-" in attr else f'#{attr[:2]}' 
-                                     for attr in projection_attrs])
-    
-    # Scan table
-    response = table.scan(
-        ProjectionExpression=projection_expression,
-        ExpressionAttributeNames=attr_names
-    )
-    
-    items = response['Items']
-    
-    # Handle pagination
-    while 'LastEvaluatedKey' in response:
-        response = table.scan(
-            ProjectionExpression=projection_expression,
-            ExpressionAttributeNames=attr_names,
-            ExclusiveStartKey=response['LastEvaluatedKey']
-        )
+    items = []
+    while len(items) < count:
+        response = table.query(Limit=count - len(items), **query)
         items.extend(response['Items'])
+        if 'LastEvaluatedKey' not in response:
+            break
+        query['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    return items
+
+def handle_retention(event):
+    """
+    Delete the items retention policies select, from tokens or orders.
     
-    if not items:
-        return []
-    
-    # Sort by timestamp
-    def get_timestamp_value(item):
-        ts_value = item[timestamp_attribute]
-        if isinstance(ts_value, (int, float, Decimal)):
-            return float(ts_value)
-        elif isinstance(ts_value, str):
-            try:
-                return datetime.fromisoformat(ts_value.replace('Z', '+00:00')).timestamp()
-            except ValueError:
-                try:
-                    return float(ts_value)
-                except ValueError:
-                    return 0
-        return 0
-    
-    sorted_items = sorted(items, key=get_timestamp_value)
-    items_to_delete = sorted_items[:delete_count]
-    
-    deleted_items = []
+    Expected event structure:
+    {
+        "table_name": "benfen-breakfast",
+        "policies": [{"max_age_days": 90}, {"keep_last": 1000}, {"keep_newest_per_partition": 1}],
+        "timestamp_attribute": "created_at",  # Optional: attribute holding each item's age
+        "partitions": ["bk_2025-07-01"],  # Only consider these partitions (default ["token"] on the token table)
+        "dry_run": true  # Optional: report what would be deleted and its capacity
+    }
     
-    for item in items_to_delete:
-        # Build key for deletion
-        key = {primary_key_name: item[primary_key_name]}
-        if sort_key_name and sort_key_name in item:
-            key[sort_key_name] = item[sort_key_name]
+    An item is deleted if any policy selects it. Deleting orders rebuilds
+    the summaries of their dates.
+    """
+    try:
+        table_name = event.get('table_name')
+        if not table_name:
+            raise ValueError("table_name is required in the event")
+        policies = parse_policies(event['policies'])
+        if not policies:
+            raise ValueError("policies must list at least one policy")
+        
+        partitions = event.get('partitions')
+        if partitions is None and table_keys(dynamodb_client, table_name)[0] == TOKEN_PARTITION_KEY:
+            partitions = [TOKEN_TYPE]
+        
+        report = apply_retention(
+            dynamodb_client, table_name, policies,
+            timestamp_attribute=event.get('timestamp_attribute', TOKEN_SORT_KEY),
+            partitions=partitions,
+            dry_run=bool(event.get('dry_run', False))
+        )
         
-        try:
-            table.delete_item(Key=key)
-            deleted_items.append(item)
-        except Exception as e:
-            logger.error(f"Failed to delete item: {e}")
-            raise e
+        return {
+            'statusCode': 200,
+            'body': json.dumps(report, default=str)
+        }
     
-    return deleted_items
+    except ValueError as e:
+        return {
+            'statusCode': 400,
+            'body': json.dumps({'error': str(e)})
+        }
+    except Exception as e:
+        logger.error(f"Error in handle_retention: {str(e)}")
+        return {
+            'statusCode': 500,
+            'body': json.dumps({
+                'error': str(e),
+                'message': 'Failed to apply retention policies'
+            })
+        }
@@ -0,0 +1,98 @@
+import importlib.util
+import json
+import os
+
+import pytest
+
+moto = pytest.importorskip("moto")
+boto3 = pytest.importorskip("boto3")
+
+TABLE_NAME = 'benfen-tokens'
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture
+def expiry():
+    os.environ.setdefault('AWS_ACCESS_KEY_ID', 'testing')
+    os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'testing')
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'ca-central-1')
+    with moto.mock_aws():
+        table = boto3.resource('dynamodb').create_table(
+            TableName=TABLE_NAME,
+            KeySchema=[{'AttributeName': 'type', 'KeyType': 'HASH'},
+                       {'AttributeName': 'created_at', 'KeyType': 'RANGE'}],
+            AttributeDefinitions=[{'AttributeName': 'type', 'AttributeType': 'S'},
+                                  {'AttributeName': 'created_at', 'AttributeType': 'S'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        with table.batch_writer() as batch:
+            batch.put_item(Item={'type': 'prewarm', 'created_at': '0'})
+            for i in range(60):
+                batch.put_item(Item={'type': 'token', 'created_at': str(1754000000 + i), 'token': f't{i}'})
+            # Deny-list entries whose token ids happen to be all digits, so their keys read as timestamps
+            for i in range(3):
+                batch.put_item(Item={'type': 'revoked', 'created_at': f'1754000100.00000{i}',
+                                     'token_id': f'00000{i}', 'expires_at': 1756600000})
+
+        spec = importlib.util.spec_from_file_location('token_expiry', os.path.join(HERE, 'lambda_function.py'))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        yield module, table
+
+
+def test_oldest_tokens_are_deleted_in_batches(expiry, monkeypatch):
+    module, table = expiry
+    client = module.dynamodb.meta.client
+    batch_write_item = client.batch_write_item
+    batches = []
+
+    def counting_batch_write_item(RequestItems, **kwargs):
+        batches.append(len(RequestItems[TABLE_NAME]))
+        return batch_write_item(RequestItems=RequestItems, **kwargs)
+
+    monkeypatch.setattr(client, 'batch_write_item', counting_batch_write_item)
+
+    response = module.lambda_handler({'table_name': TABLE_NAME, 'delete_count': 30}, None)
+
+    body = json.loads(response['body'])
+    assert response['statusCode'] == 200 and body['deleted_count'] == 30
+    assert [item['token'] for item in body['deleted_items']] == [f't{i}' for i in range(30)]
+    assert batches == [25, 5]
+
+    remaining = table.scan()['Items']
+    assert len(remaining) == 34
+    assert min(item['created_at'] for item in remaining if item['type'] == 'token') == '1754000030'
+    assert {'type': 'prewarm', 'created_at': '0'} in remaining
+
+
+
+def test_retention_dry_run_leaves_the_table_alone(expiry):
+    module, table = expiry
+
+    response = module.lambda_handler({'table_name': TABLE_NAME, 'policies': [{'keep_last': 10}],
+                                      'partitions': ['token'], 'dry_run': True}, None)
+
+    report = json.loads(response['body'])
+    assert response['statusCode'] == 200
+    assert report['selected_count'] == 50 and report['deleted_count'] == 0
+    assert report['write_capacity_units'] == 50
+    assert len(table.scan()['Items']) == 64
+
+    response = module.lambda_handler({'table_name': TABLE_NAME, 'policies': [{'keep_oldest': 10}]}, None)
+    assert response['statusCode'] == 400
+
+
+def test_retention_on_the_token_table_only_touches_tokens(expiry):
+    module, table = expiry
+
+    response = module.lambda_handler({'table_name': TABLE_NAME, 'policies': [{'keep_last': 10}]}, None)
+
+    assert json.loads(response['body'])['deleted_count'] == 50
+    remaining = table.scan()['Items']
+    assert sum(item['type'] == 'revoked' for item in remaining) == 3
+    assert {'type': 'prewarm', 'created_at': '0'} in remaining
+
+    response = module.lambda_handler({'table_name': TABLE_NAME, 'policies': [{'keep_last': 0}],
+                                      'partitions': ['token', 'revoked']}, None)
+    assert response['statusCode'] == 400
+    assert len(table.scan()['Items']) == 14
@@ -0,0 +1,7 @@
+"""
+Code shared by the breakfast Lambdas.
+
+Each function bundles this package next to its handler (see
+backend/shared/README.md), so it only depends on the standard library
+and boto3.
+"""
@@ -0,0 +1,53 @@
+"""
+The inn's clock: which breakfast date "today" and "tomorrow" are.
+
+Lambdas run in UTC, but orders are partitioned by the inn's local date.
+Asking datetime.now() for the date gives tomorrow's date from 20:30 in
+Newfoundland onwards, so every handler resolves dates here instead.
+
+The zone comes from INN_TIME_ZONE and is loaded once per container, at
+import. Tests freeze time by replacing utc_now.
+"""
+import os
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+INN_TIME_ZONE = ZoneInfo(os.environ.get('INN_TIME_ZONE', 'America/St_Johns'))
+
+DATE_FORMAT = '%Y-%m-%d'
+
+
+def utc_now():
+    """Current time in UTC (aware)"""
+    return datetime.now(timezone.utc)
+
+
+def local_now():
+    """Current time at the inn (aware)"""
+    return utc_now().astimezone(INN_TIME_ZONE)
+
+
+def today():
+    """Today's date at the inn"""
+    return local_now().date()
+
+
+def resolve_date(value=None):
+    """
+    Breakfast date named in a request.
+
+    Args:
+        value (str): "today" or "tomorrow" (any case), a YYYY-MM-DD date,
+            or None/"" for today
+
+    Returns:
+        str: Date in YYYY-MM-DD format
+
+    Raises:
+        ValueError: If value is not one of the above
+    """
+    if not value or value.lower() == 'today':
+        return today().strftime(DATE_FORMAT)
+    if value.lower() == 'tomorrow':
+        return (today() + timedelta(days=1)).strftime(DATE_FORMAT)
+    return datetime.strptime(value, DATE_FORMAT).strftime(DATE_FORMAT)
@@ -0,0 +1,211 @@
+"""
+Reading breakfast orders from DynamoDB.
+
+Queries follow LastEvaluatedKey, so a partition larger than the 1 MB
+page limit is read in full, and orders are yielded page by page rather
+than collected into one list.
+
+Order items come in two storage formats:
+
+    1 (no format_version): order_data is a string of DynamoDB JSON, which
+      needs json.loads and then a second deserialization pass
+    2: order_data is a native map, deserialized with the rest of the item
+
+Both are read here; migrate_orders.py in the order API rewrites format 1
+items in place.
+
+Items are converted with from_wire rather than boto3's TypeDeserializer:
+numbers become int or float (room numbers are ints, timestamps floats)
+instead of Decimal, which is what the JSON responses needed anyway.
+"""
+import json
+import logging
+
+from boto3.dynamodb.types import TypeDeserializer
+
+logger = logging.getLogger(__name__)
+
+ORDER_PARTITION_KEY = 'bk_yyyy-mm-dd'
+ORDER_SORT_KEY = 'roomnumber-name'
+ORDER_FORMAT_VERSION = 2
+# Per-date order counts are kept in the orders table under this partition,
+# one item per date with the date as sort key and an orderCount attribute
+DATES_PARTITION = 'dates'
+# Only the attributes the order reports read are fetched
+REPORT_ATTRIBUTES = ('order_data', 'scheduled_minutes')
+
+# Fallback for attribute types orders don't use (sets, binary)
+deserializer = TypeDeserializer()
+
+
+def _number(text):
+    """An N value as int if it's integral, otherwise float"""
+    try:
+        return int(text)
+    except ValueError:
+        number = float(text)
+        return int(number) if number.is_integer() else number
+
+
+def from_wire(value):
+    """
+    Convert one DynamoDB wire-format attribute value to plain Python types.
+
+    S, N, BOOL, M, L and NULL are handled inline; anything else goes
+    through TypeDeserializer.
+    """
+    (tag, data), = value.items()
+    if tag == 'S' or tag == 'BOOL':
+        return data
+    if tag == 'M':
+        return {k: from_wire(v) for k, v in data.items()}
+    if tag == 'N':
+        return _number(data)
+    if tag == 'L':
+        return [from_wire(v) for v in data]
+    if tag == 'NULL':
+        return None
+    return deserializer.deserialize(value)
+
+
+def query_pages(client, **kwargs):
+    """
+    Run a low-level DynamoDB query, yielding one response page at a time.
+
+    Args:
+        client: boto3 DynamoDB client
+        **kwargs: Arguments for client.query (ExclusiveStartKey is managed here)
+
+    Yields:
+        dict: Query response pages
+    """
+    while True:
+        response = client.query(**kwargs)
+        yield response
+        last_key = response.get('LastEvaluatedKey')
+        if not last_key:
+            return
+        kwargs['ExclusiveStartKey'] = last_key
+
+
+def deserialize_order_item(item):
+    """
+    Convert a low-level order item to Python types.
+
+    order_data may be a native map or, on format 1 items, a JSON string of
+    DynamoDB wire format; both are returned as a plain dict.
+
+    Returns:
+        dict: The order item, or None if its order_data can't be parsed
+    """
+    order_data = item.get('order_data')
+    if order_data is not None and 'S' in order_data:
+        # Decode the string to wire format so the item is deserialized in one pass
+        try:
+            item = dict(item, order_data={'M': json.loads(order_data['S'])})
+        except json.JSONDecodeError as e:
+            logger.error(f"Error parsing order_data: {e}")
+            logger.debug(f"order_data content: {order_data['S']}")
+            return None
+
+    try:
+        return {k: from_wire(v) for k, v in item.items()}
+    except (KeyError, TypeError, ValueError) as e:
+        logger.error(f"Error parsing order_data: {e}")
+        logger.debug(f"order_data content: {order_data}")
+        return None
+
+
+def iter_breakfast_orders(client, table_name, date, attributes=None, page_size=None):
+    """
+    Stream the breakfast orders for one date, following every result page.
+
+    Args:
+        client: boto3 DynamoDB client
+        table_name (str): Name of the orders table
+        date (str): Date in YYYY-MM-DD format
+        attributes (iterable): Only read these attributes (all if None)
+        page_size (int): Maximum items per query page (DynamoDB's 1 MB limit if None)
+
+    Yields:
+        dict: Deserialized order items
+    """
+    kwargs = {
+        'TableName': table_name,
+        'KeyConditionExpression': '#pk = :pk',
+        'ExpressionAttributeNames': {'#pk': ORDER_PARTITION_KEY},
+        'ExpressionAttributeValues': {':pk': {'S': f"bk_{date}"}},
+    }
+    if attributes:
+        placeholders = []
+        for i, name in enumerate(attributes):
+            kwargs['ExpressionAttributeNames'][f'#a{i}'] = name
+            placeholders.append(f'#a{i}')
+        kwargs['ProjectionExpression'] = ', '.join(placeholders)
+    if page_size:
+        kwargs['Limit'] = page_size
+
+    for page in query_pages(client, **kwargs):
+        for item in page.get('Items', []):
+            order = deserialize_order_item(item)
+            if order is not None:
+                yield order
+
+
+def query_breakfast_orders(client, table_name, date, attributes=REPORT_ATTRIBUTES):
+    """
+    Stream a date's breakfast orders for a report, page by page as they are consumed.
+
+    Args:
+        client: boto3 DynamoDB client
+        table_name (str): Name of the orders table
+        date (str): Date in YYYY-MM-DD format
+        attributes (iterable): Attributes to read (those the email reports use by default)
+
+    Returns:
+        iterator: Deserialized order items
+    """
+    return iter_breakfast_orders(client, table_name, date, attributes=attributes)
+
+
+def query_order_dates(client, table_name, limit, before=None):
+    """
+    Read per-date order counts, newest date first.
+
+    A date's summary stays behind at zero once its orders are moved or
+    deleted. Those dates are skipped, and pages are read until `limit`
+    dates with orders are found or the partition runs out.
+
+    Args:
+        client: boto3 DynamoDB client
+        table_name (str): Name of the orders table
+        limit (int): Maximum number of dates to return
+        before (str): Only return dates before this one (YYYY-MM-DD)
+
+    Returns:
+        tuple: (list of (date, order count), `before` value for the next page or None)
+    """
+    kwargs = {
+        'TableName': table_name,
+        'KeyConditionExpression': '#pk = :pk',
+        'ExpressionAttributeNames': {'#pk': ORDER_PARTITION_KEY},
+        'ExpressionAttributeValues': {':pk': {'S': DATES_PARTITION}},
+        'ScanIndexForward': False,
+        'Limit': limit,
+    }
+    if before:
+        kwargs['KeyConditionExpression'] += ' AND #sk < :before'
+        kwargs['ExpressionAttributeNames']['#sk'] = ORDER_SORT_KEY
+        kwargs['ExpressionAttributeValues'][':before'] = {'S': before}
+
+    dates = []
+    for page in query_pages(client, **kwargs):
+        for item in page.get('Items', []):
+            count = _number(item['orderCount']['N']) if 'orderCount' in item else 0
+            if count <= 0:
+                continue
+            date = item[ORDER_SORT_KEY]['S']
+            dates.append((date, count))
+            if len(dates) == limit:
+                return dates, date
+    return dates, None
@@ -0,0 +1,256 @@
+"""
+Breakfast order model shared by the report and mobile API Lambdas.
+
+An order item from DynamoDB is walked once into an Order with its line
+items and count keys precomputed, so counting, HTML/text rendering and
+mobile formatting all read the same flat fields instead of re-walking
+the nested order_data dict.
+
+Guests at a small inn often order exactly the same breakfast. With a
+LineItemCache, orders whose dishes, drinks and special options are the
+same share one set of line items, and anything rendered from them (the
+report HTML, the mobile API items) is rendered once per run and reused.
+"""
+
+TOPPING_NAMES = (
+    ('berries', 'berries', 'Berries'),
+    ('bacon', 'bacon', 'Bacon'),
+    ('whippedCream', 'whipped cream', 'Whipped Cream'),
+)
+
+# Sort key for orders without a usable scheduled time: after every real time
+UNSCHEDULED_MINUTES = 24 * 60
+
+
+def time_minutes(time_str):
+    """
+    Minutes since midnight of a scheduled time.
+
+    Accepts 24-hour ("07:30") and 12-hour ("7:30 AM", "7 pm") times.
+
+    Args:
+        time_str (str): Scheduled time as entered on the order
+
+    Returns:
+        int: Minutes since midnight, or None if the time can't be read
+    """
+    if not isinstance(time_str, str):
+        return None
+    text = time_str.strip().upper()
+    meridiem = text[-2:] if text.endswith(('AM', 'PM')) else None
+    if meridiem:
+        text = text[:-2].strip()
+
+    hour, _, minute = text.partition(':')
+    try:
+        hour = int(hour)
+        minute = int(minute) if minute else 0
+    except ValueError:
+        return None
+
+    if meridiem:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if meridiem == 'PM' else 0)
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        return None
+    return hour * 60 + minute
+
+
+def time_sort_key(time_str):
+    """Sort key putting scheduled times in chronological order, unreadable times last"""
+    minutes = time_minutes(time_str)
+    return (UNSCHEDULED_MINUTES, time_str) if minutes is None else (minutes, '')
+
+
+class LineItem:
+    """
+    One dish, side or drink on an order.
+
+    `description` is what's shown on the order ("Pancakes with berries");
+    `count_key` is what it's counted as in the summaries ("Pancakes").
+    """
+    __slots__ = ('category', 'name', 'description', 'details', 'count_key')
+
+    def __init__(self, category, name, description, details=None, count_key=None):
+        self.category = category
+        self.name = name
+        self.description = description
+        self.details = details
+        self.count_key = count_key or description
+
+    @property
+    def is_main(self):
+        return self.category == 'main'
+
+
+class Order:
+    """
+    A parsed breakfast order.
+
+    Attributes:
+        time (str): Scheduled time, or "" if the order has none
+        display_time (str): Scheduled time as shown on reports ("N/A" if missing)
+        minutes (int): Scheduled time in minutes since midnight, or None if it
+            has none. Read from the item's scheduled_minutes attribute, which
+            the order API stores at ingest; parsed from the time for older orders.
+        item_keys (tuple): Count key for each line item, e.g. "Eggs (over easy)"
+        topping_keys (tuple): Count keys for pancake/waffle toppings, e.g. "Berries"
+        rendered (dict): Renderings of the line items by output format, shared
+            with identical orders when parsed with a LineItemCache
+    """
+    __slots__ = ('order_id', 'customer_name', 'room_number', 'date', 'time', 'display_time', 'minutes', 'created_at',
+                 'special_options', 'line_items', 'item_keys', 'topping_keys', 'rendered')
+
+    def __init__(self, item, cache=None):
+        order_data = item.get('order_data') or {}
+        customer = order_data.get('customer', {})
+        scheduling = order_data.get('scheduling', {})
+
+        self.order_id = item.get('order_id', '')
+        self.created_at = item.get('created_at', '')
+        self.customer_name = customer.get('firstName', 'Unknown')
+        self.room_number = customer.get('roomNumber', 'N/A')
+        self.date = scheduling.get('date', '')
+        self.time = scheduling.get('time') or ''
+        self.display_time = scheduling.get('time', 'N/A')
+        minutes = item.get('scheduled_minutes')
+        self.minutes = int(minutes) if minutes is not None else time_minutes(self.time)
+        self.special_options = (order_data.get('specialOptions') or '').strip()
+
+        if cache is not None:
+            self.line_items, self.item_keys, self.topping_keys, self.rendered = cache.lookup(order_data)
+        else:
+            self.line_items, self.item_keys, self.topping_keys, self.rendered = _line_item_entry(order_data)
+
+
+def _line_item_entry(order_data):
+    line_items, topping_keys = _parse_line_items(order_data)
+    item_keys = tuple(line_item.count_key for line_item in line_items)
+    return tuple(line_items), item_keys, tuple(topping_keys), {}
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(v)) for key, v in value.items()))
+    return value
+
+
+def order_fingerprint(order_data):
+    """
+    Canonical key for what an order contains, ignoring who ordered it and when.
+
+    Two orders with the same fingerprint have the same line items and
+    special options, however their dicts are ordered.
+    """
+    return tuple(sorted((key, _freeze(value)) for key, value in order_data.items()
+                        if key not in ('customer', 'scheduling')))
+
+
+class LineItemCache:
+    """
+    Line items shared by identical orders, for the length of one run.
+
+    Attributes:
+        hits (int): Orders that reused an earlier order's line items
+        misses (int): Orders whose line items were worked out
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, order_data):
+        """Return (line_items, item_keys, topping_keys, rendered) for order_data"""
+        try:
+            key = order_fingerprint(order_data)
+            entry = self._entries.get(key)
+        except TypeError:  # unhashable values (lists) - don't share
+            key = entry = None
+        if entry is not None:
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        entry = _line_item_entry(order_data)
+        if key is not None:
+            self._entries[key] = entry
+        return entry
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def _toppings(selected):
+    names = [name for key, name, _ in TOPPING_NAMES if selected.get(key)]
+    keys = [count_key for key, _, count_key in TOPPING_NAMES if selected.get(key)]
+    return names, keys
+
+
+def _parse_line_items(order_data):
+    """Walk order_data once, in the order items are listed on the report"""
+    line_items = []
+    topping_keys = []
+
+    eggs = order_data.get('eggs', {})
+    if eggs.get('style'):
+        style_text = eggs['style']
+        if eggs.get('overStyle'):
+            style_text += f" {eggs['overStyle']}"
+        line_items.append(LineItem('main', 'Eggs', f"Eggs ({style_text})", {
+            'style': eggs.get('style', ''),
+            'overStyle': eggs.get('overStyle', '')
+        }))
+
+    for dish, name, options_key in (('pancakes', 'Pancakes', 'toppings'), ('waffles', 'Waffles', 'options')):
+        dish_data = order_data.get(dish, {})
+        if dish_data.get('selected'):
+            selected = dish_data.get(options_key, {})
+            names, keys = _toppings(selected)
+            description = f"{name} with {', '.join(names)}" if names else name
+            line_items.append(LineItem('main', name, description, selected, count_key=name))
+            topping_keys.extend(keys)
+
+    sides = order_data.get('sides', {})
+    for key, name in (('bacon', 'Bacon'), ('homeFries', 'Home Fries'), ('beans', 'Beans')):
+        if sides.get(key):
+            line_items.append(LineItem('side', name, name))
+
+    toast = sides.get('toast', {})
+    if toast.get('selected'):
+        bread_type = toast.get('breadType', 'regular')
+        line_items.append(LineItem('side', 'Toast', f'Toast ({bread_type})', {'breadType': bread_type}))
+
+    drinks = order_data.get('drinks', {})
+    for key, name in (('water', 'Water'), ('milk', 'Milk'), ('coffee', 'Coffee'), ('tea', 'Tea')):
+        if drinks.get(key):
+            line_items.append(LineItem('drink', name, name))
+
+    juice = drinks.get('juice', {})
+    if juice.get('selected'):
+        juice_type = juice.get('juiceType', 'regular')
+        line_items.append(LineItem('drink', 'Juice', f'Juice ({juice_type})', {'juiceType': juice_type}))
+
+    return line_items, topping_keys
+
+
+def parse_orders(items, cache=None):
+    """
+    Parse deserialized DynamoDB order items into Order objects
+
+    Args:
+        items (iterable): Deserialized order items
+        cache (LineItemCache): Share line items between identical orders
+
+    Returns:
+        list: Order objects
+    """
+    return [Order(item, cache) for item in items]
+
+
+def order_sort_key(order):
+    """Sort key putting orders in order of scheduled time, unscheduled orders last"""
+    return UNSCHEDULED_MINUTES if order.minutes is None else order.minutes
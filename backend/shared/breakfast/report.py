@@ -0,0 +1,1033 @@
+"""
+HTML report of a day's breakfast orders, as emailed by the report Lambdas.
+
+The page is a set of str.format templates that are split into literal
+chunks and field names once, at import. Rendering appends chunks and
+values to a single list that is joined at the end, so the stylesheet at
+the top of the page is never rebuilt or copied while the page grows.
+Each order's line items are rendered in one pass for both the desktop
+and the mobile layout.
+
+The multi-day prep report reuses the same stylesheet and item and order
+templates, with a shopping table for the whole range and a section per day.
+
+Both report Lambdas send the daily report through send_breakfast_report_email.
+"""
+import logging
+from datetime import datetime
+from string import Formatter
+
+from breakfast.orders import order_sort_key
+
+logger = logging.getLogger(__name__)
+
+
+def compile_template(template):
+    """
+    Split a str.format template into (literal text, field name) pairs.
+
+    Adjacent literals, including escaped braces, are merged so each field
+    costs one append when rendered. The last pair has no field (None).
+    """
+    compiled = []
+    literal = ''
+    for text, field, _, _ in Formatter().parse(template):
+        literal += text
+        if field is not None:
+            compiled.append((literal, field))
+            literal = ''
+    compiled.append((literal, None))
+    return tuple(compiled)
+
+
+def render_into(parts, template, values):
+    """Append a compiled template, filled in with values, to a list of parts"""
+    for literal, field in template:
+        parts.append(literal)
+        if field is not None:
+            parts.append(f"{values[field]}")
+
+
+# Head and stylesheet, shared by the daily and multi-day reports
+REPORT_HEAD = compile_template("""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="UTF-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <style>
+            body {{
+                font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+                margin: 0;
+                padding: 10px;
+                background-color: #f5f5f5;
+                font-size: 12px;
+            }}
+            .container {{
+                max-width: 1000px;
+                margin: 0 auto;
+                background-color: white;
+                padding: 15px;
+                border-radius: 5px;
+                box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
+            }}
+            .header {{
+                text-align: center;
+                border-bottom: 2px solid #2196F3;
+                padding-bottom: 15px;
+                margin-bottom: 20px;
+            }}
+            .header h1 {{
+                color: #1976D2;
+                margin: 0 0 8px 0;
+                font-size: 20px;
+            }}
+            .date {{
+                color: #666;
+                font-size: 14px;
+                margin: 0;
+            }}
+            .summary {{
+                background-color: #E3F2FD;
+                padding: 15px;
+                border-radius: 5px;
+                margin-bottom: 20px;
+                border-left: 3px solid #2196F3;
+            }}
+            .summary h2 {{
+                color: #1976D2;
+                margin: 0 0 12px 0;
+                font-size: 16px;
+            }}
+            .summary h3 {{
+                color: #1976D2;
+                margin: 15px 0 8px 0;
+                font-size: 14px;
+            }}
+            .stats {{
+                display: flex;
+                justify-content: space-around;
+                margin: 12px 0;
+                padding: 0 10px;
+            }}
+            .stat {{
+                text-align: center;
+                flex: 1;
+            }}
+            .stat-number {{
+                font-size: 18px;
+                font-weight: bold;
+                color: #2196F3;
+                line-height: 1.2;
+                margin-bottom: 2px;
+            }}
+            .stat-label {{
+                color: #666;
+                font-size: 11px;
+                line-height: 1.2;
+                padding-right: 8px
+            }}
+            .items-grid {{
+                display: grid;
+                grid-template-columns: repeat(auto-fit, minmax(80px, 1fr));
+                gap: 6px;
+                margin: 10px 0 0 0;
+                padding: 0;
+            }}
+            .item-count {{
+                background-color: #F5F5F5;
+                padding: 6px;
+                border-radius: 3px;
+                text-align: center;
+                border: 1px solid #DDD;
+            }}
+            .item-name {{
+                font-weight: bold;
+                color: #1976D2;
+                font-size: 10px;
+                line-height: 1.2;
+                margin-bottom: 2px;
+            }}
+            .item-number {{
+                font-size: 14px;
+                color: #2196F3;
+                line-height: 1;
+                margin: 0;
+            }}
+            .orders-section {{
+                margin-top: 20px;
+            }}
+            .orders-section h2 {{
+                color: #1976D2;
+                margin: 0 0 12px 0;
+                font-size: 16px;
+            }}
+            .order-card {{
+                background-color: #FAFAFA;
+                border: 1px solid #E0E0E0;
+                border-radius: 5px;
+                padding: 12px;
+                margin-bottom: 10px;
+                page-break-inside: avoid;
+                box-sizing: border-box;
+            }}
+            .order-header {{
+                display: flex;
+                flex-wrap: wrap;
+                gap: 8px;
+                align-items: flex-start;
+                margin-bottom: 10px;
+                border-bottom: 1px solid #E0E0E0;
+                padding-bottom: 8px;
+            }}
+            .customer-info {{
+                font-weight: bold;
+                color: #1976D2;
+                font-size: 13px;
+                line-height: 1.3;
+                flex: 1 1 auto;
+                min-width: 120px;
+                word-wrap: break-word;
+            }}
+            .room-number {{
+                background-color: #2196F3;
+                color: white;
+                padding: 3px 7px;
+                border-radius: 10px;
+                font-size: 10px;
+                white-space: nowrap;
+                flex-shrink: 0;
+            }}
+            .order-time {{
+                color: #666;
+                font-size: 11px;
+                line-height: 1.3;
+                flex-shrink: 0;
+                margin-top: 2px;
+            }}
+            .order-items {{
+                display: flex;
+                flex-wrap: wrap;
+                gap: 5px;
+                margin-top: 2px;
+            }}
+            .order-item {{
+                background-color: white;
+                padding: 5px 8px;
+                border-radius: 3px;
+                border: 1px solid #E0E0E0;
+                font-size: 11px;
+                line-height: 1.2;
+                box-sizing: border-box;
+                word-wrap: break-word;
+                max-width: 100%;
+            }}
+            .order-item.selected {{
+                background-color: #E3F2FD;
+                border-color: #2196F3;
+            }}
+            /* Mobile-only layout - completely different structure */
+            .mobile-layout {{
+                display: none;
+            }}
+            
+            .desktop-layout {{
+                display: block;
+            }}
+            
+            @media screen and (max-width: 600px) {{
+                /* Hide desktop layout on mobile */
+                .desktop-layout {{
+                    display: none;
+                }}
+                
+                /* Show mobile-only layout */
+                .mobile-layout {{
+                    display: block;
+                }}
+                
+                body {{
+                    padding: 8px;
+                    font-size: 14px;
+                    background-color: #f8f9fa;
+                }}
+                
+                .mobile-container {{
+                    background-color: white;
+                    border-radius: 8px;
+                    overflow: hidden;
+                    box-shadow: 0 2px 8px rgba(0, 0, 0, 0.1);
+                }}
+                
+                .mobile-header {{
+                    background: linear-gradient(135deg, #2196F3, #1976D2);
+                    color: white;
+                    padding: 16px;
+                    text-align: center;
+                }}
+                
+                .mobile-header h1 {{
+                    margin: 0 0 4px 0;
+                    font-size: 22px;
+                    font-weight: 600;
+                }}
+                
+                .mobile-date {{
+                    font-size: 14px;
+                    opacity: 0.9;
+                    margin: 0;
+                }}
+                
+                .mobile-summary {{
+                    padding: 16px;
+                    background-color: #f8f9fa;
+                    border-bottom: 1px solid #e9ecef;
+                }}
+                
+                .mobile-stats {{
+                    display: grid;
+                    grid-template-columns: 1fr 1fr;
+                    gap: 12px;
+                    margin-bottom: 16px;
+                }}
+                
+                .mobile-stat {{
+                    background: white;
+                    padding: 12px;
+                    border-radius: 6px;
+                    text-align: center;
+                    box-shadow: 0 1px 3px rgba(0, 0, 0, 0.1);
+                }}
+                
+                .mobile-stat-number {{
+                    font-size: 20px;
+                    font-weight: bold;
+                    color: #2196F3;
+                    display: block;
+                }}
+                
+                .mobile-stat-label {{
+                    font-size: 12px;
+                    color: #666;
+                    margin-top: 4px;
+                }}
+                
+                .mobile-items-summary {{
+                    background: white;
+                    padding: 12px;
+                    border-radius: 6px;
+                    box-shadow: 0 1px 3px rgba(0, 0, 0, 0.1);
+                }}
+                
+                .mobile-items-title {{
+                    font-size: 16px;
+                    font-weight: 600;
+                    color: #1976D2;
+                    margin: 0 0 8px 0;
+                }}
+                
+                .mobile-items-list {{
+                    display: grid;
+                    grid-template-columns: repeat(auto-fit, minmax(70px, 1fr));
+                    gap: 6px;
+                }}
+                
+                .mobile-item {{
+                    background: #f8f9fa;
+                    padding: 8px 4px;
+                    border-radius: 4px;
+                    text-align: center;
+                    border: 1px solid #e9ecef;
+                }}
+                
+                .mobile-item-name {{
+                    font-size: 10px;
+                    color: #1976D2;
+                    font-weight: 500;
+                    line-height: 1.2;
+                    margin-bottom: 2px;
+                }}
+                
+                .mobile-item-count {{
+                    font-size: 16px;
+                    font-weight: bold;
+                    color: #2196F3;
+                }}
+                
+                .mobile-orders {{
+                    padding: 16px;
+                }}
+                
+                .mobile-orders-title {{
+                    font-size: 18px;
+                    font-weight: 600;
+                    color: #1976D2;
+                    margin: 0 0 16px 0;
+                    text-align: center;
+                }}
+                
+                .mobile-order {{
+                    background: white;
+                    border-radius: 8px;
+                    margin-bottom: 12px;
+                    box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
+                    overflow: hidden;
+                }}
+                
+                .mobile-order-header {{
+                    background: #2196F3;
+                    color: white;
+                    padding: 12px 16px;
+                    display: flex;
+                    justify-content: space-between;
+                    align-items: center;
+                }}
+                
+                .mobile-customer {{
+                    font-weight: 600;
+                    font-size: 16px;
+                }}
+                
+                .mobile-room {{
+                    background: rgba(255, 255, 255, 0.2);
+                    padding: 4px 8px;
+                    border-radius: 12px;
+                    font-size: 12px;
+                    margin-left: 8px;
+                }}
+                
+                .mobile-time {{
+                    font-size: 14px;
+                    opacity: 0.9;
+                }}
+                
+                .mobile-order-items {{
+                    padding: 16px;
+                }}
+                
+                .mobile-order-item {{
+                    background: #f8f9fa;
+                    padding: 8px 12px;
+                    margin: 4px 0;
+                    border-radius: 20px;
+                    border-left: 3px solid #2196F3;
+                    font-size: 14px;
+                    color: #333;
+                }}
+                
+                /* Special styling for important items */
+                .mobile-order-item.main-dish {{
+                    background: #e3f2fd;
+                    border-left-color: #1976D2;
+                    font-weight: 500;
+                }}
+            }}
+            @media print {{
+                body {{
+                    background-color: white;
+                    font-size: 11px;
+                }}
+                .container {{
+                    box-shadow: none;
+                    padding: 5px;
+                }}
+                .order-card {{
+                    page-break-inside: avoid;
+                    margin-bottom: 5px;
+                }}
+            }}
+        </style>
+    </head>
+    <body>
+""")
+
+# Summary section of the desktop layout
+REPORT_START = compile_template("""        <!-- Desktop Layout -->
+        <div class="desktop-layout">
+            <div class="container">
+                <div class="header">
+                    <h1>Breakfast</h1>
+                    <div class="date">{date_display}</div>
+                </div>
+
+                <div class="summary">
+                    <h2>Summary</h2>
+                    <div class="stats">
+                        <div class="stat">
+                            <div class="stat-number">{total_orders}</div>
+                            <div class="stat-label">Total Orders</div>
+                        </div>
+                        <div class="stat">
+                            <div class="stat-number">{earliest_time}</div>
+                            <div class="stat-label">First Breakfast</div>
+                        </div>
+                        <div class="stat">
+                            <div class="stat-number">{latest_time}</div>
+                            <div class="stat-label">Last Breakfast</div>
+                        </div>
+                    </div>
+
+                    <h3>Item Counts</h3>
+                    <div class="items-grid">
+    """)
+
+DESKTOP_ITEM_COUNT = compile_template("""
+                        <div class="item-count">
+                            <div class="item-name">{item}</div>
+                            <div class="item-number">{count}</div>
+                        </div>
+        """)
+
+DESKTOP_ORDERS_START = compile_template("""
+                    </div>
+                </div>
+
+                <div class="orders-section">
+                    <h2>Individual Orders</h2>
+    """)
+
+DESKTOP_ORDER_START = compile_template("""
+                    <div class="order-card">
+                        <div class="order-header">
+                            <div class="customer-info">
+                                {customer_name}
+                                <span class="room-number">Room {room_number}</span>
+                            </div>
+                            <div class="order-time">{order_time}</div>
+                        </div>
+                        <div class="order-items">
+        """)
+
+# Closes an order card in either layout
+ORDER_END = compile_template("""
+                        </div>
+                    </div>
+        """)
+
+MOBILE_START = compile_template("""
+                </div>
+            </div>
+        </div>
+        
+        <!-- Mobile Layout -->
+        <div class="mobile-layout">
+            <div class="mobile-container">
+                <div class="mobile-header">
+                    <h1>Breakfast Orders</h1>
+                    <div class="mobile-date">{date_display}</div>
+                </div>
+                
+                <div class="mobile-summary">
+                    <div class="mobile-stats">
+                        <div class="mobile-stat">
+                            <span class="mobile-stat-number">{total_orders}</span>
+                            <div class="mobile-stat-label">Total Orders</div>
+                        </div>
+                        <div class="mobile-stat">
+                            <span class="mobile-stat-number">{earliest_time}</span>
+                            <div class="mobile-stat-label">First Time</div>
+                        </div>
+                    </div>
+                    
+                    <div class="mobile-items-summary">
+                        <div class="mobile-items-title">Items Ordered</div>
+                        <div class="mobile-items-list">
+    """)
+
+MOBILE_ITEM_COUNT = compile_template("""
+                            <div class="mobile-item">
+                                <div class="mobile-item-name">{mobile_item_name}</div>
+                                <div class="mobile-item-count">{count}</div>
+                            </div>
+        """)
+
+MOBILE_ORDERS_START = compile_template("""
+                        </div>
+                    </div>
+                </div>
+                
+                <div class="mobile-orders">
+                    <div class="mobile-orders-title">Orders ({order_count})</div>
+    """)
+
+MOBILE_ORDER_START = compile_template("""
+                    <div class="mobile-order">
+                        <div class="mobile-order-header">
+                            <div>
+                                <span class="mobile-customer">{customer_name}</span>
+                                <span class="mobile-room">Room {room_number}</span>
+                            </div>
+                            <div class="mobile-time">{order_time}</div>
+                        </div>
+                        <div class="mobile-order-items">
+        """)
+
+REPORT_END = compile_template("""
+                </div>
+            </div>
+        </div>
+    </body>
+    </html>
+    """)
+
+# Multi-day prep report: a shopping table for the whole range, then one
+# section per day built from the daily report's item and order templates
+MULTI_DAY_START = compile_template("""        <!-- Desktop Layout -->
+        <div class="desktop-layout">
+            <div class="container">
+                <div class="header">
+                    <h1>Breakfast Prep</h1>
+                    <div class="date">{range_display}</div>
+                </div>
+
+                <div class="summary">
+                    <h2>Shopping Quantities</h2>
+                    <table style="width: 100%; border-collapse: collapse;">
+                        <tr>
+                            <th style="text-align: left; padding: 4px;">Item</th>
+    """)
+
+SHOPPING_DAY_HEADING = compile_template("""
+                            <th style="text-align: right; padding: 4px;">{day}</th>
+        """)
+
+SHOPPING_HEADINGS_END = compile_template("""
+                            <th style="text-align: right; padding: 4px;">Total</th>
+                        </tr>
+    """)
+
+SHOPPING_ROW_START = compile_template("""
+                        <tr>
+                            <td style="padding: 4px; border-top: 1px solid #eee;">{item}</td>
+        """)
+
+SHOPPING_COUNT = compile_template("""
+                            <td style="text-align: right; padding: 4px; border-top: 1px solid #eee;">{count}</td>
+        """)
+
+SHOPPING_ROW_END = compile_template("""
+                            <td style="text-align: right; padding: 4px; border-top: 1px solid #eee; font-weight: bold;">{total}</td>
+                        </tr>
+        """)
+
+SHOPPING_END = compile_template("""
+                    </table>
+                </div>
+    """)
+
+DESKTOP_DAY_START = compile_template("""
+                <div class="summary">
+                    <h2>{date_display}</h2>
+                    <div class="stats">
+                        <div class="stat">
+                            <div class="stat-number">{total_orders}</div>
+                            <div class="stat-label">Total Orders</div>
+                        </div>
+                        <div class="stat">
+                            <div class="stat-number">{earliest_time}</div>
+                            <div class="stat-label">First Breakfast</div>
+                        </div>
+                        <div class="stat">
+                            <div class="stat-number">{latest_time}</div>
+                            <div class="stat-label">Last Breakfast</div>
+                        </div>
+                    </div>
+
+                    <h3>Item Counts</h3>
+                    <div class="items-grid">
+    """)
+
+# Closes a day's orders section in either layout
+DAY_END = compile_template("""
+                </div>
+    """)
+
+MULTI_DAY_MOBILE_START = compile_template("""
+            </div>
+        </div>
+        
+        <!-- Mobile Layout -->
+        <div class="mobile-layout">
+            <div class="mobile-container">
+                <div class="mobile-header">
+                    <h1>Breakfast Prep</h1>
+                    <div class="mobile-date">{range_display}</div>
+                </div>
+                
+                <div class="mobile-summary">
+                    <div class="mobile-items-summary">
+                        <div class="mobile-items-title">Shopping List</div>
+                        <div class="mobile-items-list">
+    """)
+
+MOBILE_SHOPPING_END = compile_template("""
+                        </div>
+                    </div>
+                </div>
+    """)
+
+MOBILE_DAY_START = compile_template("""
+                <div class="mobile-summary">
+                    <div class="mobile-items-title">{date_display}</div>
+                    <div class="mobile-stats">
+                        <div class="mobile-stat">
+                            <span class="mobile-stat-number">{total_orders}</span>
+                            <div class="mobile-stat-label">Total Orders</div>
+                        </div>
+                        <div class="mobile-stat">
+                            <span class="mobile-stat-number">{earliest_time}</span>
+                            <div class="mobile-stat-label">First Time</div>
+                        </div>
+                    </div>
+                    
+                    <div class="mobile-items-summary">
+                        <div class="mobile-items-list">
+    """)
+
+MULTI_DAY_END = compile_template("""
+            </div>
+        </div>
+    </body>
+    </html>
+    """)
+
+
+def sort_orders_by_time(orders):
+    """
+    Sort orders chronologically by their scheduled time
+
+    Orders are compared on Order.minutes, so 12- and 24-hour times sort
+    together. Orders without a readable time go last.
+
+    Args:
+        orders (list): List of parsed breakfast orders
+
+    Returns:
+        list: Orders sorted by time (earliest to latest)
+    """
+    return sorted(orders, key=order_sort_key)
+
+
+def generate_order_items_html(order):
+    """
+    Generate the HTML for an order's items in both layouts in one pass
+
+    The result is kept on order.rendered, so orders that share line items
+    (see breakfast.orders.LineItemCache) are rendered once.
+
+    Args:
+        order (Order): Parsed breakfast order
+
+    Returns:
+        tuple: (desktop HTML, mobile HTML)
+    """
+    html = order.rendered.get('html')
+    if html is None:
+        html = order.rendered['html'] = _render_order_items(order)
+    return html
+
+
+def _render_order_items(order):
+    desktop = []
+    mobile = []
+    for line_item in order.line_items:
+        description = line_item.description
+        desktop.append(f'<div class="order-item selected">{description}</div>')
+        # Main dishes (eggs, pancakes, waffles) are highlighted on mobile
+        if line_item.is_main:
+            mobile.append(f'<div class="mobile-order-item main-dish">{description}</div>')
+        else:
+            mobile.append(f'<div class="mobile-order-item">{description}</div>')
+
+    # Special Options
+    special_options = order.special_options
+    if special_options:
+        desktop.append(f'<div class="order-item selected" style="color: #e67e22; font-style: italic; margin-top: 8px;">'
+                       f'Special Options: {special_options}</div>')
+        mobile.append(f'<div class="mobile-order-item" style="color: #e67e22; font-style: italic;">'
+                      f'Special: {special_options}</div>')
+
+    return "".join(desktop), "".join(mobile)
+
+
+def order_cards(orders):
+    """
+    Header fields and items of each order, shared by both layouts
+
+    Returns:
+        list: (header dict, (desktop HTML, mobile HTML)) for each order
+    """
+    cards = []
+    for order in orders:
+        header = {
+            'customer_name': order.customer_name,
+            'room_number': order.room_number,
+            'order_time': order.display_time,
+        }
+        cards.append((header, generate_order_items_html(order)))
+    return cards
+
+
+def mobile_item_name(item):
+    """Shorten an item name for the mobile summary"""
+    name = item.replace('Eggs (', '').replace(')', '').replace('Toast (', '').replace('Juice (', '')
+    if len(name) > 12:
+        name = name[:10] + '..'
+    return name
+
+
+def generate_breakfast_email_html(orders, analysis, date):
+    """
+    Generate rich HTML email content for breakfast orders
+
+    Args:
+        orders (list): Parsed breakfast orders, already sorted (see sort_orders_by_time)
+        analysis (dict): Analysis results
+        date (str): Date for the report
+
+    Returns:
+        str: HTML email content
+    """
+    item_counts = sorted(analysis['item_counts'].items())
+    page = {
+        'date_display': datetime.strptime(date, '%Y-%m-%d').strftime('%A, %B %d, %Y'),
+        'total_orders': analysis['total_orders'],
+        'earliest_time': analysis['earliest_time'] or 'N/A',
+        'latest_time': analysis['latest_time'] or 'N/A',
+        'order_count': len(orders),
+    }
+
+    cards = order_cards(orders)
+
+    parts = []
+    render_into(parts, REPORT_HEAD, page)
+    render_into(parts, REPORT_START, page)
+    for item, count in item_counts:
+        render_into(parts, DESKTOP_ITEM_COUNT, {'item': item, 'count': count})
+    render_into(parts, DESKTOP_ORDERS_START, page)
+    for header, (desktop_items, _) in cards:
+        render_into(parts, DESKTOP_ORDER_START, header)
+        parts.append(desktop_items)
+        render_into(parts, ORDER_END, header)
+
+    render_into(parts, MOBILE_START, page)
+    for item, count in item_counts:
+        render_into(parts, MOBILE_ITEM_COUNT, {'mobile_item_name': mobile_item_name(item), 'count': count})
+    render_into(parts, MOBILE_ORDERS_START, page)
+    for header, (_, mobile_items) in cards:
+        render_into(parts, MOBILE_ORDER_START, header)
+        parts.append(mobile_items)
+        render_into(parts, ORDER_END, header)
+    render_into(parts, REPORT_END, page)
+
+    return "".join(parts)
+
+
+def shopping_quantities(days):
+    """
+    Item counts of several days side by side, for the prep report.
+
+    Args:
+        days (list): (date, orders, analysis) for each day, in date order
+
+    Returns:
+        list: (item, [count on each day], total) tuples, sorted by item name
+    """
+    items = sorted({item for _, _, analysis in days for item in analysis['item_counts']})
+    quantities = []
+    for item in items:
+        counts = [analysis['item_counts'].get(item, 0) for _, _, analysis in days]
+        quantities.append((item, counts, sum(counts)))
+    return quantities
+
+
+def generate_multi_day_email_html(days):
+    """
+    Generate the HTML prep report for several days
+
+    Args:
+        days (list): (date, orders, analysis) for each day, in date order,
+            with each day's orders already sorted (see sort_orders_by_time)
+
+    Returns:
+        str: HTML email content
+    """
+    first, last = datetime.strptime(days[0][0], '%Y-%m-%d'), datetime.strptime(days[-1][0], '%Y-%m-%d')
+    page = {'range_display': f"{first.strftime('%A, %B %d')} - {last.strftime('%A, %B %d, %Y')}"}
+    quantities = shopping_quantities(days)
+
+    sections = []
+    for date, orders, analysis in days:
+        day = {
+            'date_display': datetime.strptime(date, '%Y-%m-%d').strftime('%A, %B %d, %Y'),
+            'total_orders': analysis['total_orders'],
+            'earliest_time': analysis['earliest_time'] or 'N/A',
+            'latest_time': analysis['latest_time'] or 'N/A',
+            'order_count': len(orders),
+        }
+        sections.append((day, sorted(analysis['item_counts'].items()), order_cards(orders)))
+
+    parts = []
+    render_into(parts, REPORT_HEAD, page)
+    render_into(parts, MULTI_DAY_START, page)
+    for date, _, _ in days:
+        render_into(parts, SHOPPING_DAY_HEADING, {'day': datetime.strptime(date, '%Y-%m-%d').strftime('%a %d')})
+    render_into(parts, SHOPPING_HEADINGS_END, page)
+    for item, counts, total in quantities:
+        render_into(parts, SHOPPING_ROW_START, {'item': item})
+        for count in counts:
+            render_into(parts, SHOPPING_COUNT, {'count': count})
+        render_into(parts, SHOPPING_ROW_END, {'total': total})
+    render_into(parts, SHOPPING_END, page)
+
+    for day, item_counts, cards in sections:
+        render_into(parts, DESKTOP_DAY_START, day)
+        for item, count in item_counts:
+            render_into(parts, DESKTOP_ITEM_COUNT, {'item': item, 'count': count})
+        render_into(parts, DESKTOP_ORDERS_START, day)
+        for header, (desktop_items, _) in cards:
+            render_into(parts, DESKTOP_ORDER_START, header)
+            parts.append(desktop_items)
+            render_into(parts, ORDER_END, header)
+        render_into(parts, DAY_END, day)
+
+    render_into(parts, MULTI_DAY_MOBILE_START, page)
+    for item, _, total in quantities:
+        render_into(parts, MOBILE_ITEM_COUNT, {'mobile_item_name': mobile_item_name(item), 'count': total})
+    render_into(parts, MOBILE_SHOPPING_END, page)
+
+    for day, item_counts, cards in sections:
+        render_into(parts, MOBILE_DAY_START, day)
+        for item, count in item_counts:
+            render_into(parts, MOBILE_ITEM_COUNT, {'mobile_item_name': mobile_item_name(item), 'count': count})
+        render_into(parts, MOBILE_ORDERS_START, day)
+        for header, (_, mobile_items) in cards:
+            render_into(parts, MOBILE_ORDER_START, header)
+            parts.append(mobile_items)
+            render_into(parts, ORDER_END, header)
+        render_into(parts, DAY_END, day)
+    render_into(parts, MULTI_DAY_END, page)
+
+    return "".join(parts)
+
+
+def analyze_orders(summary):
+    """
+    Get counts and timing information for the report from a date's summary
+
+    Args:
+        summary (DailySummary): Kitchen summary for the report date
+
+    Returns:
+        dict: Analysis results including item counts and timing
+    """
+    return {
+        'item_counts': summary.kitchen_counts(),
+        'earliest_time': summary.earliest_time,
+        'latest_time': summary.latest_time,
+        'total_orders': summary.order_count
+    }
+
+
+def generate_breakfast_email_text(orders, analysis, date):
+    """
+    Plain text version of the daily report
+
+    Args:
+        orders (list): Parsed breakfast orders, already sorted (see sort_orders_by_time)
+        analysis (dict): Analysis results
+        date (str): Date for the report
+
+    Returns:
+        str: Text email content
+    """
+    return f"""
+Breakfast Orders - {datetime.strptime(date, '%Y-%m-%d').strftime('%A, %B %d, %Y')}
+
+Summary:
+- Total Orders: {analysis['total_orders']}
+- First Breakfast: {analysis['earliest_time'] or 'N/A'}
+- Last Breakfast: {analysis['latest_time'] or 'N/A'}
+
+Item Counts:
+{chr(10).join([f"- {item}: {count}" for item, count in sorted(analysis['item_counts'].items())])}
+
+Individual Orders:
+{chr(10).join([f"- {order.customer_name} (Room {order.room_number}) at {order.display_time}" for order in orders])}
+        """
+
+
+def send_report_email(client, to_email, from_email, subject, text_content, html_content):
+    """
+    Send a report as a text and HTML email through SES
+
+    Args:
+        client: boto3 SES client
+        to_email (str): Recipient email address
+        from_email (str): Sender email address (must be verified in SES)
+        subject (str): Email subject
+        text_content (str): Plain text body
+        html_content (str): HTML body
+
+    Returns:
+        dict: Response from SES
+    """
+    response = client.send_email(
+        Source=from_email,
+        Destination={
+            'ToAddresses': [to_email],
+        },
+        Message={
+            'Subject': {
+                'Data': subject,
+                'Charset': 'UTF-8'
+            },
+            'Body': {
+                'Text': {
+                    'Data': text_content,
+                    'Charset': 'UTF-8'
+                },
+                'Html': {
+                    'Data': html_content,
+                    'Charset': 'UTF-8'
+                }
+            }
+        }
+    )
+    logger.info(f"Message ID: {response['MessageId']}")
+    return response
+
+
+def send_breakfast_report_email(client, to_email, from_email, date, orders, analysis):
+    """
+    Send a formatted email report for breakfast orders
+
+    Args:
+        client: boto3 SES client
+        to_email (str): Recipient email address
+        from_email (str): Sender email address (must be verified in SES)
+        date (str): Date for the report
+        orders (list): List of parsed breakfast orders
+        analysis (dict): Analysis results
+
+    Returns:
+        dict: Response from SES
+    """
+    try:
+        # Sort orders chronologically by time, once for both the HTML and text versions
+        sorted_orders = sort_orders_by_time(orders)
+
+        html_content = generate_breakfast_email_html(sorted_orders, analysis, date)
+        text_content = generate_breakfast_email_text(sorted_orders, analysis, date)
+        subject = f"Breakfast - {datetime.strptime(date, '%Y-%m-%d').strftime('%B %d, %Y')}"
+
+        response = send_report_email(client, to_email, from_email, subject, text_content, html_content)
+
+        logger.info(f"Breakfast report email sent successfully to {to_email}")
+        logger.info(f"Orders processed: {len(orders)}")
+
+        return response
+
+    except Exception as e:
+        logger.error(f"Error sending breakfast report email: {e}")
+        raise e
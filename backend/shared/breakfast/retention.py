@@ -0,0 +1,374 @@
+"""
+Deleting old items from our DynamoDB tables by retention policy.
+
+A run scans the table in parallel segments, keeping only each item's key
+and timestamp, lets every policy pick the items it would delete, and
+deletes the union of those picks with BatchWriteItem. Items without a
+readable timestamp are never deleted.
+
+A run only considers the partitions it is given: tables mix partitions
+with different lifetimes (the token table keeps a 'prewarm' item and the
+'revoked' deny-list next to the tokens). Retention never deletes from
+PROTECTED_PARTITIONS. On the orders table, the summaries of dates that
+lost orders are rebuilt from the orders left (see breakfast.summary).
+
+Timestamps can be epoch seconds (numbers or numeric strings, as tokens'
+and orders' created_at) or ISO dates and times.
+
+A dry run reads whole items instead, to report what would be deleted and
+the write capacity the deletes would take; deleting an item costs one
+write unit per started KB of the item, not of its key.
+"""
+import logging
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from breakfast.dynamo import DATES_PARTITION, ORDER_PARTITION_KEY, from_wire
+from breakfast.summary import rebuild_summary
+from breakfast.tokens import REVOKED_PARTITION
+
+logger = logging.getLogger(__name__)
+
+SCAN_SEGMENTS = 4
+
+# BatchWriteItem takes at most 25 requests; unprocessed ones are retried with backoff
+BATCH_WRITE_SIZE = 25
+BATCH_WRITE_ATTEMPTS = 5
+BATCH_WRITE_BACKOFF_SECONDS = 0.05
+
+# Most items listed in a run's report
+REPORT_ITEM_LIMIT = 100
+
+# Order summaries follow their orders, and deny-list entries have to outlive
+# the tokens they revoke (TTL removes them after that)
+PROTECTED_PARTITIONS = frozenset({DATES_PARTITION, REVOKED_PARTITION})
+
+
+def parse_timestamp(value):
+    """
+    Epoch seconds of a timestamp attribute.
+
+    Args:
+        value: Number, numeric string or ISO date/time string (naive ones are UTC)
+
+    Returns:
+        float: Seconds since the epoch, or None if value isn't a timestamp
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, str):
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def item_size(item):
+    """
+    Approximate stored size in bytes of an item in DynamoDB wire format.
+
+    Follows DynamoDB's sizing: attribute names count, strings and binary
+    by their length, numbers by about one byte per two digits, and maps
+    and lists three bytes plus a byte per element on top of their contents.
+    """
+    return sum(len(name.encode('utf-8')) + _value_size(value) for name, value in item.items())
+
+
+def _value_size(value):
+    (tag, data), = value.items()
+    if tag == 'S':
+        return len(data.encode('utf-8'))
+    if tag == 'N':
+        return len(data.lstrip('-').replace('.', '')) // 2 + 1
+    if tag == 'B':
+        return len(data)
+    if tag in ('BOOL', 'NULL'):
+        return 1
+    if tag == 'M':
+        return 3 + sum(len(name.encode('utf-8')) + _value_size(v) + 1 for name, v in data.items())
+    if tag == 'L':
+        return 3 + sum(_value_size(v) + 1 for v in data)
+    if tag == 'SS':
+        return sum(len(v.encode('utf-8')) for v in data)
+    if tag == 'NS':
+        return sum(len(v) // 2 + 1 for v in data)
+    return sum(len(v) for v in data)
+
+
+class Candidate:
+    """An item retention policies can choose to delete"""
+
+    __slots__ = ('key', 'partition', 'timestamp', 'size')
+
+    def __init__(self, key, partition, timestamp, size=None):
+        self.key = key  # Primary key in wire format, ready for a DeleteRequest
+        self.partition = partition
+        self.timestamp = timestamp
+        self.size = size  # Bytes, only known on dry runs
+
+
+class KeepLast:
+    """Delete all but the newest count items"""
+
+    __slots__ = ('count',)
+
+    def __init__(self, count):
+        self.count = count
+
+    def select(self, candidates, now):
+        return sorted(candidates, key=lambda c: c.timestamp, reverse=True)[self.count:]
+
+
+class MaxAge:
+    """Delete items older than max_age seconds"""
+
+    __slots__ = ('max_age',)
+
+    def __init__(self, max_age):
+        self.max_age = max_age
+
+    def select(self, candidates, now):
+        cutoff = now - self.max_age
+        return [c for c in candidates if c.timestamp < cutoff]
+
+
+class KeepNewestPerPartition:
+    """Delete all but the newest count items in each partition"""
+
+    __slots__ = ('count',)
+
+    def __init__(self, count=1):
+        self.count = count
+
+    def select(self, candidates, now):
+        partitions = {}
+        for candidate in candidates:
+            partitions.setdefault(candidate.partition, []).append(candidate)
+        selected = []
+        for items in partitions.values():
+            selected.extend(KeepLast(self.count).select(items, now))
+        return selected
+
+
+def parse_policies(specs):
+    """
+    Policies from their JSON form, as sent in a Lambda event.
+
+    Args:
+        specs (list): Dicts with one of keep_last, max_age_days, max_age_seconds
+            or keep_newest_per_partition, each set to a number
+
+    Returns:
+        list: Policy objects
+
+    Raises:
+        ValueError: If a policy is unknown or its value isn't a non-negative number
+    """
+    policies = []
+    for spec in specs:
+        if not isinstance(spec, dict) or len(spec) != 1:
+            raise ValueError(f"Each policy needs exactly one setting: {spec!r}")
+        (name, value), = spec.items()
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+            raise ValueError(f"{name} must be a non-negative number")
+        if name == 'keep_last':
+            policies.append(KeepLast(int(value)))
+        elif name == 'max_age_days':
+            policies.append(MaxAge(value * 86400))
+        elif name == 'max_age_seconds':
+            policies.append(MaxAge(value))
+        elif name == 'keep_newest_per_partition':
+            policies.append(KeepNewestPerPartition(int(value)))
+        else:
+            raise ValueError(f"Unknown retention policy: {name}")
+    return policies
+
+
+def table_keys(client, table_name):
+    """
+    Partition and sort key names of a table.
+
+    Returns:
+        tuple: (partition key name, sort key name or None)
+    """
+    schema = client.describe_table(TableName=table_name)['Table']['KeySchema']
+    keys = {key['KeyType']: key['AttributeName'] for key in schema}
+    return keys['HASH'], keys.get('RANGE')
+
+
+def scan_segment(client, segment, total_segments, **kwargs):
+    """
+    Read one parallel scan segment to the end.
+
+    Returns:
+        tuple: (items in wire format, read capacity consumed)
+    """
+    items = []
+    capacity = 0.0
+    while True:
+        response = client.scan(Segment=segment, TotalSegments=total_segments,
+                               ReturnConsumedCapacity='TOTAL', **kwargs)
+        items.extend(response['Items'])
+        capacity += response.get('ConsumedCapacity', {}).get('CapacityUnits', 0)
+        last_key = response.get('LastEvaluatedKey')
+        if not last_key:
+            return items, capacity
+        kwargs['ExclusiveStartKey'] = last_key
+
+
+def scan_table(client, table_name, segments=SCAN_SEGMENTS, **kwargs):
+    """
+    Scan a whole table with segments read on a thread pool.
+
+    Returns:
+        tuple: (items in wire format, read capacity consumed)
+    """
+    def scan(segment):
+        return scan_segment(client, segment, segments, TableName=table_name, **kwargs)
+
+    with ThreadPoolExecutor(max_workers=segments) as executor:
+        results = list(executor.map(scan, range(segments)))
+    items = [item for segment_items, _ in results for item in segment_items]
+    return items, sum(capacity for _, capacity in results)
+
+
+def batch_delete(client, table_name, keys):
+    """
+    Delete items 25 at a time with BatchWriteItem.
+
+    Requests DynamoDB leaves unprocessed, usually from throttling, are sent
+    again with exponential backoff.
+
+    Args:
+        client: boto3 DynamoDB client
+        table_name (str): DynamoDB table name
+        keys (list): Primary keys of the items to delete, as client expects them
+
+    Returns:
+        float: Write capacity consumed
+
+    Raises:
+        RuntimeError: If some deletes are still unprocessed after the last attempt
+    """
+    capacity = 0.0
+    for start in range(0, len(keys), BATCH_WRITE_SIZE):
+        requests = {table_name: [{'DeleteRequest': {'Key': key}}
+                                 for key in keys[start:start + BATCH_WRITE_SIZE]]}
+        for attempt in range(BATCH_WRITE_ATTEMPTS):
+            response = client.batch_write_item(RequestItems=requests, ReturnConsumedCapacity='TOTAL')
+            capacity += sum(used.get('CapacityUnits', 0) for used in response.get('ConsumedCapacity', []))
+            requests = response.get('UnprocessedItems')
+            if not requests:
+                break
+            logger.warning(f"{len(requests[table_name])} deletes unprocessed, retrying")
+            time.sleep(BATCH_WRITE_BACKOFF_SECONDS * 2 ** attempt)
+        else:
+            raise RuntimeError(f"{len(requests[table_name])} deletes still unprocessed "
+                               f"after {BATCH_WRITE_ATTEMPTS} attempts")
+    return capacity
+
+
+def apply_retention(client, table_name, policies, timestamp_attribute, partitions,
+                    dry_run=False, segments=SCAN_SEGMENTS, now=None):
+    """
+    Delete the items any of the policies selects.
+
+    Args:
+        client: boto3 DynamoDB client (low level, wire format)
+        table_name (str): DynamoDB table name
+        policies (list): Policy objects, see parse_policies
+        timestamp_attribute (str): Attribute holding each item's age, may be a key
+        partitions (list): Only consider items in these partitions
+        dry_run (bool): Report what would be deleted without deleting
+        segments (int): Parallel scan segments
+        now (float): Current epoch seconds, for tests
+
+    Returns:
+        dict: Report of the run: scanned, skipped (no timestamp), selected and
+            deleted item counts, read capacity used, write capacity used (or
+            estimated, on a dry run), the dates whose summaries were (or would
+            be) rebuilt and up to REPORT_ITEM_LIMIT selected items
+
+    Raises:
+        ValueError: If no partitions are given, or one of them is protected
+    """
+    if not partitions:
+        raise ValueError("partitions must list the partitions to apply retention to")
+    protected = PROTECTED_PARTITIONS.intersection(partitions)
+    if protected:
+        raise ValueError(f"Retention never deletes from the {', '.join(sorted(protected))} partition")
+
+    now = time.time() if now is None else now
+    partition_key, sort_key = table_keys(client, table_name)
+
+    scan = {}
+    if not dry_run:
+        attributes = [partition_key] + ([sort_key] if sort_key else [])
+        if timestamp_attribute not in attributes:
+            attributes.append(timestamp_attribute)
+        names = {f'#a{i}': attribute for i, attribute in enumerate(attributes)}
+        scan['ProjectionExpression'] = ', '.join(names)
+        scan['ExpressionAttributeNames'] = names
+    items, read_capacity = scan_table(client, table_name, segments, **scan)
+
+    wanted = set(partitions)
+    candidates = []
+    skipped = 0
+    for item in items:
+        partition = from_wire(item[partition_key])
+        if partition not in wanted:
+            continue
+        timestamp = parse_timestamp(from_wire(item[timestamp_attribute])) if timestamp_attribute in item else None
+        if timestamp is None:
+            skipped += 1
+            continue
+        key = {partition_key: item[partition_key]}
+        if sort_key:
+            key[sort_key] = item[sort_key]
+        candidates.append(Candidate(key, partition, timestamp, item_size(item) if dry_run else None))
+
+    selected = {}
+    for policy in policies:
+        for candidate in policy.select(candidates, now):
+            selected[id(candidate)] = candidate
+    selected = sorted(selected.values(), key=lambda c: c.timestamp)
+
+    if dry_run:
+        write_capacity = sum(max(1, math.ceil(c.size / 1024)) for c in selected)
+    else:
+        write_capacity = batch_delete(client, table_name, [c.key for c in selected])
+
+    summary_dates = []
+    if partition_key == ORDER_PARTITION_KEY:
+        summary_dates = sorted({c.partition[len('bk_'):] for c in selected if c.partition.startswith('bk_')})
+        if not dry_run:
+            for date in summary_dates:
+                rebuild_summary(client, table_name, date)
+    logger.info(f"Retention on {table_name}: {len(selected)} of {len(items)} items "
+                f"{'would be ' if dry_run else ''}deleted")
+
+    return {
+        'table_name': table_name,
+        'dry_run': dry_run,
+        'scanned_count': len(items),
+        'skipped_count': skipped,
+        'selected_count': len(selected),
+        'deleted_count': 0 if dry_run else len(selected),
+        'read_capacity_units': read_capacity,
+        'write_capacity_units': write_capacity,
+        'rebuilt_summaries': summary_dates,
+        'items': [dict({name: from_wire(value) for name, value in c.key.items()}, timestamp=c.timestamp)
+                  for c in selected[:REPORT_ITEM_LIMIT]],
+    }
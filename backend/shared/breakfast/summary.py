@@ -0,0 +1,251 @@
+"""
+Daily kitchen summary, kept up to date as orders are written.
+
+Each date's summary is its count item in the orders table (partition
+DATES_PARTITION, sort key the date). Besides orderCount it holds one
+number attribute per thing counted, named with a prefix:
+
+    item:Eggs (over easy)   line items, counted as in the report
+    topping:Berries         pancake and waffle toppings
+    slot:07:30              orders scheduled for that time
+    load:07:30|Pancakes     line items due in that time slot
+
+The order API applies the difference between the saved order and the one
+it replaced with ADD, so concurrent orders can't overwrite each other's
+counts. Earliest and latest times come from the slots still above zero,
+which stay correct when an order moves to another time, and are compared
+as times of day so 12- and 24-hour entries order correctly.
+
+Stored summaries serve reads that don't need the orders themselves: the
+mobile API's GET /dates and slot load, and the order API's slot capacity.
+Reports and the mobile orders list already hold the date's orders and
+count them with DailySummary.from_orders, so their counts can't disagree
+with the orders they list. Dates with orders from before summaries were
+kept have none until check_summaries.py --fix creates them.
+"""
+from collections import Counter
+
+from breakfast.dynamo import (DATES_PARTITION, ORDER_PARTITION_KEY, ORDER_SORT_KEY, from_wire,
+                             iter_breakfast_orders)
+from breakfast.orders import Order, parse_orders, time_minutes, time_sort_key
+
+ORDER_COUNT = 'orderCount'
+ITEM_PREFIX = 'item:'
+TOPPING_PREFIX = 'topping:'
+SLOT_PREFIX = 'slot:'
+LOAD_PREFIX = 'load:'
+
+# Time slots offered by the kiosk (frontend/src/app/app.ts)
+TIME_SLOTS = ('06:00', '06:30', '07:00', '07:30', '08:00', '08:30', '09:00')
+
+
+def order_counts(order):
+    """Summary attributes contributed by one Order, orderCount included"""
+    counts = Counter({ORDER_COUNT: 1})
+    for key in order.item_keys:
+        counts[ITEM_PREFIX + key] += 1
+    for key in order.topping_keys:
+        counts[TOPPING_PREFIX + key] += 1
+    if order.time:
+        counts[SLOT_PREFIX + order.time] += 1
+        for key in order.item_keys:
+            counts[f'{LOAD_PREFIX}{order.time}|{key}'] += 1
+    return counts
+
+
+def summary_delta(order_data=None, previous_order_data=None):
+    """
+    Change to a date's summary when an order is added, replaced or removed.
+
+    Args:
+        order_data (dict): The order as saved, or None if it was removed
+        previous_order_data (dict): The order it replaced, or None if it's new
+
+    Returns:
+        dict: Attribute name -> non-zero change
+    """
+    delta = Counter()
+    if order_data is not None:
+        delta.update(order_counts(Order({'order_data': order_data})))
+    if previous_order_data is not None:
+        delta.subtract(order_counts(Order({'order_data': previous_order_data})))
+    return {name: change for name, change in delta.items() if change}
+
+
+def summary_update(delta):
+    """
+    update_item arguments that ADD a delta to a summary item.
+
+    Values are plain ints, for a boto3 Table resource.
+    """
+    names = {}
+    values = {}
+    actions = []
+    for i, (name, change) in enumerate(delta.items()):
+        names[f'#s{i}'] = name
+        values[f':s{i}'] = change
+        actions.append(f'#s{i} :s{i}')
+    return {
+        'UpdateExpression': 'ADD ' + ', '.join(actions),
+        'ExpressionAttributeNames': names,
+        'ExpressionAttributeValues': values,
+    }
+
+
+class DailySummary:
+    """
+    Counts for one date, as stored on its summary item.
+
+    Attributes:
+        order_count (int): Number of orders
+        item_counts (dict): Line item counts, e.g. {"Eggs (over easy)": 3}
+        topping_counts (dict): Pancake/waffle topping counts, e.g. {"Berries": 2}
+        slot_counts (dict): Orders per scheduled time, e.g. {"07:30": 4}
+        slot_item_counts (dict): Line item counts per scheduled time, e.g. {"07:30": {"Pancakes": 2}}
+    """
+    __slots__ = ('date', 'order_count', 'item_counts', 'topping_counts', 'slot_counts', 'slot_item_counts')
+
+    def __init__(self, date, attributes):
+        self.date = date
+        self.order_count = int(attributes.get(ORDER_COUNT, 0))
+        self.item_counts = {}
+        self.topping_counts = {}
+        self.slot_counts = {}
+        self.slot_item_counts = {}
+
+        by_prefix = ((ITEM_PREFIX, self.item_counts), (TOPPING_PREFIX, self.topping_counts),
+                     (SLOT_PREFIX, self.slot_counts))
+        for name, count in attributes.items():
+            # Counts that went back down to zero are left on the item
+            if not isinstance(count, (int, float)) or count <= 0:
+                continue
+            if name.startswith(LOAD_PREFIX):
+                slot, _, key = name[len(LOAD_PREFIX):].partition('|')
+                self.slot_item_counts.setdefault(slot, {})[key] = int(count)
+                continue
+            for prefix, counts in by_prefix:
+                if name.startswith(prefix):
+                    counts[name[len(prefix):]] = int(count)
+                    break
+
+    @classmethod
+    def from_orders(cls, date, orders):
+        """Build the summary by counting parsed orders"""
+        counts = Counter()
+        for order in orders:
+            counts.update(order_counts(order))
+        return cls(date, counts)
+
+    def _scheduled_times(self):
+        """Times with orders, by time of day; times that can't be read only if there are no others"""
+        times = sorted(self.slot_counts, key=time_sort_key)
+        return [time for time in times if time_minutes(time) is not None] or times
+
+    @property
+    def earliest_time(self):
+        times = self._scheduled_times()
+        return times[0] if times else None
+
+    @property
+    def latest_time(self):
+        times = self._scheduled_times()
+        return times[-1] if times else None
+
+    def kitchen_counts(self, include_toppings=True):
+        """
+        Item counts by name, sorted by name.
+
+        Args:
+            include_toppings (bool): Also count pancake/waffle toppings as items
+
+        Returns:
+            dict: Item name -> number ordered
+        """
+        counts = Counter(self.item_counts)
+        if include_toppings:
+            counts.update(self.topping_counts)
+        return dict(sorted(counts.items()))
+
+    def attributes(self):
+        """The non-zero summary attributes, as stored on the item"""
+        attributes = {ORDER_COUNT: self.order_count} if self.order_count else {}
+        for prefix, counts in ((ITEM_PREFIX, self.item_counts), (TOPPING_PREFIX, self.topping_counts),
+                               (SLOT_PREFIX, self.slot_counts)):
+            attributes.update((prefix + key, count) for key, count in counts.items())
+        for slot, counts in self.slot_item_counts.items():
+            attributes.update((f'{LOAD_PREFIX}{slot}|{key}', count) for key, count in counts.items())
+        return attributes
+
+    def slot_load(self):
+        """
+        Orders and line items due in each time slot.
+
+        Every kiosk time slot is listed, plus any other time an order has.
+
+        Returns:
+            list: {"time", "orders", "items"} dicts, earliest slot first
+        """
+        times = sorted(set(TIME_SLOTS) | self.slot_counts.keys() | self.slot_item_counts.keys(),
+                       key=time_sort_key)
+        return [{
+            'time': time,
+            'orders': self.slot_counts.get(time, 0),
+            'items': dict(sorted(self.slot_item_counts.get(time, {}).items())),
+        } for time in times]
+
+
+def summary_key(date):
+    """Low-level key of a date's summary item"""
+    return {ORDER_PARTITION_KEY: {'S': DATES_PARTITION}, ORDER_SORT_KEY: {'S': date}}
+
+
+def read_summary(client, table_name, date):
+    """
+    Read a date's summary with a single GetItem.
+
+    Args:
+        client: boto3 DynamoDB client
+        table_name (str): Name of the orders table
+        date (str): Date in YYYY-MM-DD format
+
+    Returns:
+        DailySummary: The stored summary, or None if the date has none
+    """
+    item = client.get_item(TableName=table_name, Key=summary_key(date)).get('Item')
+    if item is None:
+        return None
+    return DailySummary(date, {name: from_wire(value) for name, value in item.items()})
+
+
+def store_summary(client, table_name, date, attributes):
+    """
+    Overwrite a date's summary item, or delete it if the date has no orders.
+
+    Args:
+        client: boto3 DynamoDB client
+        table_name (str): Name of the orders table
+        date (str): Date in YYYY-MM-DD format
+        attributes (dict): Summary attributes, as DailySummary.attributes returns them
+    """
+    if attributes.get(ORDER_COUNT):
+        item = dict(summary_key(date))
+        item.update((name, {'N': str(count)}) for name, count in attributes.items())
+        client.put_item(TableName=table_name, Item=item)
+    else:
+        client.delete_item(TableName=table_name, Key=summary_key(date))
+
+
+def rebuild_summary(client, table_name, date):
+    """
+    Recount a date's summary from its orders and store it.
+
+    Orders written while the date is being read can be missed, so rebuild
+    dates that aren't taking orders (or run check_summaries.py afterwards).
+
+    Returns:
+        dict: The rebuilt summary attributes
+    """
+    orders = parse_orders(iter_breakfast_orders(client, table_name, date))
+    attributes = DailySummary.from_orders(date, orders).attributes()
+    store_summary(client, table_name, date, attributes)
+    return attributes
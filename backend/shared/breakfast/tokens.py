@@ -0,0 +1,183 @@
+"""
+Signed QR tokens, checked without a database read.
+
+A signed token is "<key id>.<payload>.<signature>":
+
+    payload: base64url of issued_at and expires_at (epoch seconds, 4 bytes
+      each) and a 6-byte random token id
+    signature: base64url of the first 16 bytes of HMAC-SHA256 over
+      "<key id>.<payload>" with the key named by the key id
+
+The issuer (the QR code PDF generator) and the order API share the keys
+through TOKEN_SIGNING_KEYS, a JSON object of key id -> secret. Keeping an
+old key in the map while issuing with a new one rotates keys without
+invalidating printed cards; removing a key invalidates every card signed
+with it.
+
+Tokens from before signing are 25 hex characters and never contain a
+".", so is_signed_token tells the two formats apart.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import os
+import struct
+import time
+
+PAYLOAD_FORMAT = '>II6s'
+PAYLOAD_LENGTH = struct.calcsize(PAYLOAD_FORMAT)
+SIGNATURE_LENGTH = 16
+
+# Revoked signed tokens are listed in the token table under this partition,
+# one item per token id. An entry is only needed until the token expires.
+REVOKED_PARTITION = 'revoked'
+
+
+class TokenError(ValueError):
+    """A signed token that must not be accepted; the message says why"""
+
+
+def load_keys(text):
+    """
+    Signing keys from their TOKEN_SIGNING_KEYS JSON.
+
+    Args:
+        text (str): JSON object of key id -> secret, or "" for none
+
+    Returns:
+        dict: Key id -> secret bytes
+    """
+    if not text:
+        return {}
+    keys = json.loads(text)
+    for key_id in keys:
+        if not key_id or '.' in key_id:
+            raise ValueError(f"Token key ids can't be empty or contain '.': {key_id!r}")
+    return {key_id: secret.encode('utf-8') for key_id, secret in keys.items()}
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(text):
+    """Decode unpadded base64url, rejecting any other spelling of the same bytes"""
+    data = base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+    # The decoder ignores stray characters and the unused low bits of the last
+    # character, so several strings decode alike; only the one sign_token wrote is valid
+    if _b64encode(data) != text:
+        raise ValueError("non-canonical base64")
+    return data
+
+
+def _signature(secret, signed_part):
+    return hmac.new(secret, signed_part.encode('ascii'), hashlib.sha256).digest()[:SIGNATURE_LENGTH]
+
+
+def is_signed_token(token):
+    """Whether a token is in the signed format rather than a stored random one"""
+    return '.' in token
+
+
+def sign_token(keys, key_id, issued_at, expires_at, token_id=None):
+    """
+    Issue a signed token.
+
+    Args:
+        keys (dict): Key id -> secret bytes, from load_keys
+        key_id (str): Key to sign with
+        issued_at (int): Epoch seconds the token is valid from
+        expires_at (int): Epoch seconds the token stops being valid
+        token_id (bytes): 6 bytes identifying the token (default random)
+
+    Returns:
+        str: The token, URL-safe
+    """
+    if token_id is None:
+        token_id = os.urandom(6)
+    payload = _b64encode(struct.pack(PAYLOAD_FORMAT, int(issued_at), int(expires_at), token_id))
+    signed_part = f"{key_id}.{payload}"
+    return f"{signed_part}.{_b64encode(_signature(keys[key_id], signed_part))}"
+
+
+def decode_token(keys, token):
+    """
+    Check a signed token's signature and read what it holds.
+
+    Args:
+        keys (dict): Key id -> secret bytes, from load_keys
+        token (str): Token from the QR code URL
+
+    Returns:
+        dict: key_id, issued_at, expires_at and token_id (hex)
+
+    Raises:
+        TokenError: If the token is malformed or signed with an unknown key
+            or the wrong secret
+    """
+    parts = token.split('.')
+    if len(parts) != 3 or not token.isascii():
+        raise TokenError("malformed token")
+    key_id, payload, signature = parts
+
+    secret = keys.get(key_id)
+    if secret is None:
+        raise TokenError(f"unknown key id {key_id!r}")
+    try:
+        payload_bytes = _b64decode(payload)
+        signature_bytes = _b64decode(signature)
+    except ValueError:
+        raise TokenError("malformed token")
+    if len(payload_bytes) != PAYLOAD_LENGTH:
+        raise TokenError("malformed token")
+    if not hmac.compare_digest(signature_bytes, _signature(secret, f"{key_id}.{payload}")):
+        raise TokenError("bad signature")
+
+    issued_at, expires_at, token_id = struct.unpack(PAYLOAD_FORMAT, payload_bytes)
+    return {'key_id': key_id, 'issued_at': issued_at, 'expires_at': expires_at, 'token_id': token_id.hex()}
+
+
+def verify_token(keys, token, now=None):
+    """
+    Check a signed token's signature and validity period.
+
+    Args:
+        keys (dict): Key id -> secret bytes, from load_keys
+        token (str): Token from the QR code URL
+        now (float): Current epoch seconds (default time.time())
+
+    Returns:
+        dict: key_id, issued_at, expires_at and token_id (hex) of a valid token
+
+    Raises:
+        TokenError: If the token is malformed, signed with an unknown key or
+            the wrong secret, not yet valid or expired
+    """
+    claims = decode_token(keys, token)
+    if now is None:
+        now = time.time()
+    if now < claims['issued_at']:
+        raise TokenError("not yet valid")
+    if now >= claims['expires_at']:
+        raise TokenError("expired")
+    return claims
+
+
+def revocation_item(claims, revoked_at):
+    """
+    Token table item putting a signed token on the deny-list.
+
+    Args:
+        claims (dict): The token's claims, from decode_token
+        revoked_at (int): Epoch seconds
+
+    Returns:
+        dict: Item for the REVOKED_PARTITION
+    """
+    return {
+        'type': REVOKED_PARTITION,
+        'created_at': f"{revoked_at}.{claims['token_id']}",
+        'token_id': claims['token_id'],
+        'expires_at': claims['expires_at'],
+    }
@@ -0,0 +1,49 @@
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from breakfast import clock
+
+
+def freeze(monkeypatch, *utc):
+    monkeypatch.setattr(clock, 'utc_now', lambda: datetime(*utc, tzinfo=timezone.utc))
+
+
+@pytest.mark.parametrize('utc, today', [
+    ((2025, 8, 5, 23, 59), '2025-08-05'),   # 21:29 NDT
+    ((2025, 8, 6, 0, 0), '2025-08-05'),     # UTC midnight, 21:30 NDT - naive now() flips here
+    ((2025, 8, 6, 2, 29), '2025-08-05'),    # 23:59 NDT
+    ((2025, 8, 6, 2, 30), '2025-08-06'),    # local midnight
+    ((2025, 1, 15, 3, 29), '2025-01-14'),   # 23:59 NST
+    ((2025, 1, 15, 3, 30), '2025-01-15'),
+])
+def test_today_follows_the_inns_midnight(monkeypatch, utc, today):
+    freeze(monkeypatch, *utc)
+
+    assert clock.resolve_date() == today
+    assert clock.resolve_date('today') == today
+
+
+def test_tomorrow_around_midnight_and_month_end(monkeypatch):
+    freeze(monkeypatch, 2025, 9, 1, 1, 0)  # 22:30 on August 31 in Newfoundland
+
+    assert clock.resolve_date('Tomorrow') == '2025-09-01'
+
+    freeze(monkeypatch, 2025, 9, 1, 2, 30)
+    assert clock.resolve_date('tomorrow') == '2025-09-02'
+
+
+def test_zone_is_configurable(monkeypatch):
+    freeze(monkeypatch, 2025, 8, 6, 2, 0)
+    monkeypatch.setattr(clock, 'INN_TIME_ZONE', ZoneInfo('America/Vancouver'))
+
+    assert clock.resolve_date() == '2025-08-05'
+    assert clock.local_now().utcoffset().total_seconds() == -7 * 3600
+
+
+def test_explicit_dates_are_checked_and_normalized():
+    assert clock.resolve_date('2025-08-05') == '2025-08-05'
+    assert clock.resolve_date('2025-8-5') == '2025-08-05'
+    with pytest.raises(ValueError):
+        clock.resolve_date('2025-13-01')
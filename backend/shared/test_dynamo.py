@@ -0,0 +1,131 @@
+import json
+import os
+
+import pytest
+
+moto = pytest.importorskip("moto")
+boto3 = pytest.importorskip("boto3")
+
+from breakfast.dynamo import (DATES_PARTITION, deserialize_order_item, from_wire, iter_breakfast_orders,
+                             query_breakfast_orders, query_order_dates)
+
+TABLE_NAME = 'benfen-breakfast'
+ORDER_COUNT = 3000
+
+# Exported orders hold order_data as a JSON string of DynamoDB wire format
+ORDER_DATA = json.dumps({
+    'customer': {'M': {'firstName': {'S': 'Guest'}, 'roomNumber': {'N': '12'}}},
+    'scheduling': {'M': {'date': {'S': '2025-08-05'}, 'time': {'S': '07:30'}}},
+    'eggs': {'M': {'style': {'S': 'scrambled'}}},
+    'pancakes': {'M': {'selected': {'BOOL': False}}},
+    'waffles': {'M': {'selected': {'BOOL': False}}},
+    'sides': {'M': {'bacon': {'BOOL': True}, 'homeFries': {'BOOL': False}, 'beans': {'BOOL': False},
+                    'toast': {'M': {'selected': {'BOOL': False}}}}},
+    'drinks': {'M': {'water': {'BOOL': False}, 'milk': {'BOOL': False}, 'coffee': {'BOOL': True},
+                     'tea': {'BOOL': False}, 'juice': {'M': {'selected': {'BOOL': False}}}}},
+    'specialOptions': {'S': 'x' * 200},
+})
+
+
+class CountingClient:
+    """Wraps a DynamoDB client to count the query pages read"""
+
+    def __init__(self, client):
+        self.client = client
+        self.pages = 0
+
+    def query(self, **kwargs):
+        self.pages += 1
+        return self.client.query(**kwargs)
+
+
+@pytest.fixture
+def table():
+    os.environ.setdefault('AWS_ACCESS_KEY_ID', 'testing')
+    os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'testing')
+    with moto.mock_aws():
+        dynamo = boto3.resource('dynamodb', region_name='ca-central-1')
+        yield dynamo.create_table(
+            TableName=TABLE_NAME,
+            KeySchema=[{'AttributeName': 'bk_yyyy-mm-dd', 'KeyType': 'HASH'},
+                       {'AttributeName': 'roomnumber-name', 'KeyType': 'RANGE'}],
+            AttributeDefinitions=[{'AttributeName': 'bk_yyyy-mm-dd', 'AttributeType': 'S'},
+                                  {'AttributeName': 'roomnumber-name', 'AttributeType': 'S'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
+
+
+@pytest.fixture
+def client(table):
+    with table.batch_writer() as batch:
+        for i in range(ORDER_COUNT):
+            batch.put_item(Item={
+                'bk_yyyy-mm-dd': 'bk_2025-08-05',
+                'roomnumber-name': f'{i}-Guest',
+                'order_id': f'1754329738_{i}',
+                'created_at': 1754329738,
+                'order_data': ORDER_DATA,
+            })
+    # A plain client: the resource's own client would re-serialize the low-level values
+    return CountingClient(boto3.client('dynamodb', region_name='ca-central-1'))
+
+
+def test_reads_every_page_of_a_large_partition(client):
+    orders = list(iter_breakfast_orders(client, TABLE_NAME, '2025-08-05'))
+
+    assert len(orders) == ORDER_COUNT
+    assert client.pages > 1  # more than DynamoDB's 1 MB page limit
+    assert orders[0]['order_data']['customer']['roomNumber'] == 12
+
+
+def test_projection_and_page_size(client):
+    orders = iter_breakfast_orders(client, TABLE_NAME, '2025-08-05', attributes=('order_data',), page_size=100)
+
+    first = next(orders)
+    assert set(first) == {'order_data'}
+    assert client.pages == 1  # pages are read as the orders are consumed
+    assert sum(1 for _ in orders) == ORDER_COUNT - 1
+    assert client.pages == ORDER_COUNT // 100
+
+    report_order = next(query_breakfast_orders(client, TABLE_NAME, '2025-08-05'))
+    assert set(report_order) == {'order_data'}  # scheduled_minutes is read too, when the item has it
+
+
+def test_reads_both_storage_formats():
+    key = {'bk_yyyy-mm-dd': {'S': 'bk_2025-08-05'}, 'roomnumber-name': {'S': '12-Guest'}}
+    legacy = dict(key, order_data={'S': ORDER_DATA})
+    native = dict(key, order_data={'M': json.loads(ORDER_DATA)}, format_version={'N': '2'})
+
+    legacy_order = deserialize_order_item(legacy)
+    native_order = deserialize_order_item(native)
+
+    assert legacy_order['order_data'] == native_order['order_data']
+    assert native_order['order_data']['drinks']['coffee'] is True
+    assert type(native_order['order_data']['customer']['roomNumber']) is int
+    assert deserialize_order_item(dict(key, order_data={'S': 'not json'})) is None
+
+
+def test_numbers_are_plain_ints_and_floats():
+    assert from_wire({'N': '12'}) == 12 and type(from_wire({'N': '12'})) is int
+    assert from_wire({'N': '1754329738.25'}) == 1754329738.25
+    assert type(from_wire({'N': '3.0'})) is int
+    assert from_wire({'M': {'a': {'L': [{'NULL': True}, {'S': 'x'}]}}}) == {'a': [None, 'x']}
+    assert from_wire({'SS': ['a']}) == {'a'}
+
+
+def test_order_dates_page_newest_first(table):
+    for day, count in ((1, 4), (2, 0), (3, 2), (4, 0), (5, 9), (6, 1), (7, 0), (8, 0), (9, 0)):
+        table.put_item(Item={'bk_yyyy-mm-dd': DATES_PARTITION, 'roomnumber-name': f'2025-08-0{day}', 'orderCount': count})
+    table.put_item(Item={'bk_yyyy-mm-dd': 'bk_2025-08-05', 'roomnumber-name': '12-Guest'})
+    client = boto3.client('dynamodb', region_name='ca-central-1')
+
+    # Dates back at zero are skipped without making the page short
+    dates, next_before = query_order_dates(client, TABLE_NAME, limit=2)
+    assert dates == [('2025-08-06', 1), ('2025-08-05', 9)]
+
+    dates, next_before = query_order_dates(client, TABLE_NAME, limit=2, before=next_before)
+    assert dates == [('2025-08-03', 2), ('2025-08-01', 4)]
+
+    assert query_order_dates(client, TABLE_NAME, limit=2, before=next_before) == ([], None)
+    assert query_order_dates(client, TABLE_NAME, limit=5) == (
+        [('2025-08-06', 1), ('2025-08-05', 9), ('2025-08-03', 2), ('2025-08-01', 4)], None)
@@ -0,0 +1,49 @@
+import copy
+
+from breakfast.orders import LineItemCache, Order, parse_orders
+
+ORDER_ITEM = {
+    'order_id': '1754329738_12',
+    'order_data': {
+        'customer': {'firstName': 'Leon', 'roomNumber': 12},
+        'scheduling': {'date': '2025-08-05', 'time': '09:00'},
+        'eggs': {'style': 'over', 'overStyle': 'easy'},
+        'pancakes': {'selected': True, 'toppings': {'berries': True, 'bacon': True, 'whippedCream': False}},
+        'waffles': {'selected': False},
+        'sides': {'bacon': True, 'homeFries': False, 'beans': False,
+                  'toast': {'selected': True, 'breadType': 'white'}},
+        'drinks': {'water': False, 'milk': False, 'coffee': True, 'tea': False,
+                   'juice': {'selected': True, 'juiceType': 'apple'}},
+        'specialOptions': ' no butter ',
+    }
+}
+
+
+def test_order_line_items():
+    order = Order(ORDER_ITEM)
+
+    assert [item.description for item in order.line_items] == [
+        'Eggs (over easy)', 'Pancakes with berries, bacon', 'Bacon', 'Toast (white)', 'Coffee', 'Juice (apple)'
+    ]
+    assert [item.is_main for item in order.line_items] == [True, True, False, False, False, False]
+    assert order.special_options == 'no butter'
+    assert order.display_time == '09:00'
+    assert Order({'order_data': {}}).display_time == 'N/A'
+
+
+def test_identical_orders_share_line_items():
+    other_guest = copy.deepcopy(ORDER_ITEM)
+    other_guest['order_data']['customer'] = {'firstName': 'Ada', 'roomNumber': 3}
+    other_guest['order_data']['scheduling']['time'] = '07:00'
+    other_guest['order_data']['sides'] = dict(reversed(other_guest['order_data']['sides'].items()))
+    extra_butter = copy.deepcopy(ORDER_ITEM)
+    extra_butter['order_data']['specialOptions'] = 'extra butter'
+
+    cache = LineItemCache()
+    first, second, third = parse_orders([ORDER_ITEM, other_guest, extra_butter], cache)
+
+    assert second.line_items is first.line_items and second.rendered is first.rendered
+    assert second.customer_name == 'Ada' and second.time == '07:00'
+    assert third.rendered is not first.rendered
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert Order(ORDER_ITEM).rendered is not Order(ORDER_ITEM).rendered
@@ -0,0 +1,77 @@
+from breakfast.orders import Order
+from breakfast.report import (analyze_orders, compile_template, generate_breakfast_email_html,
+                              generate_multi_day_email_html, render_into, send_breakfast_report_email,
+                              shopping_quantities)
+from breakfast.summary import DailySummary
+
+from test_orders import ORDER_ITEM
+
+
+class RecordingSES:
+    """Stands in for the SES client, keeping the messages it was asked to send"""
+
+    def __init__(self):
+        self.sent = []
+
+    def send_email(self, **kwargs):
+        self.sent.append(kwargs)
+        return {'MessageId': f'message-{len(self.sent)}'}
+
+
+def test_compiled_template_matches_format():
+    template = "body {{ margin: 0; }}\n<div>{name}</div><span>Room {room}</span>"
+    values = {'name': 'Leon', 'room': 12}
+
+    parts = []
+    render_into(parts, compile_template(template), values)
+
+    assert "".join(parts) == template.format(**values)
+    assert len(compile_template(template)) == 3  # two fields, then the closing literal
+
+
+def test_report_renders_each_order_in_both_layouts():
+    analysis = {'item_counts': {'Coffee': 1}, 'earliest_time': '09:00', 'latest_time': '09:00', 'total_orders': 1}
+
+    html = generate_breakfast_email_html([Order(ORDER_ITEM)], analysis, '2025-08-05')
+
+    assert 'Tuesday, August 05, 2025' in html
+    assert html.count('Leon') == 2
+    assert '<div class="order-item selected">Pancakes with berries, bacon</div>' in html
+    assert '<div class="mobile-order-item main-dish">Pancakes with berries, bacon</div>' in html
+    assert 'Special Options: no butter' in html and 'Special: no butter' in html
+    assert '{{' not in html
+
+
+def test_prep_report_totals_items_across_days():
+    saturday = {'item_counts': {'Coffee': 2, 'Pancakes': 1}, 'earliest_time': '08:00', 'latest_time': '09:00',
+                'total_orders': 2}
+    sunday = {'item_counts': {'Coffee': 1}, 'earliest_time': '09:00', 'latest_time': '09:00', 'total_orders': 1}
+    days = [('2025-08-09', [], saturday), ('2025-08-10', [Order(ORDER_ITEM)], sunday)]
+
+    assert shopping_quantities(days) == [('Coffee', [2, 1], 3), ('Pancakes', [1, 0], 1)]
+
+    html = generate_multi_day_email_html(days)
+    assert 'Saturday, August 09 - Sunday, August 10, 2025' in html
+    assert '<th style="text-align: right; padding: 4px;">Sun 10</th>' in html
+    assert 'Saturday, August 09, 2025' in html and 'Sunday, August 10, 2025' in html
+    assert html.count('Leon') == 2
+    assert html.count('<div') == html.count('</div>')
+
+
+def test_daily_report_email_lists_orders_by_time():
+    early = {'order_data': {'customer': {'firstName': 'Ada', 'roomNumber': 3},
+                            'scheduling': {'time': '07:00'}, 'drinks': {'tea': True}}}
+    orders = [Order(ORDER_ITEM), Order(early)]
+    client = RecordingSES()
+
+    response = send_breakfast_report_email(client, 'kitchen@example.com', 'orders@example.com', '2025-08-05',
+                                           orders, analyze_orders(DailySummary.from_orders('2025-08-05', orders)))
+
+    assert response == {'MessageId': 'message-1'}
+    message = client.sent[0]
+    assert message['Destination'] == {'ToAddresses': ['kitchen@example.com']}
+    assert message['Message']['Subject']['Data'] == 'Breakfast - August 05, 2025'
+    text = message['Message']['Body']['Text']['Data']
+    assert '- Total Orders: 2' in text and '- First Breakfast: 07:00' in text and '- Tea: 1' in text
+    assert text.index('Ada (Room 3) at 07:00') < text.index('Leon (Room 12) at 09:00')
+    assert message['Message']['Body']['Html']['Data'].count('Leon') == 2
@@ -0,0 +1,129 @@
+import os
+
+import pytest
+
+moto = pytest.importorskip("moto")
+boto3 = pytest.importorskip("boto3")
+
+from breakfast import retention
+from breakfast.retention import (Candidate, KeepLast, KeepNewestPerPartition, MaxAge, apply_retention,
+                                 batch_delete, parse_policies, parse_timestamp)
+from breakfast.summary import rebuild_summary, summary_key
+
+from test_orders import ORDER_ITEM
+
+TABLE_NAME = 'benfen-breakfast'
+NOW = 1754400000  # 2025-08-05 13:20 UTC
+DAY = 86400
+DATES = [f'2025-07-{day:02d}' for day in range(1, 31)]
+ORDER_PARTITIONS = [f'bk_{date}' for date in DATES]
+
+
+def test_policies_pick_old_and_surplus_items():
+    candidates = [Candidate({}, partition, NOW - age * DAY)
+                  for partition, age in (('a', 1), ('a', 2), ('a', 40), ('b', 3), ('b', 50))]
+
+    assert [c.timestamp for c in MaxAge(30 * DAY).select(candidates, NOW)] == [NOW - 40 * DAY, NOW - 50 * DAY]
+    assert [c.timestamp for c in KeepLast(3).select(candidates, NOW)] == [NOW - 40 * DAY, NOW - 50 * DAY]
+    assert sorted(c.timestamp for c in KeepNewestPerPartition().select(candidates, NOW)) == [
+        NOW - 50 * DAY, NOW - 40 * DAY, NOW - 2 * DAY]
+
+    assert [type(p) for p in parse_policies([{'keep_last': 5}, {'max_age_days': 30}])] == [KeepLast, MaxAge]
+    with pytest.raises(ValueError):
+        parse_policies([{'keep_first': 5}])
+
+    assert parse_timestamp('1754400000') == parse_timestamp(NOW) == parse_timestamp('2025-08-05T13:20:00Z')
+    assert parse_timestamp('2025-08-05') == NOW - 48000
+    assert parse_timestamp('dates') is None
+
+
+@pytest.fixture
+def client():
+    os.environ.setdefault('AWS_ACCESS_KEY_ID', 'testing')
+    os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'testing')
+    with moto.mock_aws():
+        dynamo = boto3.resource('dynamodb', region_name='ca-central-1')
+        table = dynamo.create_table(
+            TableName=TABLE_NAME,
+            KeySchema=[{'AttributeName': 'bk_yyyy-mm-dd', 'KeyType': 'HASH'},
+                       {'AttributeName': 'roomnumber-name', 'KeyType': 'RANGE'}],
+            AttributeDefinitions=[{'AttributeName': 'bk_yyyy-mm-dd', 'AttributeType': 'S'},
+                                  {'AttributeName': 'roomnumber-name', 'AttributeType': 'S'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        order_data = dict(ORDER_ITEM['order_data'], specialOptions='x' * 800)
+        with table.batch_writer() as batch:
+            for day, date in enumerate(DATES, start=1):
+                for room, hour in ((3, 0), (12, 1)):
+                    batch.put_item(Item={'bk_yyyy-mm-dd': f'bk_{date}', 'roomnumber-name': f'{room}-Guest',
+                                         'created_at': NOW - (36 - day) * DAY + hour * 3600,
+                                         'order_data': order_data})
+        client = boto3.client('dynamodb', region_name='ca-central-1')
+        for date in DATES:
+            rebuild_summary(client, TABLE_NAME, date)
+        yield client
+
+
+def order_count(client, date):
+    item = client.get_item(TableName=TABLE_NAME, Key=summary_key(date)).get('Item')
+    return int(item['orderCount']['N']) if item else 0
+
+
+def test_dry_run_reports_without_deleting(client):
+    report = apply_retention(client, TABLE_NAME, [MaxAge(14 * DAY)], 'created_at', ORDER_PARTITIONS,
+                             dry_run=True, now=NOW)
+
+    # Orders from July 1-21 are over two weeks old; the summaries aren't in the partitions asked for
+    assert report['scanned_count'] == 90 and report['skipped_count'] == 0
+    assert report['selected_count'] == 42 and report['deleted_count'] == 0
+    assert report['write_capacity_units'] == 84  # each order is just over 1 KB
+    assert report['rebuilt_summaries'] == DATES[:21]
+    assert report['items'][0] == {'bk_yyyy-mm-dd': 'bk_2025-07-01', 'roomnumber-name': '3-Guest',
+                                  'timestamp': NOW - 35 * DAY}
+    assert client.scan(TableName=TABLE_NAME, Select='COUNT')['Count'] == 90
+    assert order_count(client, '2025-07-01') == 2
+
+
+def test_policies_delete_their_union_and_rebuild_summaries(client):
+    report = apply_retention(client, TABLE_NAME, [MaxAge(34 * DAY), KeepLast(49)], 'created_at',
+                             ORDER_PARTITIONS, now=NOW)
+
+    # MaxAge takes July 1, KeepLast July 1-5 and the earlier order on July 6
+    assert report['deleted_count'] == 11
+    assert report['rebuilt_summaries'] == DATES[:6]
+    orders = client.scan(TableName=TABLE_NAME, FilterExpression='begins_with(#pk, :bk)',
+                         ExpressionAttributeNames={'#pk': 'bk_yyyy-mm-dd'},
+                         ExpressionAttributeValues={':bk': {'S': 'bk_'}})['Items']
+    assert len(orders) == 49
+    assert [order_count(client, date) for date in DATES[:7]] == [0, 0, 0, 0, 0, 1, 2]
+    assert client.scan(TableName=TABLE_NAME, Select='COUNT')['Count'] == 49 + 25
+
+
+def test_partitions_are_required_and_protected_ones_refused(client):
+    for partitions in (None, [], ['dates'], ORDER_PARTITIONS + ['dates'], ['token', 'revoked']):
+        with pytest.raises(ValueError):
+            apply_retention(client, TABLE_NAME, [KeepLast(0)], 'created_at', partitions, now=NOW)
+    assert client.scan(TableName=TABLE_NAME, Select='COUNT')['Count'] == 90
+
+
+def test_unprocessed_deletes_are_retried(client, monkeypatch):
+    batch_write_item = client.batch_write_item
+    calls = []
+
+    def throttled_batch_write_item(RequestItems, **kwargs):
+        calls.append(len(RequestItems[TABLE_NAME]))
+        if len(calls) == 1:
+            # Process the first two deletes and hand the rest back
+            requests = RequestItems[TABLE_NAME]
+            batch_write_item(RequestItems={TABLE_NAME: requests[:2]})
+            return {'UnprocessedItems': {TABLE_NAME: requests[2:]}}
+        return batch_write_item(RequestItems=RequestItems, **kwargs)
+
+    monkeypatch.setattr(client, 'batch_write_item', throttled_batch_write_item)
+    monkeypatch.setattr(retention, 'BATCH_WRITE_BACKOFF_SECONDS', 0)
+
+    keys = [{'bk_yyyy-mm-dd': {'S': 'dates'}, 'roomnumber-name': {'S': f'2025-07-{day:02d}'}} for day in range(1, 6)]
+    batch_delete(client, TABLE_NAME, keys)
+
+    assert calls == [5, 3]
+    assert client.scan(TableName=TABLE_NAME, Select='COUNT')['Count'] == 85
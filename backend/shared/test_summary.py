@@ -0,0 +1,63 @@
+import copy
+
+from breakfast.orders import Order
+from breakfast.summary import DailySummary, summary_delta, summary_update
+
+from test_orders import ORDER_ITEM
+
+ORDER_DATA = ORDER_ITEM['order_data']
+
+
+def test_kitchen_counts_include_toppings_only_when_asked():
+    orders = [Order(ORDER_ITEM), Order({'order_data': {'drinks': {'tea': True},
+                                                       'scheduling': {'time': '07:30'}}})]
+
+    summary = DailySummary.from_orders('2025-08-05', orders)
+    kitchen_counts = summary.kitchen_counts()
+    summary_counts = summary.kitchen_counts(include_toppings=False)
+
+    assert kitchen_counts == {'Bacon': 2, 'Berries': 1, 'Coffee': 1, 'Eggs (over easy)': 1, 'Juice (apple)': 1,
+                              'Pancakes': 1, 'Tea': 1, 'Toast (white)': 1}
+    assert summary_counts['Bacon'] == 1  # the side, not the pancake topping
+    assert 'Berries' not in summary_counts
+    assert list(kitchen_counts) == sorted(kitchen_counts)
+    assert (summary.earliest_time, summary.latest_time) == ('07:30', '09:00')
+    assert summary.order_count == 2
+
+
+def test_replacing_an_order_applies_only_the_difference():
+    changed = copy.deepcopy(ORDER_DATA)
+    changed['scheduling']['time'] = '07:00'
+    changed['drinks']['coffee'] = False
+
+    assert summary_delta(ORDER_DATA, ORDER_DATA) == {}
+    delta = summary_delta(changed, ORDER_DATA)
+    assert {name: change for name, change in delta.items() if not name.startswith('load:')} == {
+        'item:Coffee': -1, 'slot:07:00': 1, 'slot:09:00': -1}
+    assert delta['load:09:00|Coffee'] == -1 and 'load:07:00|Coffee' not in delta
+    assert delta['load:07:00|Bacon'] == 1 and delta['load:09:00|Bacon'] == -1
+    assert summary_delta(None, ORDER_DATA)['orderCount'] == -1
+
+    update = summary_update({'item:Coffee': -1})
+    assert update['UpdateExpression'] == 'ADD #s0 :s0'
+    assert update['ExpressionAttributeNames'] == {'#s0': 'item:Coffee'}
+
+
+def test_counts_back_at_zero_are_ignored():
+    summary = DailySummary('2025-08-05', {'orderCount': 1, 'item:Coffee': 0, 'item:Tea': 1,
+                                          'slot:06:30': 0, 'slot:08:00': 1})
+
+    assert summary.kitchen_counts() == {'Tea': 1}
+    assert summary.earliest_time == '08:00'
+    assert summary.attributes() == {'orderCount': 1, 'item:Tea': 1, 'slot:08:00': 1}
+
+
+def test_slot_load_lists_every_kiosk_slot():
+    summary = DailySummary.from_orders('2025-08-05', [Order(ORDER_ITEM), Order(ORDER_ITEM)])
+    load = {slot['time']: slot for slot in summary.slot_load()}
+
+    assert list(load)[0] == '06:00' and list(load)[-1] == '09:00'
+    assert load['06:00'] == {'time': '06:00', 'orders': 0, 'items': {}}
+    assert load['09:00']['orders'] == 2
+    assert load['09:00']['items']['Pancakes'] == 2
+    assert 'Berries' not in load['09:00']['items']
@@ -0,0 +1,46 @@
+import pytest
+
+from breakfast.tokens import TokenError, decode_token, is_signed_token, load_keys, sign_token, verify_token
+
+KEYS = load_keys('{"k1": "old secret", "k2": "new secret"}')
+ISSUED = 1754400000
+EXPIRES = ISSUED + 30 * 86400
+BASE64URL = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_'
+
+
+def test_signed_token_round_trip():
+    token = sign_token(KEYS, 'k2', ISSUED, EXPIRES, token_id=bytes.fromhex('0123456789ab'))
+
+    assert is_signed_token(token) and not is_signed_token('0123456789abcdef012345678')
+    assert len(token) == 45
+    assert verify_token(KEYS, token, now=ISSUED + 60) == {
+        'key_id': 'k2', 'issued_at': ISSUED, 'expires_at': EXPIRES, 'token_id': '0123456789ab'}
+
+
+@pytest.mark.parametrize('change, reason', [
+    (lambda token: token[:-5] + ('B' if token[-5] == 'A' else 'A') + token[-4:], 'bad signature'),
+    (lambda token: token.replace('k1.', 'k2.', 1), 'bad signature'),
+    (lambda token: token.replace('k1.', 'k9.', 1), 'unknown key id'),
+    (lambda token: token + '.x', 'malformed'),
+    (lambda token: token.replace('.', '.é', 1), 'malformed'),
+    # Same bytes when decoded: an unused low bit of the signature's last character, and padding
+    (lambda token: token[:-1] + BASE64URL[BASE64URL.index(token[-1]) ^ 1], 'malformed'),
+    (lambda token: token + '==', 'malformed'),
+])
+def test_tampered_tokens_are_rejected(change, reason):
+    token = sign_token(KEYS, 'k1', ISSUED, EXPIRES)
+
+    with pytest.raises(TokenError, match=reason):
+        verify_token(KEYS, change(token), now=ISSUED + 60)
+
+
+def test_tokens_are_only_valid_in_their_period():
+    token = sign_token(KEYS, 'k1', ISSUED, EXPIRES)
+
+    with pytest.raises(TokenError, match='not yet valid'):
+        verify_token(KEYS, token, now=ISSUED - 1)
+    with pytest.raises(TokenError, match='expired'):
+        verify_token(KEYS, token, now=EXPIRES)
+    assert decode_token(KEYS, token)['expires_at'] == EXPIRES
+    with pytest.raises(TokenError, match='unknown key id'):
+        verify_token(load_keys('{"k2": "new secret"}'), token, now=ISSUED + 60)
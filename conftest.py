@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Lambdas bundle backend/shared at deploy time; make it importable for tests
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend', 'shared'))
@@ -125,6 +125,10 @@ export class App {
   // Order state
   protected orderSubmitted = false;
   
+  // Request id of the last submission that hasn't succeeded yet, and the order it was for.
+  // Submitting the same order again reuses the id, so the API replays its first response.
+  private pendingSubmission: { order: string; requestId: string } | null = null;
+  
   constructor() {
     this.translationService.initializeLanguage();
     this.setDefaultDateTime();
@@ -533,6 +537,7 @@ export class App {
     // Add required fields for API
     const completeOrderData = {
       ...orderData,
+      clientRequestId: this.submissionRequestId(orderData),
       // URL Parameters (required by Lambda function)
       urlParameters: {
         //set t to the url parameter T
@@ -571,6 +576,7 @@ export class App {
       clearTimeout(timeoutId);
       this.isSubmittingOrder = false;
       this.orderSubmitted = true; // Mark order as submitted
+      this.pendingSubmission = null;
       console.log('Order submitted successfully:', data);
       
       // Show success message with Edit action first
@@ -601,6 +607,20 @@ export class App {
     });
   }
   
+  // Request id for submitting this order: the pending one if it is a retry, otherwise a new one
+  private submissionRequestId(orderData: any): string {
+    const order = JSON.stringify({ ...orderData, t: this.urlToken });
+    let pending = this.pendingSubmission;
+    if (!pending || pending.order !== order) {
+      const requestId = typeof crypto !== 'undefined' && typeof crypto.randomUUID === 'function'
+        ? crypto.randomUUID()
+        : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+      pending = { order, requestId };
+      this.pendingSubmission = pending;
+    }
+    return pending.requestId;
+  }
+  
   // Method to handle clicks on locked fields
   onLockedFieldClick(event: Event) {
     if (this.orderSubmitted) {
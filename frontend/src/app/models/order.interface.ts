@@ -12,3 +12,38 @@ export interface Order {
 }
 
 export type Language = 'en' | 'fr';
+
+/**
+ * Order payload accepted by the order intake API.
+ * Mirrors backend/functions/benfen-breakfastapi-.../order.schema.json, which the API validates against.
+ */
+export interface OrderToppings {
+  berries: boolean;
+  bacon: boolean;
+  whippedCream: boolean;
+}
+
+export interface OrderSubmission {
+  urlParameters?: { t?: string };
+  /** Same value on every retry of one submission, so the API saves the order only once */
+  clientRequestId?: string;
+  customer: { firstName: string; roomNumber: number };
+  scheduling: { date: string; time: string };
+  eggs: { style: '' | 'scrambled' | 'boiled' | 'poached' | 'over'; overStyle?: '' | 'easy' | 'medium' | 'hard' | null };
+  pancakes: { selected: boolean; toppings?: OrderToppings };
+  waffles: { selected: boolean; options?: OrderToppings };
+  sides: {
+    bacon: boolean;
+    homeFries: boolean;
+    beans: boolean;
+    toast: { selected: boolean; breadType?: '' | 'white' | 'wheat' | null };
+  };
+  drinks: {
+    water: boolean;
+    milk: boolean;
+    coffee: boolean;
+    tea: boolean;
+    juice: { selected: boolean; juiceType?: '' | 'apple' | 'orange' | null };
+  };
+  specialOptions?: string;
+}
@@ -2,9 +2,12 @@ import boto3
 import json
 import logging
 from datetime import datetime, timedelta
-from boto3.dynamodb.types import TypeDeserializer
 from decimal import Decimal
 import os
+from breakfast.clock import resolve_date
+from breakfast.dynamo import query_breakfast_orders, query_order_dates
+from breakfast.orders import LineItemCache, order_sort_key, parse_orders
+from breakfast.summary import DailySummary, read_summary
 
 # Configure logging
 logger = logging.getLogger()
@@ -17,8 +20,14 @@ AWS_REGION = os.environ.get('AWS_REGION', 'ca-central-1')
 # Initialize AWS clients
 dynamodb = boto3.client('dynamodb', region_name=AWS_REGION)
 
-# TypeDeserializer to convert DynamoDB format to Python types
-deserializer = TypeDeserializer()
+# Only the attributes the API returns or sorts on are fetched from DynamoDB
+ORDER_ATTRIBUTES = ('order_id', 'created_at', 'order_data', 'scheduled_minutes')
+
+# Page size for GET /dates
+DATES_DEFAULT_LIMIT = 60
+DATES_MAX_LIMIT = 366
+# Orders accepted per time slot, as enforced by the order API (0 = no limit)
+SLOT_CAPACITY = int(os.environ.get('SLOT_CAPACITY', '0'))
 
 class DecimalEncoder(json.JSONEncoder):
     """Custom JSON encoder to handle DynamoDB Decimal objects"""
@@ -38,7 +47,8 @@ def lambda_handler(event, context):
     Endpoints:
     - GET /orders?date=YYYY-MM-DD - Get orders for specific date
     - GET /orders - Get today's orders
-    - GET /dates - Get list of available dates with order counts
+    - GET /dates?limit=N&before=YYYY-MM-DD - Get available dates with order counts, newest first
+    - GET /load?date=YYYY-MM-DD - Get orders and items due per time slot
     """
     
     try:
@@ -67,7 +77,9 @@ def lambda_handler(event, context):
         if path == '/orders' and http_method == 'GET':
             return handle_get_orders(query_params, headers)
         elif path == '/dates' and http_method == 'GET':
-            return handle_get_dates(headers)
+            return handle_get_dates(query_params, headers)
+        elif path == '/load' and http_method == 'GET':
+            return handle_get_load(query_params, headers)
         else:
             return {
                 'statusCode': 404,
@@ -92,14 +104,9 @@ def lambda_handler(event, context):
 def handle_get_orders(query_params, headers):
     """Handle GET /orders requests"""
     try:
-        # Get date parameter or use today
-        date = query_params.get('date')
-        if not date:
-            date = datetime.now().strftime("%Y-%m-%d")
-        
-        # Validate date format
+        # Get date parameter ("today", "tomorrow" or YYYY-MM-DD) or use today's date at the inn
         try:
-            datetime.strptime(date, '%Y-%m-%d')
+            date = resolve_date(query_params.get('date'))
         except ValueError:
             return {
                 'statusCode': 400,
@@ -110,20 +117,21 @@ def handle_get_orders(query_params, headers):
                 }, cls=DecimalEncoder)
             }
         
-        # Query orders
-        orders = query_breakfast_orders(TABLE_NAME, date)
+        # Query orders and parse them once for formatting and the summary
+        # Identical orders share their line items and formatted items list
+        cache = LineItemCache()
+        orders = parse_orders(query_breakfast_orders(dynamodb, TABLE_NAME, date, ORDER_ATTRIBUTES), cache)
+        logger.info(f"Line item cache: {cache.hits} hits, {cache.misses} misses ({cache.hit_rate:.0%})")
         
-        # Process and format orders for mobile app
+        # Process and format orders for mobile app, sorted by time
         formatted_orders = []
-        for order in orders:
+        for order in sorted(orders, key=order_sort_key):
             formatted_order = format_order_for_mobile(order)
             formatted_orders.append(formatted_order)
         
-        # Sort orders by time
-        formatted_orders.sort(key=lambda x: x.get('scheduledTime', '23:59'))
-        
-        # Calculate summary statistics
-        summary = calculate_order_summary(orders)
+        # Summary statistics are counted from the orders returned, so the two always agree
+        daily_summary = DailySummary.from_orders(date, orders)
+        summary = calculate_order_summary(daily_summary)
         
         return {
             'statusCode': 200,
@@ -147,27 +155,34 @@ def handle_get_orders(query_params, headers):
             }, cls=DecimalEncoder)
         }
 
-def handle_get_dates(headers):
+def handle_get_dates(query_params, headers):
     """Handle GET /dates requests - returns available dates with order counts"""
     try:
-        # Scan table to get all available dates
-        # Note: This is a simplified approach. For large datasets, you'd want pagination
-        response = dynamodb.scan(
-            TableName=TABLE_NAME,
-            ProjectionExpression='#pk',
-            ExpressionAttributeNames={'#pk': 'bk_yyyy-mm-dd'}
-        )
-        
-        # Extract unique dates and count orders
-        date_counts = {}
-        for item in response.get('Items', []):
-            partition_key = item['bk_yyyy-mm-dd']['S']
-            date = partition_key.replace('bk_', '')
-            date_counts[date] = date_counts.get(date, 0) + 1
-        
+        # Validate paging parameters
+        before = query_params.get('before')
+        try:
+            limit = int(query_params.get('limit') or DATES_DEFAULT_LIMIT)
+            if not 1 <= limit <= DATES_MAX_LIMIT:
+                raise ValueError
+            if before:
+                datetime.strptime(before, '%Y-%m-%d')
+        except ValueError:
+            return {
+                'statusCode': 400,
+                'headers': headers,
+                'body': json.dumps({
+                    'error': 'Invalid parameters',
+                    'message': f'limit must be 1-{DATES_MAX_LIMIT} and before must be in YYYY-MM-DD format'
+                }, cls=DecimalEncoder)
+            }
+
+        # Order counts are kept per date by the order API, so a page is read from the summaries alone
+        date_counts, next_before = query_order_dates(dynamodb, TABLE_NAME, limit, before)
+
         # Format for response
+        today = resolve_date()
         dates = []
-        for date, count in sorted(date_counts.items(), reverse=True):
+        for date, count in date_counts:
             try:
                 # Parse and format date for display
                 date_obj = datetime.strptime(date, '%Y-%m-%d')
@@ -176,7 +191,7 @@ def handle_get_dates(headers):
                     'displayName': date_obj.strftime('%A, %B %d, %Y'),
                     'orderCount': count,
                     'dayOfWeek': date_obj.strftime('%A'),
-                    'isToday': date == datetime.now().strftime('%Y-%m-%d')
+                    'isToday': date == today
                 })
             except ValueError:
                 # Skip invalid dates
@@ -187,7 +202,8 @@ def handle_get_dates(headers):
             'headers': headers,
             'body': json.dumps({
                 'dates': dates,
-                'totalDates': len(dates)
+                'totalDates': len(dates),
+                'nextBefore': next_before
             }, cls=DecimalEncoder)
         }
         
@@ -202,264 +218,95 @@ def handle_get_dates(headers):
             }, cls=DecimalEncoder)
         }
 
-def query_breakfast_orders(table_name, date):
-    """Query DynamoDB for breakfast orders for a specific date"""
-    partition_key = f"bk_{date}"
-    
+def handle_get_load(query_params, headers):
+    """Handle GET /load requests - returns a time slot by item matrix for the kitchen"""
     try:
-        response = dynamodb.query(
-            TableName=table_name,
-            KeyConditionExpression='#pk = :pk',
-            ExpressionAttributeNames={'#pk': "bk_yyyy-mm-dd"},
-            ExpressionAttributeValues={':pk': {'S': partition_key}}
-        )
+        # Get date parameter ("today", "tomorrow" or YYYY-MM-DD) or use today's date at the inn
+        try:
+            date = resolve_date(query_params.get('date'))
+        except ValueError:
+            return {
+                'statusCode': 400,
+                'headers': headers,
+                'body': json.dumps({
+                    'error': 'Invalid date format',
+                    'message': 'Date must be in YYYY-MM-DD format'
+                }, cls=DecimalEncoder)
+            }
         
-        # Convert DynamoDB format to Python objects
-        orders = []
-        for item in response.get('Items', []):
-            # Deserialize the item
-            deserialized_item = {k: deserializer.deserialize(v) for k, v in item.items()}
-            
-            # Parse the order_data JSON string
-            if 'order_data' in deserialized_item:
-                try:
-                    order_data_str = deserialized_item['order_data']
-                    
-                    if isinstance(order_data_str, dict):
-                        deserialized_item['order_data'] = order_data_str
-                    else:
-                        # Parse JSON string with DynamoDB format
-                        order_data_dynamo = json.loads(order_data_str)
-                        order_data = {k: deserializer.deserialize(v) for k, v in order_data_dynamo.items()}
-                        deserialized_item['order_data'] = order_data
-                except (json.JSONDecodeError, KeyError, TypeError) as e:
-                    logger.error(f"Error parsing order_data: {e}")
-                    continue
-            
-            orders.append(deserialized_item)
+        # One read of the date's precomputed summary; dates without one are counted from their orders
+        summary = read_summary(dynamodb, TABLE_NAME, date)
+        if summary is None:
+            summary = DailySummary.from_orders(date, parse_orders(query_breakfast_orders(dynamodb, TABLE_NAME, date)))
         
-        return orders
+        slots = summary.slot_load()
+        for slot in slots:
+            slot['capacity'] = SLOT_CAPACITY or None
+            slot['remaining'] = max(SLOT_CAPACITY - slot['orders'], 0) if SLOT_CAPACITY else None
+        
+        return {
+            'statusCode': 200,
+            'headers': headers,
+            'body': json.dumps({
+                'date': date,
+                'slots': slots,
+                'items': sorted({item for slot in slots for item in slot['items']}),
+                'totalOrders': summary.order_count
+            }, cls=DecimalEncoder)
+        }
         
     except Exception as e:
-        logger.error(f"Error querying DynamoDB: {e}")
-        raise e
+        logger.error(f"Error getting kitchen load: {str(e)}", exc_info=True)
+        return {
+            'statusCode': 500,
+            'headers': headers,
+            'body': json.dumps({
+                'error': 'Failed to get kitchen load',
+                'message': str(e)
+            }, cls=DecimalEncoder)
+        }
 
 def format_order_for_mobile(order):
-    """Format a single order for mobile app consumption"""
-    order_data = order.get('order_data', {})
-    customer = order_data.get('customer', {})
-    scheduling = order_data.get('scheduling', {})
-    
-    # Basic info
-    formatted = {
-        'orderId': order.get('order_id', ''),
-        'customerName': customer.get('firstName', 'Unknown'),
-        'roomNumber': customer.get('roomNumber', 'N/A'),
-        'scheduledDate': scheduling.get('date', ''),
-        'scheduledTime': scheduling.get('time', 'N/A'),
-        'createdAt': order.get('created_at', ''),
-        'specialOptions': order_data.get('specialOptions', ''),
-        'items': []
+    """Format a single parsed order (breakfast.orders.Order) for mobile app consumption"""
+    items = order.rendered.get('mobile')
+    if items is None:
+        items = order.rendered['mobile'] = format_items_for_mobile(order.line_items)
+
+    return {
+        'orderId': order.order_id,
+        'customerName': order.customer_name,
+        'roomNumber': order.room_number,
+        'scheduledDate': order.date,
+        'scheduledTime': order.display_time,
+        'createdAt': order.created_at,
+        'specialOptions': order.special_options,
+        'items': items
     }
-    
-    # Process menu items
+
+def format_items_for_mobile(line_items):
+    """Format an order's line items for the mobile app"""
     items = []
-    
-    # Eggs
-    eggs = order_data.get('eggs', {})
-    if eggs.get('style'):
-        egg_text = f"Eggs ({eggs['style']}"
-        if eggs.get('overStyle'):
-            egg_text += f" {eggs['overStyle']}"
-        egg_text += ")"
-        items.append({
-            'category': 'main',
-            'name': 'Eggs',
-            'description': egg_text,
-            'details': {
-                'style': eggs.get('style', ''),
-                'overStyle': eggs.get('overStyle', '')
-            }
-        })
-    
-    # Pancakes
-    pancakes = order_data.get('pancakes', {})
-    if pancakes.get('selected'):
-        toppings = []
-        toppings_data = pancakes.get('toppings', {})
-        if toppings_data.get('berries'): toppings.append('berries')
-        if toppings_data.get('bacon'): toppings.append('bacon')
-        if toppings_data.get('whippedCream'): toppings.append('whipped cream')
-        
-        description = "Pancakes"
-        if toppings:
-            description += f" with {', '.join(toppings)}"
-            
-        items.append({
-            'category': 'main',
-            'name': 'Pancakes',
-            'description': description,
-            'details': toppings_data
-        })
-    
-    # Waffles
-    waffles = order_data.get('waffles', {})
-    if waffles.get('selected'):
-        options = []
-        options_data = waffles.get('options', {})
-        if options_data.get('berries'): options.append('berries')
-        if options_data.get('bacon'): options.append('bacon')
-        if options_data.get('whippedCream'): options.append('whipped cream')
-        
-        description = "Waffles"
-        if options:
-            description += f" with {', '.join(options)}"
-            
-        items.append({
-            'category': 'main',
-            'name': 'Waffles',
-            'description': description,
-            'details': options_data
-        })
-    
-    # Sides
-    sides = order_data.get('sides', {})
-    if sides.get('bacon'):
-        items.append({
-            'category': 'side',
-            'name': 'Bacon',
-            'description': 'Bacon'
-        })
-    
-    if sides.get('homeFries'):
-        items.append({
-            'category': 'side',
-            'name': 'Home Fries',
-            'description': 'Home Fries'
-        })
-    
-    if sides.get('beans'):
-        items.append({
-            'category': 'side',
-            'name': 'Beans',
-            'description': 'Beans'
-        })
-    
-    toast = sides.get('toast', {})
-    if toast.get('selected'):
-        bread_type = toast.get('breadType', 'regular')
-        items.append({
-            'category': 'side',
-            'name': 'Toast',
-            'description': f'Toast ({bread_type})',
-            'details': {'breadType': bread_type}
-        })
-    
-    # Drinks
-    drinks = order_data.get('drinks', {})
-    
-    if drinks.get('coffee'):
-        items.append({
-            'category': 'drink',
-            'name': 'Coffee',
-            'description': 'Coffee'
-        })
-    
-    if drinks.get('tea'):
-        items.append({
-            'category': 'drink',
-            'name': 'Tea',
-            'description': 'Tea'
-        })
-    
-    if drinks.get('water'):
-        items.append({
-            'category': 'drink',
-            'name': 'Water',
-            'description': 'Water'
-        })
-    
-    if drinks.get('milk'):
-        items.append({
-            'category': 'drink',
-            'name': 'Milk',
-            'description': 'Milk'
-        })
-    
-    juice = drinks.get('juice', {})
-    if juice.get('selected'):
-        juice_type = juice.get('juiceType', 'regular')
-        items.append({
-            'category': 'drink',
-            'name': 'Juice',
-            'description': f'Juice ({juice_type})',
-            'details': {'juiceType': juice_type}
-        })
-    
-    formatted['items'] = items
-    return formatted
+    for line_item in line_items:
+        item = {
+            'category': line_item.category,
+            'name': line_item.name,
+            'description': line_item.description
+        }
+        if line_item.details is not None:
+            item['details'] = line_item.details
+        items.append(item)
+    return items
 
-def calculate_order_summary(orders):
-    """Calculate summary statistics for orders"""
-    from collections import defaultdict
-    
-    item_counts = defaultdict(int)
-    times = []
-    
-    for order in orders:
-        order_data = order.get('order_data', {})
-        
-        # Count items (similar to existing analysis function)
-        eggs = order_data.get('eggs', {})
-        if eggs.get('style'):
-            if eggs.get('overStyle'):
-                item_counts[f"Eggs ({eggs['style']} {eggs['overStyle']})"] += 1
-            else:
-                item_counts[f"Eggs ({eggs['style']})"] += 1
-        
-        pancakes = order_data.get('pancakes', {})
-        if pancakes.get('selected'):
-            item_counts['Pancakes'] += 1
-        
-        waffles = order_data.get('waffles', {})
-        if waffles.get('selected'):
-            item_counts['Waffles'] += 1
-        
-        sides = order_data.get('sides', {})
-        if sides.get('bacon'): item_counts['Bacon'] += 1
-        if sides.get('homeFries'): item_counts['Home Fries'] += 1
-        if sides.get('beans'): item_counts['Beans'] += 1
-        
-        toast = sides.get('toast', {})
-        if toast.get('selected'):
-            bread_type = toast.get('breadType', 'regular')
-            item_counts[f'Toast ({bread_type})'] += 1
-        
-        drinks = order_data.get('drinks', {})
-        if drinks.get('coffee'): item_counts['Coffee'] += 1
-        if drinks.get('tea'): item_counts['Tea'] += 1
-        if drinks.get('water'): item_counts['Water'] += 1
-        if drinks.get('milk'): item_counts['Milk'] += 1
-        
-        juice = drinks.get('juice', {})
-        if juice.get('selected'):
-            juice_type = juice.get('juiceType', 'regular')
-            item_counts[f'Juice ({juice_type})'] += 1
-        
-        # Collect times
-        scheduling = order_data.get('scheduling', {})
-        if scheduling.get('time'):
-            times.append(scheduling['time'])
-    
-    # Find earliest and latest times
-    earliest_time = min(times) if times else None
-    latest_time = max(times) if times else None
+def calculate_order_summary(summary):
+    """Format a date's kitchen summary (breakfast.summary.DailySummary) for the mobile app"""
+    earliest_time = summary.earliest_time
+    latest_time = summary.latest_time
     
     return {
-        'itemCounts': dict(item_counts),
+        'itemCounts': summary.kitchen_counts(include_toppings=False),
         'earliestTime': earliest_time,
         'latestTime': latest_time,
-        'totalOrders': len(orders),
+        'totalOrders': summary.order_count,
         'timeRange': f"{earliest_time} - {latest_time}" if earliest_time and latest_time else None
     }
 